@@ -0,0 +1,652 @@
+"""
+The Arbiter - Async Settlement Engine
+
+Runs the referee lifecycle as a pipeline of concurrent asyncio stages on top
+of AsyncWeb3 (scanner -> decode -> evaluate -> sign -> broadcast -> confirm,
+see pipeline.py), so a slow receipt only delays its own match instead of
+every match queued behind it, and a slow stage backs up into bounded queues.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from web3 import AsyncWeb3
+from web3.exceptions import TransactionNotFound
+
+from nonce_manager import NonceManager, is_nonce_error
+from multicall import MatchReader
+from streamer import LogStreamer
+from rpc_pool import AsyncPooledHTTPProvider
+from http_transport import async_http_provider_from_env
+from gas_oracle import Fees
+from gas_limits import SETTLE_GAS, WITHDRAW_GAS
+from calldata import WITHDRAW_FEES
+from outbox import Intent, OutboxEntry
+from leader import LeadershipLost
+from block_receipts import BlockReceiptFollower
+from pipeline import StageQueue, ScanWatermark, DEFAULT_WORKERS, DEFAULT_QUEUE_SIZE
+from metrics import (GET_LOGS_SECONDS, GET_LOGS_EVENTS, TX_SEND_SECONDS, TX_SENT, TX_RESULTS,
+                     RECEIPT_WAIT_SECONDS, RPC_ERRORS, IN_FLIGHT)
+
+logger = logging.getLogger("Referee.Async")
+
+
+class AsyncArbiterEngine:
+    """Drives an ArbiterAgent's config and persistence layer with async RPC I/O."""
+
+    def __init__(self, agent, workers: Optional[Dict[str, int]] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 max_in_flight: int = 16):
+        self.agent = agent
+        self.w3 = AsyncWeb3(AsyncPooledHTTPProvider(agent.rpc_pool, async_http_provider_from_env) if agent.rpc_pool
+                            else async_http_provider_from_env(agent.rpc_url))
+        self.w3.middleware_onion.add(agent.health.async_rpc_middleware, name="health")
+        self.contract = self.w3.eth.contract(address=agent.contract_address, abi=agent.contract.abi)
+        self.match_reader = MatchReader(self.w3, self.contract, agent.multicall_address)
+        self.gas_oracle = agent.gas_oracle.for_w3(self.w3)
+
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.in_flight_slots = asyncio.Semaphore(max_in_flight)
+        self.nonces = NonceManager()
+        self._nonce_lock = asyncio.Lock()
+        self.blocks = BlockReceiptFollower()
+
+        # Each stage's input: raw log batches, decoded events, settlements to sign,
+        # signed transactions, and broadcast transactions to confirm. The confirmer
+        # picks its queue up once per poll, so it holds every in-flight transaction.
+        # Items up to the sign stage carry their scanned range's watermark token.
+        self.decode_queue = StageQueue("decode", queue_size)
+        self.match_queue = StageQueue("evaluate", queue_size)
+        self.settle_queue = StageQueue("sign", queue_size)
+        self.broadcast_queue = StageQueue("broadcast", queue_size)
+        self.confirm_queue = StageQueue("confirm", max_in_flight)
+        self.watermark = ScanWatermark(self._save_checkpoint)
+
+        # Matches currently somewhere in the pipeline; guards against re-queueing
+        # the same MatchJoined event while its settlement is still unconfirmed.
+        self.in_flight: Set[int] = set()
+        self._resuming: List[asyncio.Task] = []
+        self.wake = asyncio.Event()
+        IN_FLIGHT.set_function(lambda: len(self.in_flight))
+        agent.health.backlog = lambda: len(self.in_flight)
+
+    def _save_checkpoint(self, block: int):
+        # A range finishing after the lease lapsed must not move the new leader's checkpoint
+        if self.agent.is_leader:
+            self.agent._save_last_block(block)
+
+    async def _get_arena_logs(self, start: int, end: int) -> List[Any]:
+        """Async twin of ArbiterAgent._get_arena_logs, minus the decoding (the decode stage's job)."""
+        with GET_LOGS_SECONDS.time():
+            try:
+                logs = await self.w3.eth.get_logs(self.agent._arena_log_filter(start, end))
+            except Exception:
+                RPC_ERRORS.inc(method='eth_getLogs')
+                raise
+        GET_LOGS_EVENTS.inc(len(logs))
+        return logs
+
+    async def _scan_to(self, last_block: int, current_block: int) -> int:
+        """Async twin of ArbiterAgent._scan_to, sharing the agent's adaptive window."""
+        window = self.agent.scan_window
+        start = last_block + 1
+        while start <= current_block and self.agent.running:
+            end = min(start + window.size - 1, current_block)
+
+            hashes = await self._read_block_hashes(self.agent.block_hashes.first_recorded(start, end, current_block), end)
+            started = time.monotonic()
+            try:
+                logs = await self._get_arena_logs(start, end)
+            except Exception as rpc_e:
+                if self.agent._scan_overloaded(rpc_e, start, end):
+                    continue
+                raise
+            self.agent._scan_succeeded(len(logs), time.monotonic() - started)
+
+            await self._hand_on(end, logs)
+            self.agent.block_hashes.record_many(hashes)
+            last_block = end
+            start = end + 1
+
+        return last_block
+
+    async def _read_block_hashes(self, first: int, last: int) -> List[Tuple[int, bytes]]:
+        numbers = range(first, last + 1)
+        blocks = await asyncio.gather(*(self.w3.eth.get_block(number) for number in numbers))
+        return [(number, block['hash']) for number, block in zip(numbers, blocks)]
+
+    async def _hand_on(self, end: int, logs: List[Any]):
+        """Queues a scanned range's logs; the checkpoint reaches end once the pipeline is done with them."""
+        token = self.watermark.open(end)
+        if logs:
+            await self.decode_queue.put((token, logs))
+        else:
+            self.watermark.done(token)
+
+    async def _check_reorg(self, last_block: int) -> int:
+        """Async twin of ArbiterAgent._check_reorg."""
+        block_hashes = self.agent.block_hashes
+        expected = block_hashes.get(last_block)
+        if expected is None:
+            return last_block
+        if AsyncWeb3.to_hex((await self.w3.eth.get_block(last_block + 1))['parentHash']) == expected:
+            return last_block
+
+        stored = block_hashes.newest_first(last_block)
+        canonical = dict(await self._read_block_hashes(stored[-1][0], stored[0][0])) if stored else {}
+        fork = block_hashes.fork_point(last_block, canonical)
+        touched = self.agent._rewind_for_reorg(last_block, fork)
+        if touched:
+            try:
+                self.agent._roll_back_matches(fork, await self.match_reader.afetch(touched))
+            except Exception as e:
+                logger.error(f"Could not re-read {len(touched)} match(es) touched by the reorg: {e}")
+        if not self.watermark.rewind(fork):
+            self.agent._save_last_block(fork)
+        return fork
+
+    async def _fetch_segment(self, start: int, end: int) -> List[Any]:
+        try:
+            return list(await self._get_arena_logs(start, end))
+        except Exception as rpc_e:
+            mid = self.agent._split_segment(rpc_e, start, end)
+            return await self._fetch_segment(start, mid) + await self._fetch_segment(mid + 1, end)
+
+    async def _backfill(self, last_block: int, target_block: int) -> int:
+        """Async twin of ArbiterAgent._backfill: concurrent fetches, in-order checkpointing."""
+        checkpoint = last_block
+        workers = self.agent.backfill_workers
+        ranges = self.agent._backfill_segments(last_block, target_block)
+
+        in_flight = deque()
+        completed = 0
+        try:
+            while (ranges or in_flight) and self.agent.running:
+                # Keep a bounded number of segments ahead of the ordered consumer
+                while ranges and len(in_flight) < workers * 2:
+                    start, end = ranges.popleft()
+                    in_flight.append((end, asyncio.create_task(self._fetch_segment(start, end))))
+
+                end, task = in_flight.popleft()
+                await self._hand_on(end, await task)
+                last_block = end
+                self.agent.health.heartbeat(target_block - last_block)
+
+                completed += 1
+                if completed % workers == 0:
+                    self.agent._ensure_leader()
+                    await self._take_over(self.agent._refresh_partitions())
+                    self.agent._db_commit_point()
+        except LeadershipLost:
+            raise
+        except Exception as e:
+            logger.error(f"Backfill stopped at block {last_block}: {e}")
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+        if last_block > checkpoint:
+            self.agent.block_hashes.record(last_block, (await self.w3.eth.get_block(last_block))['hash'])
+        return last_block
+
+    async def scanner(self, poll_interval: int):
+        last_block = self.agent._get_last_block()
+        logger.info(f"Recovery: Scanning from block {last_block}...")
+        last_fee_withdrawal_day = datetime.now(timezone.utc).day - 1
+        recovered = self.agent._unsettled_joins() if self.agent.is_leader else []
+
+        while self.agent.running:
+            try:
+                if self.agent.leader_lease:
+                    was_leader = self.agent.is_leader
+                    if not await self._hold_leadership():
+                        last_block = await asyncio.to_thread(self.agent._follow_leader)
+                        await asyncio.sleep(poll_interval)
+                        continue
+                    if not was_leader:
+                        last_block = self.agent._get_last_block()
+                        recovered = self.agent._unsettled_joins()
+
+                now = datetime.now(timezone.utc)
+                if now.hour == 0 and now.day != last_fee_withdrawal_day:
+                    await self.withdraw_platform_fees()
+                    last_fee_withdrawal_day = now.day
+
+                current_block = await self.w3.eth.block_number
+                self.agent.head_block = current_block
+                self.gas_oracle.observe_block(current_block)
+                if self.agent.account:
+                    await self.gas_oracle.afees()
+                orphaned = self.agent._refresh_partitions()
+                with self.agent._db_transaction():
+                    joins, recovered = orphaned + recovered + self.agent._drain_retries(), []
+                    await self._take_over(joins)
+                    target_block = self.agent._scan_target(current_block)
+                    if target_block > last_block:
+                        last_block = await self._check_reorg(last_block)
+                    if target_block - last_block > self.agent.backfill_threshold:
+                        last_block = await self._backfill(last_block, target_block)
+                    elif target_block > last_block:
+                        last_block = await self._scan_to(last_block, target_block)
+                self.agent.health.heartbeat(current_block - last_block)
+            except LeadershipLost as e:
+                logger.warning(f"Cycle abandoned: {e}. Its uncommitted writes were rolled back.")
+            except Exception as e:
+                logger.error(f"Scanner exception: {e}")
+
+            try:
+                await asyncio.wait_for(self.wake.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+
+    async def _hold_leadership(self) -> bool:
+        """Async twin of ArbiterAgent._hold_leadership, plus what run() does around it."""
+        was_leader = self.agent.is_leader
+        held = self.agent._hold_leadership()
+        if held and not was_leader:
+            self.nonces.invalidate()
+            await self._resume_outbox()
+        elif not held:
+            # The checkpoint is the new leader's, as is everything still queued (the stages drop it)
+            self.watermark.reset()
+        return held
+
+    async def _take_over(self, joins: List[Any]):
+        """Queues stand-in joins: newly leased partitions' matches, or those recovered at startup."""
+        joins = [event for event in joins if event['args']['matchId'] not in self.in_flight]
+        for settlement in self.agent._evaluate_joins(joins):
+            self.in_flight.add(settlement[0])
+            await self.settle_queue.put((None, settlement))
+
+    def _on_streamed_events(self, events: List[Any]):
+        # Head events are only acted on in speculative mode (see ArbiterAgent._on_streamed_events)
+        if self.agent.speculative and self.agent.is_leader:
+            try:
+                for event in events:
+                    self.match_queue.put_nowait((None, event))
+            except asyncio.QueueFull:
+                # The evaluators are behind; the scan will pick these up from the logs
+                self.wake.set()
+        else:
+            self.wake.set()
+
+    async def decoder(self):
+        """Decodes raw log batches off the event loop and feeds their events to the evaluators."""
+        while True:
+            token, logs = await self.decode_queue.get()
+            try:
+                if not self.agent.is_leader:
+                    continue
+                events = await asyncio.to_thread(self.agent._decode_logs, logs)
+                self.watermark.add(token, len(events))
+                for event in events:
+                    await self.match_queue.put((token, event))
+            except Exception as e:
+                logger.error(f"Decoder exception: {e}")
+            finally:
+                self.watermark.done(token)
+                self.decode_queue.task_done()
+
+    async def evaluator(self, max_batch: int = 200):
+        """Takes every queued event at once so missing match data comes back in one multicall."""
+        while True:
+            items = [await self.match_queue.get()]
+            while len(items) < max_batch and not self.match_queue.empty():
+                items.append(self.match_queue.get_nowait())
+            events = [event for _, event in items]
+
+            try:
+                if not self.agent.is_leader:
+                    continue
+                joins, missing = self.agent._apply_events(events)
+                joins = [event for event in joins if event['args']['matchId'] not in self.in_flight]
+                self.in_flight.update(event['args']['matchId'] for event in joins)
+
+                if missing:
+                    try:
+                        for match_id, match_data in (await self.match_reader.afetch(missing)).items():
+                            self.agent.match_store.hydrate(match_id, match_data)
+                    except Exception as e:
+                        logger.error(f"Error reading match data for {len(missing)} match(es): {e}")
+
+                settlements = self.agent._evaluate_joins(joins)
+                queued = {match_id for match_id, _, _ in settlements}
+                tokens = {event['args']['matchId']: token for token, event in items if event['event'] == 'MatchJoined'}
+                for settlement in settlements:
+                    token = tokens.get(settlement[0])
+                    self.watermark.add(token)
+                    await self.settle_queue.put((token, settlement))
+                # Joins that were skipped or failed evaluation leave the pipeline here
+                self.in_flight.difference_update(event['args']['matchId'] for event in joins
+                                                 if event['args']['matchId'] not in queued)
+            except Exception as e:
+                logger.error(f"Evaluator exception: {e}")
+            finally:
+                for token, _ in items:
+                    self.watermark.done(token)
+                    self.match_queue.task_done()
+
+    async def _sign_and_send(self, intent: Intent, nonce: int, fees: Fees, replacement: bool = False) -> bytes:
+        with TX_SEND_SECONDS.time():
+            signed_tx = self.agent._sign_logged(intent, nonce, fees, replacement)
+            return await self._send_signed(signed_tx, nonce)
+
+    async def _send_signed(self, signed_tx: Any, nonce: int) -> bytes:
+        """Async twin of ArbiterAgent._send_signed."""
+        try:
+            return await self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            return self.agent._sent_anyway(e, signed_tx, nonce)
+
+    def _replacer(self, intent: Intent, nonce: int, fees: Fees):
+        """Async twin of ArbiterAgent._replacer."""
+        last = [fees, intent]
+
+        async def replace() -> bytes:
+            bumped = self.gas_oracle.bump(last[0], await self.gas_oracle.afees())
+            current = last[1]
+            call = self.agent._unseeded_call(current, await self.w3.eth.block_number)
+            if call is not None:
+                shape, data = call
+                gas = await self.agent.gas_limits.aget(shape, lambda: self._estimate_gas(data),
+                                                       fallback=self.agent._settle_gas(current),
+                                                       units=len(current.match_ids))
+                current = Intent(shape, current.match_ids, data, gas)
+            tx_hash = await self._sign_and_send(current, nonce, bumped, replacement=True)
+            last[:] = [bumped, current]
+            return tx_hash
+        return replace
+
+    async def _estimate_gas(self, data: bytes) -> int:
+        return await self.w3.eth.estimate_gas({'from': self.agent.referee_address, 'to': self.agent.contract_address, 'data': data})
+
+    async def _sign(self, intent: Intent, fees: Fees) -> Tuple[Any, int]:
+        """Allocates the next nonce and signs the intent into the outbox. Returns (signed_tx, nonce)."""
+        async with self._nonce_lock:
+            if not self.nonces.synced:
+                self.nonces.sync(await self.w3.eth.get_transaction_count(self.agent.referee_address, 'pending'))
+            nonce = self.nonces.allocate()
+        try:
+            return self.agent._sign_logged(intent, nonce, fees), nonce
+        except Exception:
+            self.nonces.release(nonce)
+            raise
+
+    async def _broadcast_settlement(self, intent: Intent, fees: Fees, signed_tx: Any, nonce: int) -> Tuple[bytes, int]:
+        for attempt in range(2):
+            try:
+                with TX_SEND_SECONDS.time():
+                    tx_hash = await self._send_signed(signed_tx, nonce)
+                TX_SENT.inc()
+                return tx_hash, nonce
+            except Exception as e:
+                # Rejected by the node: nothing for a restart to reconcile
+                self.agent.outbox.remove(nonce)
+                if not is_nonce_error(e):
+                    self.nonces.release(nonce)
+                    raise
+                self.nonces.invalidate()
+                if attempt:
+                    raise
+                logger.warning(f"Nonce {nonce} rejected ({e}). Resyncing from chain.")
+                signed_tx, nonce = await self._sign(intent, fees)
+
+    async def _submit(self, intent: Intent):
+        """Signs an intent into the outbox and queues it for broadcast.
+
+        Waits for one of max_in_flight slots first, so at most that many
+        transactions are signed but not yet confirmed. The slot is freed once
+        the confirmer is done with it, or here if signing fails.
+        """
+        await self.in_flight_slots.acquire()
+        try:
+            fees = await self.gas_oracle.afees()
+            signed_tx, nonce = await self._sign(intent, fees)
+            await self.broadcast_queue.put((intent, fees, signed_tx, nonce))
+        except BaseException:
+            self.in_flight_slots.release()
+            raise
+
+    async def signer(self):
+        """Builds, prices and signs settlements, taking nonces in queue order."""
+        while True:
+            token, (match_id, winner, target_number) = await self.settle_queue.get()
+            logger.info(f"⚖️  Settling match {match_id} | Winner: {winner} | Target: {target_number}")
+            try:
+                if not self.agent.is_leader or not self.agent._still_owned(match_id):
+                    self.in_flight.discard(match_id)
+                    continue
+                shape, data = self.agent._settle_call(match_id, winner, target_number)
+                gas = await self.agent.gas_limits.aget(shape, lambda: self._estimate_gas(data), fallback=SETTLE_GAS)
+                await self._submit(Intent(shape, (match_id,), data, gas))
+            except LeadershipLost:
+                self.in_flight.discard(match_id)
+            except Exception as e:
+                logger.error(f"❌ Critical error settling match {match_id}: {e}")
+                self.in_flight.discard(match_id)
+                self.agent._retry_later((match_id,))
+            finally:
+                # Signed into the outbox (or failed): either way the scan need not revisit it
+                self.watermark.done(token)
+                self.settle_queue.task_done()
+
+    async def withdraw_platform_fees(self):
+        """Async twin of ArbiterAgent.withdraw_platform_fees.
+
+        The sweep goes through this engine's sign, broadcast and confirm stages,
+        on the same nonce allocator as its settlements.
+        """
+        if not self.agent._sweeps_fees():
+            return
+        try:
+            total_fees = await self.contract.functions.totalFees().call()
+            if total_fees < self.agent.fee_sweep_threshold:
+                return
+
+            logger.info(f"💰 Cleaning fees ({AsyncWeb3.from_wei(total_fees, 'ether')} MON)...")
+            data = self.agent.calldata.withdraw_fees_data
+            gas = await self.agent.gas_limits.aget(WITHDRAW_FEES, lambda: self._estimate_gas(data), fallback=WITHDRAW_GAS)
+            await self._submit(Intent(WITHDRAW_FEES, (), data, gas))
+        except LeadershipLost:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error during fee sweep: {e}")
+
+    async def broadcaster(self):
+        """Sends signed settlements and hands them to the confirmer.
+
+        A nonce the node rejects is resynced from chain and the settlement re-signed
+        once; any other rejection frees the nonce and the match. A send whose outcome
+        is unknown is confirmed as if it went through. Once the lease has lapsed,
+        nothing more is sent: the outbox rows are left to the new leader.
+        """
+        while True:
+            intent, fees, signed_tx, nonce = await self.broadcast_queue.get()
+            try:
+                if not self.agent.is_leader:
+                    # Signed into the shared outbox: the new leader's reconcile broadcasts it
+                    self.in_flight.difference_update(intent.match_ids)
+                    self.in_flight_slots.release()
+                    continue
+                tx_hash, nonce = await self._broadcast_settlement(intent, fees, signed_tx, nonce)
+                logger.info(f"📤 Tx Sent: {tx_hash.hex()} (nonce {nonce}). Handing off to confirmer...")
+                for match_id in intent.match_ids:
+                    self.agent._mark_match_pending(match_id, tx_hash.hex())
+                replace = self._replacer(intent, nonce, fees)
+                await self.confirm_queue.put((intent, [tx_hash], time.monotonic(), nonce, replace))
+            except LeadershipLost:
+                self.in_flight.difference_update(intent.match_ids)
+                self.in_flight_slots.release()
+            except Exception as e:
+                logger.error(f"❌ Critical error settling match(es) {list(intent.match_ids)}: {e}")
+                self.in_flight.difference_update(intent.match_ids)
+                self.in_flight_slots.release()
+                self.agent._retry_later(intent.match_ids)
+            finally:
+                self.broadcast_queue.task_done()
+
+    async def confirmer(self):
+        """Follows new blocks and confirms every outstanding tx against them.
+
+        Async twin of ReceiptConfirmer: one eth_getBlockReceipts per new block (per-tx
+        lookups when the node lacks it), with the same timeout and fee-bump policy.
+        """
+        policy = self.agent.confirmer
+        outstanding: Dict[int, Dict[str, Any]] = {}
+        while True:
+            if not outstanding:
+                self.blocks.idle()
+                self._track(outstanding, await self.confirm_queue.get())
+            while not self.confirm_queue.empty():
+                self._track(outstanding, self.confirm_queue.get_nowait())
+
+            try:
+                receipts = await self._collect_receipts(outstanding)
+            except Exception as e:
+                RPC_ERRORS.inc(method='eth_getTransactionReceipt')
+                logger.error(f"Confirmer exception: {e}")
+                receipts = {}
+
+            try:
+                for nonce, entry in list(outstanding.items()):
+                    receipt = receipts.get(nonce)
+                    if receipt is None:
+                        timed_out, replace_due = policy.due(entry, time.monotonic())
+                        if (timed_out or replace_due) and self.blocks.supported:
+                            receipt = await self._find_receipt(entry['hashes'])
+                    if receipt is None:
+                        if not timed_out:
+                            if replace_due:
+                                await self._replace(entry)
+                            continue
+                        policy.log_dropped(entry)
+                        self.nonces.invalidate()
+                    del outstanding[nonce]
+                    self._finish(entry, receipt)
+            except Exception as e:
+                RPC_ERRORS.inc(method='eth_getTransactionReceipt')
+                logger.error(f"Confirmer exception: {e}")
+            await asyncio.sleep(policy.poll_interval)
+
+    def _track(self, outstanding: Dict[int, Dict[str, Any]], item: Tuple[Intent, List[bytes], float, int, Callable]):
+        intent, hashes, sent_at, nonce, replace = item
+        outstanding[nonce] = {**self.agent.confirmer.new_entry(nonce, hashes, replace, sent_at), 'intent': intent}
+        self.confirm_queue.task_done()
+
+    async def _collect_receipts(self, outstanding: Dict[int, Dict[str, Any]]) -> Dict[int, Any]:
+        """Async twin of ReceiptConfirmer._collect_receipts, keyed by nonce."""
+        blocks = self.blocks.plan(await self.w3.eth.block_number)
+        if blocks is not None:
+            try:
+                for block in blocks:
+                    receipts = await self.blocks.afetch(self.w3, block)
+                    if receipts is None:
+                        break
+                    self.blocks.add(block, receipts)
+                return {nonce: self.blocks.find(entry['hashes']) for nonce, entry in outstanding.items()}
+            except Exception as e:
+                if not self.blocks.give_up_if_unsupported(e):
+                    raise
+        return {nonce: await self._find_receipt(entry['hashes']) for nonce, entry in outstanding.items()}
+
+    async def _find_receipt(self, hashes: List[bytes]):
+        for tx_hash in hashes:
+            try:
+                return await self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    async def _replace(self, entry: Dict[str, Any]):
+        policy = self.agent.confirmer
+        policy.begin_replacement(entry)
+        try:
+            new_hash = await entry['replace']()
+        except Exception as e:
+            policy.end_replacement(entry, None, e)
+            return
+        policy.end_replacement(entry, new_hash)
+
+    def _finish(self, entry: Dict[str, Any], receipt):
+        intent = entry['intent']
+        try:
+            if receipt is not None:
+                RECEIPT_WAIT_SECONDS.observe(time.monotonic() - entry['sent_at'])
+            self.agent._complete(entry['nonce'], intent, receipt)
+        except Exception as e:
+            logger.error(f"❌ Error confirming match(es) {list(intent.match_ids)}: {e}")
+        finally:
+            TX_RESULTS.inc(result='dropped' if receipt is None else 'success' if receipt.status == 1 else 'reverted')
+            self.in_flight.difference_update(intent.match_ids)
+            self.in_flight_slots.release()
+
+    async def _resume_outbox(self):
+        """Async twin of ArbiterAgent._resume_outbox: rebroadcast entries go to the confirm queue.
+
+        Their matches are claimed before this returns. Handing them to the confirmer runs in
+        the background: each needs a confirmer slot, and with more resumed entries than slots
+        the later ones wait for earlier receipts.
+        """
+        try:
+            resumed = await asyncio.to_thread(self.agent._reconcile_outbox)
+        except Exception as e:
+            logger.error(f"Outbox reconciliation failed: {e}")
+            return
+        for entry, _ in resumed:
+            self.in_flight.update(entry.intent.match_ids)
+        if resumed:
+            self._resuming = [task for task in self._resuming if not task.done()]
+            self._resuming.append(asyncio.create_task(self._confirm_resumed(resumed)))
+
+    async def _confirm_resumed(self, resumed: List[Tuple[OutboxEntry, bytes]]):
+        for entry, _ in resumed:
+            await self.in_flight_slots.acquire()
+            replace = self._replacer(entry.intent, entry.nonce, entry.fees)
+            await self.confirm_queue.put((entry.intent, list(entry.tx_hashes), time.monotonic(), entry.nonce, replace))
+
+    async def run(self, poll_interval: int = 5):
+        logger.info("=" * 60)
+        logger.info("🤖 THE ARBITER - Professional Referee Node (async engine)")
+        logger.info(f"Address:  {self.agent.referee_address}")
+        logger.info(f"Target:   {self.agent.contract_address}")
+        if self.agent.partitions:
+            logger.info(f"Worker:   {self.agent.partitions.worker_index} of {self.agent.partitions.worker_count}")
+        logger.info("=" * 60)
+
+        self.agent.start_health_server()
+        await asyncio.to_thread(self.agent._sync_seed_chain)
+        # The confirmer runs before the outbox is resumed: resumed entries hold its slots
+        tasks = [asyncio.create_task(self.confirmer())]
+        if self.agent.is_leader:
+            await self._resume_outbox()
+
+        logger.info("Pipeline: " + ", ".join(f"{stage} x{count}" for stage, count in self.workers.items()))
+        tasks.append(asyncio.create_task(self.scanner(poll_interval)))
+        stages = {"decode": self.decoder, "evaluate": self.evaluator, "sign": self.signer, "broadcast": self.broadcaster}
+        for stage, worker in stages.items():
+            tasks += [asyncio.create_task(worker()) for _ in range(self.workers[stage])]
+        if self.agent.ws_url:
+            streamer = LogStreamer(self.agent, self.agent.ws_url, on_events=self._on_streamed_events,
+                                   head_interval=self.agent.head_wake_interval)
+            streamer.on_reconnect = self.wake.set
+            if not self.agent.speculative:
+                streamer.on_head = self.wake.set
+            tasks.append(asyncio.create_task(streamer.run()))
+
+        while self.agent.running:
+            await asyncio.sleep(1)
+
+        tasks += self._resuming
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.agent.partitions and self.agent.is_leader:
+            self.agent.partitions.release()
+        if self.agent.leader_lease:
+            self.agent.leader_lease.release()
+        if hasattr(self.w3.provider, 'close'):
+            await self.w3.provider.close()
+        logger.info("Async engine stopped.")
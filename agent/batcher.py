@@ -0,0 +1,52 @@
+"""
+The Arbiter - Settlement Batching
+
+Collects evaluated matches so a burst of MatchJoined events can be settled
+with a single Arena.settleMatches transaction.
+"""
+import time
+import threading
+from typing import List, Tuple
+
+# (match_id, winner, target_number)
+Settlement = Tuple[int, str, int]
+
+
+class SettlementBatcher:
+    """Buffers settlements until max_size is reached or the oldest entry is window seconds old."""
+
+    def __init__(self, max_size: int = 20, window: float = 2.0):
+        self.max_size = max_size
+        self.window = window
+        self._lock = threading.Lock()
+        self._items: List[Settlement] = []
+        self._opened_at = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def add(self, match_id: int, winner: str, target_number: int):
+        with self._lock:
+            if not self._items:
+                self._opened_at = time.monotonic()
+            self._items.append((match_id, winner, target_number))
+
+    def time_until_due(self) -> float:
+        """Seconds until the current batch should be flushed (inf when empty)."""
+        with self._lock:
+            if not self._items:
+                return float("inf")
+            if len(self._items) >= self.max_size:
+                return 0.0
+            return max(0.0, self._opened_at + self.window - time.monotonic())
+
+    def due(self) -> bool:
+        return self.time_until_due() == 0.0
+
+    def drain(self) -> List[Settlement]:
+        """Take up to max_size settlements, oldest first."""
+        with self._lock:
+            batch, self._items = self._items[:self.max_size], self._items[self.max_size:]
+            self._opened_at = time.monotonic()
+            return batch
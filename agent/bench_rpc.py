@@ -0,0 +1,87 @@
+"""
+The Arbiter - RPC Transport Benchmark
+
+Measures JSON-RPC requests per second for the stock web3 HTTPProvider against
+the tuned transport (shared keep-alive pool, per-method timeouts, optional HTTP/2),
+using the agent's hot-loop call mix. Meant for a local node:
+
+    anvil &
+    python bench_rpc.py --url http://127.0.0.1:8545 --requests 5000 --concurrency 8
+"""
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
+
+from http_transport import TunedHTTPProvider
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def call_mix(address: str):
+    """The referee's steady-state calls: head, logs, reads, gas, nonce and receipt polls."""
+    return [
+        ("eth_blockNumber", []),
+        ("eth_getLogs", [{"fromBlock": "earliest", "toBlock": "latest", "address": address}]),
+        ("eth_call", [{"to": address, "data": "0x"}, "latest"]),
+        ("eth_gasPrice", []),
+        ("eth_getTransactionCount", [address, "pending"]),
+        ("eth_getTransactionReceipt", ["0x" + "00" * 32]),
+    ]
+
+
+def run(provider, requests: int, concurrency: int, address: str):
+    mix = call_mix(address)
+    latencies = []
+
+    def one(i: int):
+        method, params = mix[i % len(mix)]
+        started = time.perf_counter()
+        provider.make_request(method, params)
+        latencies.append(time.perf_counter() - started)
+
+    # Warm the connection pool before timing
+    for i in range(concurrency):
+        one(i)
+    latencies.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8545")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=32)
+    parser.add_argument("--address", default=ZERO_ADDRESS, help="Contract to target with eth_call / eth_getLogs")
+    parser.add_argument("--http2", action="store_true", help="Also benchmark the HTTP/2 transport (needs httpx[http2])")
+    args = parser.parse_args()
+
+    variants = [
+        ("stock HTTPProvider", Web3.HTTPProvider(args.url)),
+        ("tuned keep-alive", TunedHTTPProvider(args.url, pool_size=args.pool_size)),
+    ]
+    if args.http2:
+        variants.append(("tuned HTTP/2", TunedHTTPProvider(args.url, pool_size=args.pool_size, http2=True)))
+
+    print(f"{args.requests} requests, {args.concurrency} threads against {args.url}")
+    for name, provider in variants:
+        result = run(provider, args.requests, args.concurrency, Web3.to_checksum_address(args.address))
+        print(f"  {name:<20} {result['rps']:8.0f} req/s   p50 {result['p50_ms']:6.2f} ms   p99 {result['p99_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+The Arbiter - Settlement Signing Benchmark
+
+Measures how long it takes to turn a settlement into a signed raw transaction,
+comparing the web3 path (contract.functions.settleMatch(...).build_transaction
+plus w3.eth.account.sign_transaction with the raw key) with the fast path
+(pre-encoded calldata plus the cached LocalAccount). Also counts the RPC calls
+each path makes before send_raw_transaction. Needs no node:
+
+    python bench_settle.py --iterations 2000
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+from collections import Counter
+
+from eth_account import Account
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from calldata import ArenaCalldata
+
+CONTRACT_ADDRESS = Web3.to_checksum_address("0x5FbDB2315678afecb367f032d93F642f64180aa3")
+WINNER = "0x6813Eb9362372EEF6200f3b1dbC3f819671cBA69"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+CHAIN_ID = 10143
+
+
+class CountingProvider(BaseProvider):
+    """Records every RPC method asked for; there is no node behind it."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def make_request(self, method, params):
+        self.calls[method] += 1
+        raise ConnectionError(f"{method} reached the network")
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return False
+
+
+def web3_path(w3, contract, private_key, address):
+    def build(i: int, winner: str, fees: dict) -> dict:
+        return contract.functions.settleMatch(i, winner, 42).build_transaction({
+            'from': address, 'nonce': i, 'gas': 350000, 'chainId': CHAIN_ID, **fees
+        })
+
+    def sign(tx: dict) -> bytes:
+        return w3.eth.account.sign_transaction(tx, private_key=private_key).rawTransaction
+    return build, sign
+
+
+def fast_path(contract, account):
+    calldata = ArenaCalldata(contract)
+
+    def build(i: int, winner: str, fees: dict) -> dict:
+        return {
+            'from': account.address, 'to': contract.address, 'value': 0,
+            'data': calldata.settle_match(i, winner, 42), 'nonce': i, 'gas': 350000,
+            'chainId': CHAIN_ID, **fees
+        }
+
+    def sign(tx: dict) -> bytes:
+        return account.sign_transaction(tx).rawTransaction
+    return build, sign
+
+
+def run(path, iterations: int, fees: dict):
+    build, sign = path
+    build_times, totals = [], []
+    for i in range(iterations):
+        winner = ZERO_ADDRESS if i % 4 == 0 else WINNER
+        started = time.perf_counter()
+        tx = build(i, winner, fees)
+        built = time.perf_counter()
+        sign(tx)
+        build_times.append(built - started)
+        totals.append(time.perf_counter() - started)
+    totals.sort()
+    return {
+        'tps': iterations / sum(totals),
+        'build_us': statistics.median(build_times) * 1e6,
+        'p50_us': statistics.median(totals) * 1e6,
+        'p99_us': totals[int(len(totals) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--legacy", action="store_true", help="Sign legacy gasPrice transactions instead of EIP-1559")
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Arena.json")) as f:
+        abi = json.load(f)["abi"]
+    provider = CountingProvider()
+    w3 = Web3(provider)
+    contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+    account = Account.create()
+    fees = {'gasPrice': 2 * 10 ** 9} if args.legacy else {'maxFeePerGas': 3 * 10 ** 9, 'maxPriorityFeePerGas': 10 ** 9}
+
+    paths = (("build_transaction", web3_path(w3, contract, account.key, account.address)),
+             ("pre-encoded", fast_path(contract, account)))
+    # Same nonce, fees and arguments must give the same bytes
+    for i, winner in ((1, WINNER), (2, ZERO_ADDRESS)):
+        raw = {path[1](path[0](i, winner, fees)) for _, path in paths}
+        assert len(raw) == 1, f"paths disagree for winner {winner}"
+
+    print(f"{args.iterations} settleMatch signatures ({'legacy' if args.legacy else 'EIP-1559'})")
+    for name, path in paths:
+        provider.calls.clear()
+        result = run(path, args.iterations, fees)
+        rpc = sum(provider.calls.values()) / args.iterations
+        print(f"  {name:<18} {result['tps']:8.0f} tx/s   build {result['build_us']:7.1f} us   "
+              f"p50 {result['p50_us']:7.1f} us   p99 {result['p99_us']:7.1f} us   {rpc:.1f} RPC/tx")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+The Arbiter - Block Receipt Follower
+
+Confirms transactions by following new blocks: each block's receipts come from
+one eth_getBlockReceipts call and are matched against the outstanding hashes,
+so confirmation costs one call per block however many transactions are in flight.
+web3 6.x has no wrapper for the method, so it is requested and formatted here.
+"""
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from web3 import Web3
+from web3._utils.method_formatters import receipt_formatter
+
+logger = logging.getLogger("Referee.Blocks")
+
+# JSON-RPC "method not found", and the messages nodes use when they lack the method
+METHOD_NOT_FOUND = -32601
+UNSUPPORTED_ERRORS = ("method not found", "does not exist", "not supported", "unknown rpc", "not available")
+
+
+def is_unsupported(exc: Exception) -> bool:
+    error = exc.args[0] if exc.args else None
+    if isinstance(error, dict) and error.get('code') == METHOD_NOT_FOUND:
+        return True
+    message = str(exc).lower()
+    return any(fragment in message for fragment in UNSUPPORTED_ERRORS)
+
+
+def _format(receipts: Optional[List[Any]]) -> Optional[List[Any]]:
+    # None: the node has not seen this block yet
+    return None if receipts is None else [receipt_formatter(receipt) for receipt in receipts]
+
+
+class BlockReceiptFollower:
+    """Block cursor plus a by-hash index of the receipts in the last `depth` blocks.
+
+    The index catches a tx that mined in a block fetched just before the tx was
+    tracked (it is broadcast before it is handed over). When the cursor falls more
+    than max_blocks_per_poll behind the head, or the node lacks eth_getBlockReceipts,
+    plan() returns None and the caller looks receipts up per transaction instead.
+    """
+
+    def __init__(self, depth: int = 8, max_blocks_per_poll: int = 50):
+        self.depth = depth
+        self.max_blocks_per_poll = max_blocks_per_poll
+        self.supported = True
+        self.next_block: Optional[int] = None
+        self._blocks: deque = deque()
+        self._by_hash: Dict[bytes, Any] = {}
+
+    def plan(self, head: int) -> Optional[range]:
+        """Blocks to fetch this poll, or None to fall back to per-transaction lookups."""
+        if not self.supported:
+            return None
+        if self.next_block is None:
+            self.next_block = max(0, head - self.depth + 1)
+        if head - self.next_block + 1 > self.max_blocks_per_poll:
+            logger.warning(f"Receipt follower is {head - self.next_block + 1} blocks behind. "
+                           f"Skipping to {head} and checking outstanding txs individually.")
+            self.next_block = head + 1
+            return None
+        return range(self.next_block, head + 1)
+
+    def fetch(self, w3: Web3, block: int) -> Optional[List[Any]]:
+        return _format(w3.manager.request_blocking("eth_getBlockReceipts", [hex(block)]))
+
+    async def afetch(self, w3, block: int) -> Optional[List[Any]]:
+        return _format(await w3.manager.coro_request("eth_getBlockReceipts", [hex(block)]))
+
+    def add(self, block: int, receipts: List[Any]):
+        hashes = [bytes(receipt['transactionHash']) for receipt in receipts]
+        for tx_hash, receipt in zip(hashes, receipts):
+            self._by_hash[tx_hash] = receipt
+        self._blocks.append(hashes)
+        while len(self._blocks) > self.depth:
+            for tx_hash in self._blocks.popleft():
+                self._by_hash.pop(tx_hash, None)
+        self.next_block = block + 1
+
+    def find(self, hashes: Iterable[bytes]) -> Optional[Any]:
+        for tx_hash in hashes:
+            receipt = self._by_hash.get(bytes(tx_hash))
+            if receipt is not None:
+                return receipt
+        return None
+
+    def give_up_if_unsupported(self, exc: Exception) -> bool:
+        """True (and block following is switched off for good) if exc says the node lacks the method."""
+        if not is_unsupported(exc):
+            return False
+        logger.warning(f"eth_getBlockReceipts unavailable ({exc}). Confirming receipts per transaction.")
+        self.supported = False
+        return True
+
+    def idle(self):
+        """Nothing outstanding: stop following until the next transaction is tracked."""
+        self.next_block = None
+        self._blocks.clear()
+        self._by_hash.clear()
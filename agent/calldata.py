@@ -0,0 +1,81 @@
+"""
+The Arbiter - Arena Calldata
+
+Encodes the referee's Arena calls directly. Selectors and every constant part
+of each call shape are computed once from the ABI, so a settlement's calldata
+is a few byte concatenations rather than a full web3 ABI resolution.
+"""
+from eth_utils import function_abi_to_4byte_selector, keccak, to_bytes
+from web3.contract import Contract
+
+ZERO_WORD = bytes(32)
+
+# Call shapes: gas use differs between them, so each gets its own gas-limit estimate
+SETTLE_WINNER = "settle_winner"
+SETTLE_DRAW = "settle_draw"
+SETTLE_SEEDED_WINNER = "settle_seeded_winner"
+SETTLE_SEEDED_DRAW = "settle_seeded_draw"
+WITHDRAW_FEES = "withdraw_fees"
+
+
+# Arena errors that fail a seeded settlement but leave the match settleable with
+# settleMatch: the join block left BLOCKHASH's window, or the seed was refused
+JOIN_BLOCK_UNAVAILABLE = keccak(text="JOIN_BLOCK_UNAVAILABLE()")[:4]
+INVALID_SEED = keccak(text="INVALID_SEED()")[:4]
+RECOVERABLE_SEED_ERRORS = frozenset((JOIN_BLOCK_UNAVAILABLE, INVALID_SEED))
+
+
+def settle_shape(winner: str, seeded: bool = False) -> str:
+    if seeded:
+        return SETTLE_SEEDED_DRAW if int(winner, 16) == 0 else SETTLE_SEEDED_WINNER
+    return SETTLE_DRAW if int(winner, 16) == 0 else SETTLE_WINNER
+
+
+def batch_shape(size: int, seeded: bool = False) -> str:
+    return f"settle_seeded_batch_{size}" if seeded else f"settle_batch_{size}"
+
+
+def is_seeded(shape: str) -> bool:
+    return shape in (SETTLE_SEEDED_WINNER, SETTLE_SEEDED_DRAW) or shape.startswith("settle_seeded_batch_")
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, 'big')
+
+
+def _address_word(address: str) -> bytes:
+    return bytes(12) + to_bytes(hexstr=address)
+
+
+class ArenaCalldata:
+    """Calldata builders for settleMatch, settleMatches, their WithSeed forms and withdrawFees."""
+
+    def __init__(self, contract: Contract):
+        self._codec = contract.w3.codec
+        self.settle_match_selector = function_abi_to_4byte_selector(contract.get_function_by_name("settleMatch").abi)
+        self.settle_matches_selector = function_abi_to_4byte_selector(contract.get_function_by_name("settleMatches").abi)
+        self.settle_match_with_seed_selector = function_abi_to_4byte_selector(
+            contract.get_function_by_name("settleMatchWithSeed").abi)
+        self.settle_matches_with_seed_selector = function_abi_to_4byte_selector(
+            contract.get_function_by_name("settleMatchesWithSeed").abi)
+        # No arguments: the whole payload is constant
+        self.withdraw_fees_data = function_abi_to_4byte_selector(contract.get_function_by_name("withdrawFees").abi)
+
+    def settle_match(self, match_id: int, winner: str, target_number: int) -> bytes:
+        """settleMatch(uint256,address,uint256): three static words after the selector."""
+        winner_word = ZERO_WORD if int(winner, 16) == 0 else _address_word(winner)
+        return self.settle_match_selector + _word(match_id) + winner_word + _word(target_number)
+
+    def settle_matches(self, match_ids, winners, targets) -> bytes:
+        return self.settle_matches_selector + self._codec.encode(
+            ['uint256[]', 'address[]', 'uint256[]'], [list(match_ids), list(winners), list(targets)]
+        )
+
+    def settle_match_with_seed(self, match_id: int, seed: bytes) -> bytes:
+        """settleMatchWithSeed(uint256,bytes32): two static words after the selector."""
+        return self.settle_match_with_seed_selector + _word(match_id) + seed
+
+    def settle_matches_with_seed(self, match_ids, seeds) -> bytes:
+        return self.settle_matches_with_seed_selector + self._codec.encode(
+            ['uint256[]', 'bytes32[]'], [list(match_ids), list(seeds)]
+        )
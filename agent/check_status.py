@@ -3,6 +3,8 @@ import os
 import json
 from dotenv import load_dotenv
 
+from multicall import MatchReader, MULTICALL3_ADDRESS
+
 load_dotenv()
 
 RPC_URL = os.getenv("RPC_URL", "https://testnet-rpc.monad.xyz")
@@ -13,6 +15,7 @@ with open("Arena.json", "r") as f:
 
 w3 = Web3(Web3.HTTPProvider(RPC_URL))
 contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=ABI)
+reader = MatchReader(w3, contract, os.getenv("MULTICALL_ADDRESS", MULTICALL3_ADDRESS))
 
 def check_matches():
     next_id = contract.functions.nextMatchId().call()
@@ -23,8 +26,8 @@ def check_matches():
     print(f"Next Match ID: {next_id}")
     print(f"Current Block: {current_block}")
     
-    for i in range(max(0, next_id - 5), next_id):
-        m = contract.functions.matches(i).call()
+    recent = reader.fetch(range(max(0, next_id - 5), next_id))
+    for i, m in sorted(recent.items()):
         # id, creator, opponent, stake, status, winner, lastUpdate, creatorGuess, opponentGuess, targetNumber
         status_map = {0: "Pending", 1: "Active", 2: "Settled", 3: "Cancelled"}
         last_update = m[6]
@@ -0,0 +1,196 @@
+"""
+The Arbiter - Background Receipt Confirmer
+
+Tracks every in-flight transaction on one thread so senders can move on to the
+next settlement instead of blocking on wait_for_transaction_receipt. Receipts
+are read a block at a time (block_receipts.py), falling back to per-tx lookups.
+"""
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from block_receipts import BlockReceiptFollower
+from metrics import RECEIPT_WAIT_SECONDS, TX_RESULTS, RPC_ERRORS
+
+logger = logging.getLogger("Referee.Confirmer")
+
+# Called with the receipt once mined, or with None if the tx was dropped / timed out.
+ReceiptCallback = Callable[[Optional[Any]], None]
+# Re-signs the tx at the same nonce with bumped fees and broadcasts it; returns the new hash (None if not sent).
+Replacer = Callable[[], Optional[bytes]]
+
+
+class ReceiptConfirmer:
+    """Polls receipts for all outstanding transactions and caps how many may be in flight."""
+
+    def __init__(self, w3: Web3, max_in_flight: int = 16, poll_interval: float = 1.0, timeout: float = 180.0,
+                 replace_after: float = 45.0, max_replacements: int = 3):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.replace_after = replace_after
+        self.max_replacements = max_replacements
+
+        self.blocks = BlockReceiptFollower()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._pending: Dict[bytes, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Set by the owner to learn about dropped transactions (nonce gap on chain).
+        self.on_dropped: Optional[Callable[[int], None]] = None
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def acquire_slot(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until fewer than max_in_flight transactions are outstanding."""
+        return self._slots.acquire(timeout=timeout)
+
+    def release_slot(self):
+        self._slots.release()
+
+    def track(self, tx_hash: bytes, nonce: int, callback: ReceiptCallback, replace: Optional[Replacer] = None,
+              earlier: Sequence[bytes] = ()):
+        """Hand a broadcast transaction (holding an acquired slot) to the confirmer.
+
+        With a replacer, a tx still unmined after replace_after seconds is re-sent at
+        the same nonce with higher fees; whichever version mines completes it. earlier
+        lists versions already sent at this nonce (e.g. by a previous run).
+        """
+        entry = self.new_entry(nonce, [*earlier, tx_hash], replace, time.monotonic())
+        entry['callback'] = callback
+        with self._lock:
+            self._pending[bytes(tx_hash)] = entry
+
+    # The policy below is shared with the async engine's confirmer, which tracks the same entries.
+
+    @staticmethod
+    def new_entry(nonce: int, hashes: Sequence[bytes], replace: Optional[Callable], sent_at: float) -> Dict[str, Any]:
+        return {'nonce': nonce, 'hashes': [bytes(h) for h in hashes], 'replace': replace,
+                'sent_at': sent_at, 'replaced_at': sent_at, 'replacements': 0}
+
+    def due(self, entry: Dict[str, Any], now: float) -> Tuple[bool, bool]:
+        """(timed_out, replace_due) for an entry whose receipt has not shown up."""
+        timed_out = now - entry['sent_at'] >= self.timeout
+        replace_due = bool(entry['replace']) and now - entry['replaced_at'] >= self.replace_after \
+            and entry['replacements'] < self.max_replacements
+        return timed_out, replace_due
+
+    def begin_replacement(self, entry: Dict[str, Any]):
+        entry['replaced_at'] = time.monotonic()
+        entry['replacements'] += 1
+
+    def end_replacement(self, entry: Dict[str, Any], new_hash: Optional[bytes], error: Optional[Exception] = None):
+        if error is not None:
+            # "nonce too low" here usually means an earlier version just mined
+            logger.warning(f"Fee-bump replacement for nonce {entry['nonce']} not sent: {error}")
+            return
+        if new_hash is not None:
+            entry['hashes'].append(bytes(new_hash))
+            TX_RESULTS.inc(result='replaced')
+            logger.warning(f"⛽ Nonce {entry['nonce']} stuck; replaced with {new_hash.hex()} "
+                           f"(attempt {entry['replacements']}/{self.max_replacements})")
+
+    def log_dropped(self, entry: Dict[str, Any]):
+        logger.error(f"❌ Tx {entry['hashes'][0].hex()} (nonce {entry['nonce']}) not mined after {self.timeout:.0f}s. "
+                     f"Treating as dropped.")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="receipt-confirmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain_timeout: float = 30.0):
+        """Give outstanding transactions up to drain_timeout to confirm, then stop."""
+        deadline = time.monotonic() + drain_timeout
+        while self.in_flight and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 2)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._poll_once()
+            except Exception as e:
+                RPC_ERRORS.inc(method='eth_getTransactionReceipt')
+                logger.error(f"Confirmer exception: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _poll_once(self):
+        with self._lock:
+            outstanding = list(self._pending.items())
+        if not outstanding:
+            self.blocks.idle()
+            return
+
+        receipts = self._collect_receipts(outstanding)
+        for tx_hash, entry in outstanding:
+            receipt = receipts[tx_hash]
+            if receipt is None:
+                timed_out, replace_due = self.due(entry, time.monotonic())
+                if (timed_out or replace_due) and self.blocks.supported:
+                    # Confirm directly before acting on a tx the block follower may have missed
+                    receipt = self._find_receipt(entry['hashes'])
+            if receipt is None:
+                if not timed_out:
+                    if replace_due:
+                        self._replace(entry)
+                    continue
+                self.log_dropped(entry)
+                if self.on_dropped:
+                    self.on_dropped(entry['nonce'])
+            self._finish(tx_hash, entry, receipt)
+
+    def _collect_receipts(self, outstanding) -> Dict[bytes, Optional[Any]]:
+        """Receipts for every outstanding tx: one eth_getBlockReceipts per new block when possible."""
+        blocks = self.blocks.plan(self.w3.eth.block_number)
+        if blocks is not None:
+            try:
+                for block in blocks:
+                    receipts = self.blocks.fetch(self.w3, block)
+                    if receipts is None:
+                        break
+                    self.blocks.add(block, receipts)
+                return {tx_hash: self.blocks.find(entry['hashes']) for tx_hash, entry in outstanding}
+            except Exception as e:
+                if not self.blocks.give_up_if_unsupported(e):
+                    raise
+        return {tx_hash: self._find_receipt(entry['hashes']) for tx_hash, entry in outstanding}
+
+    def _find_receipt(self, hashes) -> Optional[Any]:
+        for tx_hash in hashes:
+            try:
+                return self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _replace(self, entry: Dict[str, Any]):
+        self.begin_replacement(entry)
+        try:
+            new_hash = entry['replace']()
+        except Exception as e:
+            self.end_replacement(entry, None, e)
+            return
+        self.end_replacement(entry, new_hash)
+
+    def _finish(self, tx_hash: bytes, entry: Dict[str, Any], receipt: Optional[Any]):
+        with self._lock:
+            self._pending.pop(tx_hash, None)
+        self._slots.release()
+        RECEIPT_WAIT_SECONDS.observe(time.monotonic() - entry['sent_at'])
+        TX_RESULTS.inc(result='dropped' if receipt is None else 'success' if receipt.status == 1 else 'reverted')
+        try:
+            entry['callback'](receipt)
+        except Exception as e:
+            logger.error(f"Receipt callback failed for {tx_hash.hex()}: {e}")
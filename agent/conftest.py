@@ -0,0 +1,2 @@
+# test_agent.py is a manual script against a live Anvil node: it connects and sends at import
+collect_ignore = ["test_agent.py"]
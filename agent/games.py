@@ -0,0 +1,81 @@
+"""
+The Arbiter - Game Engines
+
+Decides match outcomes for each game type Arena can store on a match
+(Utils.Match.gameType). An engine takes a whole batch of matches of its type
+and returns a (winner, target) pair for each, so a burst of joins is decided
+in one pass rather than match by match. Engines are looked up by game type;
+register_engine() adds new ones.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from targets import TargetSource
+
+logger = logging.getLogger("Referee.Games")
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Arena.GUESSING_GAME, the type of every match made with createMatch
+GUESSING_GAME = 0
+
+MatchBatch = List[Tuple[int, Dict[str, Any]]]
+Outcome = Tuple[str, int]
+
+
+class GameEngine(ABC):
+    """Decides every match of one game type. Records are complete MatchStore records."""
+
+    game_type: int
+    name: str
+    # True when Arena can derive the outcome itself (settleMatchWithSeed)
+    verifiable = False
+
+    def __init__(self, targets: TargetSource):
+        self.targets = targets
+
+    @abstractmethod
+    def evaluate(self, matches: MatchBatch) -> List[Outcome]:
+        """(winner, target) for each (match_id, record), in order. The winner is ZERO_ADDRESS on a draw."""
+
+
+class GuessingGame(GameEngine):
+    """The guess closest to the match's target number wins; equal distances draw."""
+
+    game_type = GUESSING_GAME
+    name = "guessing"
+    verifiable = True
+
+    def evaluate(self, matches: MatchBatch) -> List[Outcome]:
+        count = len(matches)
+        # Target derivation hashes per match; the comparison runs over the whole batch
+        targets = np.fromiter((self.targets.target(match_id, record) for match_id, record in matches),
+                              dtype=np.int64, count=count)
+        creator_guesses = np.fromiter((record['creator_guess'] for _, record in matches), dtype=np.int64, count=count)
+        opponent_guesses = np.fromiter((record['opponent_guess'] for _, record in matches), dtype=np.int64, count=count)
+
+        # -1: creator closer, 1: opponent closer, 0: draw
+        closer = np.sign(np.abs(creator_guesses - targets) - np.abs(opponent_guesses - targets))
+        return [
+            (record['creator'] if side < 0 else record['opponent'] if side > 0 else ZERO_ADDRESS, target)
+            for (_, record), side, target in zip(matches, closer.tolist(), targets.tolist())
+        ]
+
+
+ENGINES: Dict[int, Callable[[TargetSource], GameEngine]] = {
+    GUESSING_GAME: GuessingGame,
+}
+
+
+def register_engine(game_type: int, factory: Callable[[TargetSource], GameEngine]):
+    """Makes matches of game_type be decided by factory(targets). Enable the type on Arena with setGameType."""
+    ENGINES[game_type] = factory
+
+
+def load_engines(targets: TargetSource) -> Dict[int, GameEngine]:
+    engines = {game_type: factory(targets) for game_type, factory in ENGINES.items()}
+    logger.info("Game engines: " + ", ".join(f"{game_type} ({engine.name})" for game_type, engine in sorted(engines.items())))
+    return engines
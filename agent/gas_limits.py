@@ -0,0 +1,83 @@
+"""
+The Arbiter - Gas Limit Cache
+
+Estimates the gas limit once per call shape (winner vs draw settlement, batch
+size, fee withdrawal) and reuses it with a safety margin. A shape whose
+transaction reverts or runs out of gas is re-estimated on its next use.
+"""
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("Referee.GasLimit")
+
+# Fallback gas limits, used only when estimation for a call shape fails.
+# settleMatches gets a fixed overhead plus a per-match allowance.
+SETTLE_GAS = 350000
+WITHDRAW_GAS = 200000
+BATCH_BASE_GAS = 60000
+BATCH_GAS_PER_MATCH = 120000
+
+
+class GasLimitCache:
+    """Per-shape gas limits: estimate × margin + headroom, with a fixed fallback when estimation fails.
+
+    The headroom covers cold/zero-to-nonzero storage writes (about 22k gas) that the
+    estimated call may not have paid but a later call of the same shape will. A
+    batch can hit that once per match, so its headroom is per settled match (units).
+    """
+
+    def __init__(self, margin: float = 1.25, headroom: int = 25000):
+        self.margin = margin
+        self.headroom = headroom
+        self._limits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _with_margin(self, estimate: int, units: int = 1) -> int:
+        return int(estimate * self.margin) + self.headroom * units
+
+    def cached(self, shape: str) -> Optional[int]:
+        with self._lock:
+            return self._limits.get(shape)
+
+    def _store(self, shape: str, estimate: int, units: int = 1) -> int:
+        limit = self._with_margin(estimate, units)
+        with self._lock:
+            self._limits[shape] = limit
+        logger.info(f"⛽ Gas limit for {shape}: {limit} (estimated {estimate})")
+        return limit
+
+    def get(self, shape: str, estimate: Callable[[], int], fallback: int, units: int = 1) -> int:
+        """Cached limit for the shape, estimating it on first use. units: matches the call settles."""
+        limit = self.cached(shape)
+        if limit is not None:
+            return limit
+        try:
+            return self._store(shape, estimate(), units)
+        except Exception as e:
+            # Usually the sample call itself would revert; don't cache anything from it
+            logger.warning(f"Gas estimate for {shape} failed ({e}). Using {fallback}.")
+            return fallback
+
+    async def aget(self, shape: str, estimate: Callable[[], Awaitable[int]], fallback: int, units: int = 1) -> int:
+        """get() with an async estimator."""
+        limit = self.cached(shape)
+        if limit is not None:
+            return limit
+        try:
+            return self._store(shape, await estimate(), units)
+        except Exception as e:
+            logger.warning(f"Gas estimate for {shape} failed ({e}). Using {fallback}.")
+            return fallback
+
+    def invalidate(self, shape: str):
+        with self._lock:
+            self._limits.pop(shape, None)
+
+    def observe(self, shape: str, gas_limit: int, receipt: Optional[Any]):
+        """Feeds back a receipt: a revert or an out-of-gas drops the cached limit."""
+        if receipt is None or receipt.status == 1:
+            return
+        reason = "ran out of gas" if receipt.gasUsed >= gas_limit else "reverted"
+        logger.warning(f"⛽ {shape} tx {reason} at gas limit {gas_limit}. Re-estimating on next use.")
+        self.invalidate(shape)
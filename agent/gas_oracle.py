@@ -0,0 +1,141 @@
+"""
+The Arbiter - Gas Price Oracle
+
+One fee quote shared by every sender, refreshed at most once per block (or per
+TTL when no block has been observed). Prices are EIP-1559 fees from a rolling
+eth_feeHistory window, with a legacy gasPrice fallback for nodes without it.
+Also owns the fee-bump policy for replacing stuck transactions.
+"""
+import time
+import asyncio
+import logging
+import threading
+from statistics import median
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("Referee.Gas")
+
+Fees = Dict[str, int]
+
+
+class GasOracle:
+    """Caches fee parameters for a Web3 or AsyncWeb3 instance (fees() / afees())."""
+
+    def __init__(self, w3, ttl: float = 12.0, history_blocks: int = 20, percentile: float = 50,
+                 base_fee_multiplier: float = 2.0, legacy_multiplier: float = 1.25, bump_ratio: float = 0.125,
+                 eip1559: bool = True):
+        self.w3 = w3
+        self.ttl = ttl
+        self.history_blocks = history_blocks
+        self.percentile = percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.legacy_multiplier = legacy_multiplier
+        self.bump_ratio = bump_ratio
+        self.eip1559 = eip1559
+
+        self._fees: Optional[Fees] = None
+        self._fetched_at = 0.0
+        self._fetched_block: Optional[int] = None
+        self._head: Optional[int] = None
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def for_w3(self, w3) -> "GasOracle":
+        """A fresh oracle with the same policy, bound to another client (e.g. the async engine's)."""
+        return GasOracle(w3, self.ttl, self.history_blocks, self.percentile, self.base_fee_multiplier,
+                         self.legacy_multiplier, self.bump_ratio, self.eip1559)
+
+    def observe_block(self, block_number: int):
+        """Tell the oracle about a new head; the next quote after it is refreshed."""
+        if self._head is None or block_number > self._head:
+            self._head = block_number
+
+    def _stale(self) -> bool:
+        if self._fees is None or time.monotonic() - self._fetched_at > self.ttl:
+            return True
+        return self._head is not None and self._head != self._fetched_block
+
+    def _store(self, fees: Fees) -> Fees:
+        self._fees = fees
+        self._fetched_at = time.monotonic()
+        self._fetched_block = self._head
+        return fees
+
+    @staticmethod
+    def _read_history(history) -> Tuple[Optional[int], Optional[int]]:
+        """(next block's base fee, median tip over the window); None where the window has no data."""
+        base_fees = history.get('baseFeePerGas') or []
+        # Last entry is the base fee of the next block
+        base_fee = base_fees[-1] if base_fees and base_fees[-1] else None
+        rewards = [block[0] for block in (history.get('reward') or []) if block and block[0] > 0]
+        return base_fee, (int(median(rewards)) if rewards else None)
+
+    def _eip1559(self, base_fee: int, priority: int) -> Fees:
+        return {
+            'maxFeePerGas': int(base_fee * self.base_fee_multiplier) + priority,
+            'maxPriorityFeePerGas': priority,
+        }
+
+    def _legacy(self, gas_price: int) -> Fees:
+        return {'gasPrice': int(gas_price * self.legacy_multiplier)}
+
+    def _disable_eip1559(self, reason: str):
+        logger.warning(f"eth_feeHistory unusable ({reason}). Falling back to legacy gasPrice.")
+        self.eip1559 = False
+
+    def fees(self) -> Fees:
+        """Fee fields to merge into a transaction dict."""
+        with self._lock:
+            if not self._stale():
+                return dict(self._fees)
+            if self.eip1559:
+                try:
+                    base_fee, priority = self._read_history(
+                        self.w3.eth.fee_history(self.history_blocks, 'latest', [self.percentile]))
+                    if base_fee is not None:
+                        if priority is None:
+                            priority = self.w3.eth.max_priority_fee
+                        return dict(self._store(self._eip1559(base_fee, priority)))
+                    self._disable_eip1559("no base fee")
+                except Exception as e:
+                    if self._fees is not None:
+                        logger.warning(f"Fee refresh failed ({e}). Reusing last quote.")
+                        return dict(self._fees)
+                    self._disable_eip1559(str(e))
+            return dict(self._store(self._legacy(self.w3.eth.gas_price)))
+
+    async def afees(self) -> Fees:
+        """AsyncWeb3 counterpart of fees()."""
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if not self._stale():
+                return dict(self._fees)
+            if self.eip1559:
+                try:
+                    base_fee, priority = self._read_history(
+                        await self.w3.eth.fee_history(self.history_blocks, 'latest', [self.percentile]))
+                    if base_fee is not None:
+                        if priority is None:
+                            priority = await self.w3.eth.max_priority_fee
+                        return dict(self._store(self._eip1559(base_fee, priority)))
+                    self._disable_eip1559("no base fee")
+                except Exception as e:
+                    if self._fees is not None:
+                        logger.warning(f"Fee refresh failed ({e}). Reusing last quote.")
+                        return dict(self._fees)
+                    self._disable_eip1559(str(e))
+            return dict(self._store(self._legacy(await self.w3.eth.gas_price)))
+
+    def bump(self, previous: Fees, current: Optional[Fees] = None) -> Fees:
+        """Fees for a same-nonce replacement.
+
+        Every field rises by at least bump_ratio (nodes reject replacements under
+        ~10%), and never lands below the current market quote.
+        """
+        current = current or {}
+        factor = 1 + self.bump_ratio
+        bumped = {field: max(int(value * factor) + 1, current.get(field, 0)) for field, value in previous.items()}
+        if 'maxPriorityFeePerGas' in bumped:
+            bumped['maxFeePerGas'] = max(bumped['maxFeePerGas'], bumped['maxPriorityFeePerGas'])
+        return bumped
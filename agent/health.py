@@ -0,0 +1,110 @@
+"""
+The Arbiter - Liveness and Readiness
+
+Tracks scan-loop heartbeats, block lag, the RPC error rate and the settlement
+backlog, and checks them against configurable SLOs for /health and /ready.
+"""
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import SCAN_LAG
+
+# Checks that mean the loop itself is stuck; the rest only mean "don't route work here yet".
+# Lag is readiness only: a node catching up on a long backfill is behind, not dead.
+LIVENESS_CHECKS = ('heartbeat_age_seconds',)
+
+
+class HealthMonitor:
+    """Collects loop and RPC signals and evaluates them against SLO limits."""
+
+    def __init__(self, max_heartbeat_age: float = 60.0, max_lag: int = 200, max_error_rate: float = 0.25,
+                 max_backlog: int = 64, window: float = 300.0, min_calls: int = 20):
+        self.max_heartbeat_age = max_heartbeat_age
+        self.max_lag = max_lag
+        self.max_error_rate = max_error_rate
+        self.max_backlog = max_backlog
+        self.window = window
+        self.min_calls = min_calls
+
+        self._lock = threading.Lock()
+        # Startup counts as a heartbeat so the node gets one full SLO window to come up
+        self.last_heartbeat = time.monotonic()
+        self.lag: Optional[int] = None
+        self._calls: deque = deque()  # (timestamp, ok)
+
+        # Set by the owner: settlements queued or awaiting a receipt.
+        self.backlog: Callable[[], int] = lambda: 0
+
+    def heartbeat(self, lag: int):
+        """Called per completed scan cycle, and per backfill segment, with head minus the checkpoint."""
+        self.last_heartbeat = time.monotonic()
+        self.lag = lag
+        SCAN_LAG.set(lag)
+
+    def record_rpc(self, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, ok))
+            while self._calls and now - self._calls[0][0] > self.window:
+                self._calls.popleft()
+
+    def error_rate(self) -> Tuple[float, int]:
+        """Failed share of RPC calls in the trailing window, and the number of calls."""
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0][0] > self.window:
+                self._calls.popleft()
+            total = len(self._calls)
+            failed = sum(1 for _, ok in self._calls if not ok)
+        return (failed / total if total else 0.0), total
+
+    def checks(self) -> Dict[str, Dict[str, Any]]:
+        rate, calls = self.error_rate()
+        try:
+            backlog = self.backlog()
+        except Exception:
+            backlog = None
+        age = time.monotonic() - self.last_heartbeat
+        return {
+            'heartbeat_age_seconds': {'value': round(age, 1), 'limit': self.max_heartbeat_age,
+                                      'ok': age <= self.max_heartbeat_age},
+            'lag_blocks': {'value': self.lag, 'limit': self.max_lag,
+                           'ok': self.lag is None or self.lag <= self.max_lag},
+            # Too few calls to judge is not a breach
+            'rpc_error_rate': {'value': round(rate, 3), 'limit': self.max_error_rate, 'calls': calls,
+                               'ok': calls < self.min_calls or rate <= self.max_error_rate},
+            'settlement_backlog': {'value': backlog, 'limit': self.max_backlog,
+                                   'ok': backlog is not None and backlog <= self.max_backlog},
+        }
+
+    def status(self, readiness: bool) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
+        """(ok, checks). Liveness only fails on LIVENESS_CHECKS; readiness fails on any breach."""
+        checks = self.checks()
+        relevant = checks if readiness else {name: checks[name] for name in LIVENESS_CHECKS}
+        return all(check['ok'] for check in relevant.values()), checks
+
+    def rpc_middleware(self, make_request, w3):
+        """web3 middleware that feeds every request's outcome into the error rate."""
+        def middleware(method, params):
+            try:
+                response = make_request(method, params)
+            except Exception:
+                self.record_rpc(False)
+                raise
+            self.record_rpc('error' not in response)
+            return response
+        return middleware
+
+    async def async_rpc_middleware(self, make_request, w3):
+        """AsyncWeb3 counterpart of rpc_middleware."""
+        async def middleware(method, params):
+            try:
+                response = await make_request(method, params)
+            except Exception:
+                self.record_rpc(False)
+                raise
+            self.record_rpc('error' not in response)
+            return response
+        return middleware
@@ -0,0 +1,171 @@
+"""
+The Arbiter - Tuned HTTP Transport
+
+HTTP providers that share one keep-alive connection pool across every agent
+thread, apply per-method timeouts, and can speak HTTP/2 when httpx is installed.
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncHTTPProvider, HTTPProvider
+
+try:
+    import httpx  # optional: pip install "httpx[http2]"
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger("Referee.HTTP")
+
+# Read timeouts (seconds) for methods whose cost differs from a plain state read
+DEFAULT_METHOD_TIMEOUTS = {
+    "eth_getLogs": 30.0,
+    "eth_getBlockReceipts": 30.0,
+    "eth_call": 10.0,
+    "eth_sendRawTransaction": 10.0,
+    "eth_getTransactionReceipt": 5.0,
+    "eth_blockNumber": 5.0,
+    "eth_gasPrice": 5.0,
+    "eth_getTransactionCount": 5.0,
+}
+
+
+def parse_method_timeouts(spec: str) -> Dict[str, float]:
+    """Parses 'eth_getLogs=20,eth_call=5' into {method: seconds}."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        method, _, seconds = item.partition("=")
+        timeouts[method.strip()] = float(seconds)
+    return timeouts
+
+
+def _http2_available(requested: bool) -> bool:
+    if requested and httpx is None:
+        logger.warning("RPC_HTTP2 is set but httpx is not installed. Using HTTP/1.1 keep-alive.")
+    return requested and httpx is not None
+
+
+class _TimeoutPolicy:
+    def __init__(self, timeout: float, connect_timeout: float, method_timeouts: Optional[Dict[str, float]]):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.method_timeouts = dict(DEFAULT_METHOD_TIMEOUTS, **(method_timeouts or {}))
+
+    def for_method(self, method: str) -> Tuple[float, float]:
+        """(connect, read) timeout for one JSON-RPC method."""
+        return self.connect_timeout, self.method_timeouts.get(method, self.timeout)
+
+
+class TunedHTTPProvider(HTTPProvider):
+    """HTTPProvider with a shared, bounded keep-alive pool and per-method timeouts.
+
+    Stock HTTPProvider caches one requests.Session per thread, so backfill workers,
+    the confirmer and the main loop each hold separate connections. This provider
+    uses one session (or one httpx HTTP/2 client) for all of them.
+    """
+
+    def __init__(self, endpoint_uri: str, pool_size: int = 32, timeout: float = 10.0,
+                 connect_timeout: float = 3.0, method_timeouts: Optional[Dict[str, float]] = None,
+                 http2: bool = False):
+        super().__init__(endpoint_uri)
+        self.timeouts = _TimeoutPolicy(timeout, connect_timeout, method_timeouts)
+        self.http2 = _http2_available(http2)
+
+        if self.http2:
+            self.client = httpx.Client(
+                http2=True, headers=self.get_request_headers(),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            )
+        else:
+            self.session = requests.Session()
+            self.session.headers.update(self.get_request_headers())
+            # Retries stay with web3's http_retry_request middleware
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def __str__(self) -> str:
+        return f"RPC connection {self.endpoint_uri} ({'HTTP/2' if self.http2 else 'HTTP/1.1 keep-alive'})"
+
+    def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        connect, read = self.timeouts.for_method(method)
+        if self.http2:
+            response = self.client.post(self.endpoint_uri, content=data, timeout=httpx.Timeout(read, connect=connect))
+        else:
+            response = self.session.post(self.endpoint_uri, data=data, timeout=(connect, read))
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+class TunedAsyncHTTPProvider(AsyncHTTPProvider):
+    """AsyncHTTPProvider counterpart: one bounded aiohttp (or httpx HTTP/2) pool, per-method timeouts."""
+
+    def __init__(self, endpoint_uri: str, pool_size: int = 32, timeout: float = 10.0,
+                 connect_timeout: float = 3.0, method_timeouts: Optional[Dict[str, float]] = None,
+                 http2: bool = False):
+        super().__init__(endpoint_uri)
+        self.pool_size = pool_size
+        self.timeouts = _TimeoutPolicy(timeout, connect_timeout, method_timeouts)
+        self.http2 = _http2_available(http2)
+        self._client: Any = None
+        self._client_lock = asyncio.Lock()
+
+    def __str__(self) -> str:
+        return f"RPC connection {self.endpoint_uri} ({'HTTP/2' if self.http2 else 'HTTP/1.1 keep-alive'})"
+
+    async def _get_client(self):
+        # Created lazily: aiohttp sessions must be opened inside the running event loop
+        async with self._client_lock:
+            if self._client is None:
+                if self.http2:
+                    self._client = httpx.AsyncClient(
+                        http2=True, headers=self.get_request_headers(),
+                        limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                    )
+                else:
+                    self._client = aiohttp.ClientSession(
+                        headers=self.get_request_headers(),
+                        connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+                    )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await (self._client.aclose() if self.http2 else self._client.close())
+            self._client = None
+
+    async def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        connect, read = self.timeouts.for_method(method)
+        client = await self._get_client()
+        if self.http2:
+            response = await client.post(self.endpoint_uri, content=data, timeout=httpx.Timeout(read, connect=connect))
+            response.raise_for_status()
+            return self.decode_rpc_response(response.content)
+        timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        async with client.post(self.endpoint_uri, data=data, timeout=timeout) as response:
+            response.raise_for_status()
+            return self.decode_rpc_response(await response.read())
+
+
+def _settings_from_env() -> Dict[str, Any]:
+    return {
+        'pool_size': int(os.getenv("RPC_POOL_SIZE", "32")),
+        'timeout': float(os.getenv("RPC_TIMEOUT", "10")),
+        'connect_timeout': float(os.getenv("RPC_CONNECT_TIMEOUT", "3")),
+        'method_timeouts': parse_method_timeouts(os.getenv("RPC_METHOD_TIMEOUTS", "")),
+        'http2': os.getenv("RPC_HTTP2", "").lower() in ("1", "true", "yes"),
+    }
+
+
+def http_provider_from_env(endpoint_uri: str) -> TunedHTTPProvider:
+    return TunedHTTPProvider(endpoint_uri, **_settings_from_env())
+
+
+def async_http_provider_from_env(endpoint_uri: str) -> TunedAsyncHTTPProvider:
+    return TunedAsyncHTTPProvider(endpoint_uri, **_settings_from_env())
@@ -0,0 +1,148 @@
+"""
+The Arbiter - Leader Lease
+
+Lets several agents for the same referee run side by side with one active:
+the lease holder scans and settles, the others stand by on the same state DB
+and take over when the lease frees up. Backends are looked up by the scheme
+of LEADER_LEASE ("sqlite:leader.db", "file:referee.lock"); register_backend()
+adds others.
+"""
+import os
+import time
+import socket
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+
+logger = logging.getLogger("Referee.Leader")
+
+
+class LeadershipLost(Exception):
+    """The lease lapsed mid-cycle: whatever the cycle was about to sign or commit is the new leader's."""
+
+
+class LeaderLease(ABC):
+    """One named lease; hold() is called every cycle by every candidate, and again before signing or committing."""
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._renewed_at = float('-inf')
+
+    def hold(self) -> bool:
+        """try_acquire(), renewing at most every ttl/3 while held so it can guard every sign and commit.
+
+        A renewal younger than ttl/3 leaves at least two thirds of the ttl before anyone
+        else can take the lease.
+        """
+        if time.monotonic() - self._renewed_at < self.ttl / 3:
+            return True
+        held = self.try_acquire()
+        self._renewed_at = time.monotonic() if held else float('-inf')
+        return held
+
+    @abstractmethod
+    def try_acquire(self) -> bool:
+        """Takes the lease if it is free, or renews it if already held. False while another node holds it."""
+
+    @abstractmethod
+    def release(self):
+        """Gives the lease up if this node holds it."""
+
+
+class SQLiteLease(LeaderLease):
+    """Expiring lease row: a leader that hangs or dies loses it after ttl seconds."""
+
+    def __init__(self, path: str, name: str, ttl: float):
+        super().__init__(name, ttl)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS leader_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT,
+                expires_at REAL
+            )
+        """)
+
+    def try_acquire(self) -> bool:
+        now = time.time()
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT holder, expires_at FROM leader_leases WHERE name = ?",
+                                      (self.name,)).fetchone()
+                held = row is None or row[0] == self.holder or row[1] <= now
+                if held:
+                    self.db.execute("INSERT OR REPLACE INTO leader_leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                                    (self.name, self.holder, now + self.ttl))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return held
+
+    def release(self):
+        self._renewed_at = float('-inf')
+        with self._lock:
+            self.db.execute("DELETE FROM leader_leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+
+
+class FileLease(LeaderLease):
+    """Exclusive flock on a file: freed by the OS the moment the leader's process exits.
+
+    A leader that hangs without exiting keeps the lock; use the SQLite backend where
+    that matters. POSIX only.
+    """
+
+    def __init__(self, path: str, name: str, ttl: float):
+        super().__init__(name, ttl)
+        self.path = path
+        self._file = None
+
+    def try_acquire(self) -> bool:
+        import fcntl
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{self.holder}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        self._renewed_at = float('-inf')
+        if self._file is not None:
+            # Closing the descriptor drops the flock
+            self._file.close()
+            self._file = None
+
+
+BACKENDS: Dict[str, Callable[[str, str, float], LeaderLease]] = {
+    "sqlite": SQLiteLease,
+    "file": FileLease,
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str, str, float], LeaderLease]):
+    """Makes LEADER_LEASE="<scheme>:<location>" build factory(location, name, ttl)."""
+    BACKENDS[scheme] = factory
+
+
+def lease_from_spec(spec: str, name: str, ttl: float) -> LeaderLease:
+    scheme, _, location = spec.partition(":")
+    if scheme not in BACKENDS or not location:
+        raise ValueError(f"LEADER_LEASE must be <backend>:<location> with backend in {sorted(BACKENDS)}, got {spec!r}")
+    return BACKENDS[scheme](location, name, ttl)
@@ -0,0 +1,82 @@
+"""
+The Arbiter - In-Memory Match Index
+
+Arena hands out dense, sequential match IDs (nextMatchId++), so per-match
+status fits in a bitmap: two bits per match, about 250 KB per million matches.
+"""
+import threading
+from typing import Iterable
+
+PENDING = 1
+SETTLED = 2
+
+
+class MatchIndex:
+    """Thread-safe bitmap of match IDs known to be pending or settled.
+
+    "Settled" covers every terminal outcome, including matches the contract skipped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._settled = bytearray()
+
+    def _ensure(self, match_id: int):
+        needed = (match_id >> 3) + 1
+        if needed > len(self._pending):
+            # Grow geometrically so a long run of new IDs doesn't reallocate per match
+            grow = max(needed, len(self._pending) * 2) - len(self._pending)
+            self._pending.extend(bytes(grow))
+            self._settled.extend(bytes(grow))
+
+    @staticmethod
+    def _test(bits: bytearray, match_id: int) -> bool:
+        byte = match_id >> 3
+        return byte < len(bits) and bool(bits[byte] & (1 << (match_id & 7)))
+
+    def load(self, rows: Iterable):
+        """Bulk-load (match_id, status) rows from processed_matches.
+
+        Pending rows from an earlier run are left out; the agent re-claims those whose
+        transaction is still in the outbox, and the rest get re-evaluated.
+        """
+        with self._lock:
+            for match_id, status in rows:
+                if status in ('Settled', 'Skipped'):
+                    self._set(match_id, SETTLED)
+
+    def _set(self, match_id: int, state: int):
+        self._ensure(match_id)
+        byte, bit = match_id >> 3, 1 << (match_id & 7)
+        if state == SETTLED:
+            self._settled[byte] |= bit
+            self._pending[byte] &= ~bit
+        elif state == PENDING:
+            self._pending[byte] |= bit
+            self._settled[byte] &= ~bit
+        else:
+            self._pending[byte] &= ~bit
+            self._settled[byte] &= ~bit
+
+    def mark_pending(self, match_id: int):
+        with self._lock:
+            self._set(match_id, PENDING)
+
+    def mark_settled(self, match_id: int):
+        with self._lock:
+            self._set(match_id, SETTLED)
+
+    def clear(self, match_id: int):
+        with self._lock:
+            self._set(match_id, 0)
+
+    def is_settled(self, match_id: int) -> bool:
+        return self._test(self._settled, match_id)
+
+    def is_pending(self, match_id: int) -> bool:
+        return self._test(self._pending, match_id)
+
+    def is_known(self, match_id: int) -> bool:
+        """Settled or already has a settlement in flight."""
+        return self.is_settled(match_id) or self.is_pending(match_id)
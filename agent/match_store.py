@@ -0,0 +1,167 @@
+"""
+The Arbiter - Event-Sourced Match Store
+
+Rebuilds each match's state from Arena's own logs (MatchCreated, MatchJoined,
+MatchCancelled, MatchSettled, EmergencyClaim) so settlement decisions need no
+matches() read. Open matches are cached in memory; every match is persisted
+to the agent's SQLite database.
+"""
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Utils.MatchStatus enum order, for hydrating from a matches() struct
+CHAIN_STATUS = {0: 'Pending', 1: 'Active', 2: 'Settled', 3: 'Cancelled', 4: 'Settled'}
+OPEN_STATUSES = ('Pending', 'Active')
+COLUMNS = ("match_id, creator, stake, creator_guess, opponent, opponent_guess, status, join_block, join_hash, seed_epoch, "
+           "game_type, event_block")
+
+
+class MatchStore:
+    """Local, log-derived view of every match the scanner has seen."""
+
+    def __init__(self, db: sqlite3.Connection, lock: threading.RLock):
+        self.db = db
+        self._lock = lock
+        self._open: Dict[int, Dict[str, Any]] = {}
+
+        with self._lock:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    match_id INTEGER PRIMARY KEY,
+                    creator TEXT,
+                    stake TEXT,
+                    creator_guess INTEGER,
+                    opponent TEXT,
+                    opponent_guess INTEGER,
+                    status TEXT,
+                    join_block INTEGER,
+                    join_hash TEXT,
+                    seed_epoch INTEGER,
+                    game_type INTEGER,
+                    event_block INTEGER
+                )
+            """)
+            # Databases created before the target-derivation, game-type and reorg columns; every
+            # match stored before game types existed is a guessing game (type 0)
+            columns = {row[1] for row in self.db.execute("PRAGMA table_info(matches)")}
+            for column, kind in (('join_block', 'INTEGER'), ('join_hash', 'TEXT'), ('seed_epoch', 'INTEGER'),
+                                 ('game_type', 'INTEGER DEFAULT 0'), ('event_block', 'INTEGER')):
+                if column not in columns:
+                    self.db.execute(f"ALTER TABLE matches ADD COLUMN {column} {kind}")
+            rows = self.db.execute(
+                f"SELECT {COLUMNS} FROM matches WHERE status IN ('Pending', 'Active')"
+            ).fetchall()
+        for row in rows:
+            self._open[row[0]] = self._from_row(row)
+
+    @staticmethod
+    def _from_row(row: Tuple) -> Dict[str, Any]:
+        return {
+            'creator': row[1],
+            'stake': int(row[2]) if row[2] is not None else None,
+            'creator_guess': row[3],
+            'opponent': row[4],
+            'opponent_guess': row[5],
+            'status': row[6],
+            'join_block': row[7],
+            'join_hash': bytes.fromhex(row[8][2:]) if row[8] else None,
+            'seed_epoch': row[9],
+            'game_type': row[10],
+            # Block of the latest event applied, for rolling back a reorg
+            'event_block': row[11],
+        }
+
+    def _save(self, match_id: int, record: Dict[str, Any]):
+        with self._lock:
+            self.db.execute(
+                f"INSERT OR REPLACE INTO matches ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (match_id, record['creator'], None if record['stake'] is None else str(record['stake']),
+                 record['creator_guess'], record['opponent'], record['opponent_guess'], record['status'],
+                 record['join_block'], None if record['join_hash'] is None else '0x' + record['join_hash'].hex(),
+                 record['seed_epoch'], record['game_type'], record.get('event_block'))
+            )
+        if record['status'] in OPEN_STATUSES:
+            self._open[match_id] = record
+        else:
+            self._open.pop(match_id, None)
+
+    def get(self, match_id: int) -> Optional[Dict[str, Any]]:
+        record = self._open.get(match_id)
+        if record is not None:
+            return record
+        with self._lock:
+            row = self.db.execute(
+                f"SELECT {COLUMNS} FROM matches WHERE match_id = ?",
+                (match_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def active(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Joined matches not yet settled or cancelled, from the in-memory cache."""
+        return [(match_id, record) for match_id, record in list(self._open.items()) if record['status'] == 'Active']
+
+    def touched_after(self, block: int) -> List[int]:
+        """Matches with an event applied from a block above `block` (orphaned, after a reorg to it)."""
+        with self._lock:
+            return [row[0] for row in self.db.execute(
+                "SELECT match_id FROM matches WHERE event_block > ?", (block,)
+            ).fetchall()]
+
+    def _get_or_blank(self, match_id: int) -> Dict[str, Any]:
+        return dict(self.get(match_id) or {
+            'creator': None, 'stake': None, 'creator_guess': None,
+            'opponent': None, 'opponent_guess': None, 'status': 'Pending',
+            'join_block': None, 'join_hash': None, 'seed_epoch': None, 'game_type': None, 'event_block': None,
+        })
+
+    @staticmethod
+    def is_complete(record: Optional[Dict[str, Any]]) -> bool:
+        """True when both sides of the match are known locally."""
+        return bool(record) and all(record[key] is not None for key in ('creator', 'creator_guess', 'opponent', 'opponent_guess'))
+
+    def apply(self, event):
+        """Folds one decoded Arena event into the store."""
+        name, args = event['event'], event['args']
+        match_id = args['matchId']
+        record = self._get_or_blank(match_id)
+
+        if name == 'MatchCreated':
+            record.update(creator=args['creator'], stake=args['stake'], creator_guess=args['guess'],
+                          game_type=args['gameType'])
+        elif name == 'MatchJoined':
+            # The join block's hash is the target entropy (see targets.py)
+            record.update(opponent=args['opponent'], opponent_guess=args['guess'], join_block=event['blockNumber'],
+                          join_hash=bytes(event['blockHash']), seed_epoch=args['seedEpoch'])
+            if record['status'] == 'Pending':
+                record['status'] = 'Active'
+        elif name == 'MatchSettled':
+            record['status'] = 'Settled'
+        elif name in ('MatchCancelled', 'EmergencyClaim'):
+            record['status'] = 'Cancelled'
+        else:
+            return
+
+        record['event_block'] = event.get('blockNumber')
+        self._save(match_id, record)
+
+    def hydrate(self, match_id: int, match_data: Tuple, event_block: Optional[int] = None):
+        """Fills the store from an Arena.matches() struct (eth_call fallback, or reorg rollback).
+
+        The struct has the join block's number but not its hash, which is kept from
+        the MatchJoined event already applied.
+        """
+        known = self.get(match_id) or {}
+        self._save(match_id, {
+            'creator': match_data[1],
+            'stake': match_data[3],
+            'creator_guess': match_data[7],
+            'opponent': match_data[2],
+            'opponent_guess': match_data[8],
+            'status': CHAIN_STATUS.get(match_data[4], 'Pending'),
+            'join_block': match_data[10] or None,
+            'join_hash': known.get('join_hash'),
+            'seed_epoch': match_data[11],
+            'game_type': match_data[12],
+            'event_block': known.get('event_block') if event_block is None else event_block,
+        })
@@ -0,0 +1,262 @@
+"""
+The Arbiter - Prometheus Metrics
+
+A small, dependency-free registry of counters, gauges and histograms rendered in
+the Prometheus text exposition format, served from the agent's /metrics route.
+"""
+import time
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds; covers a fast local eth_call up to a slow receipt wait
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 180.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """The metric's sample lines in text exposition format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self._samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(_Metric):
+    """Set directly, or bound to a callback that is read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            return self._function()
+        with self._lock:
+            return self._value
+
+    def _samples(self) -> List[str]:
+        try:
+            value = self.value()
+        except Exception:
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class GaugeFamily(_Metric):
+    """Gauges by label set, each bound to a callback read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], **labels):
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            function = self._functions.get(self._key(labels))
+        return function() if function else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            functions = sorted(self._functions.items())
+        lines = []
+        for key, function in functions:
+            try:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(function())}")
+            except Exception:
+                continue
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall-clock duration of the block, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class RateGauge(Gauge):
+    """Number of events marked during the trailing window (e.g. settlements per minute)."""
+
+    def __init__(self, name: str, documentation: str, window: float = 60.0):
+        super().__init__(name, documentation)
+        self.window = window
+        self._events: deque = deque()
+
+    def mark(self, count: int = 1):
+        now = time.monotonic()
+        with self._lock:
+            self._events.extend([now] * count)
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._events and now - self._events[0] > self.window:
+            self._events.popleft()
+
+    def value(self) -> float:
+        with self._lock:
+            self._trim(time.monotonic())
+            return len(self._events)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Hot-path latencies
+GET_LOGS_SECONDS = REGISTRY.register(Histogram(
+    "arbiter_get_logs_seconds", "eth_getLogs latency per scanned chunk."))
+GET_LOGS_EVENTS = REGISTRY.register(Counter(
+    "arbiter_get_logs_events_total", "Arena events returned by eth_getLogs."))
+MATCH_READ_SECONDS = REGISTRY.register(Histogram(
+    "arbiter_match_read_seconds", "Arena.matches() read latency per round trip.", ("mode",)))
+MATCH_READS = REGISTRY.register(Counter(
+    "arbiter_match_reads_total", "Match structs read from Arena.matches().", ("mode",)))
+TX_SEND_SECONDS = REGISTRY.register(Histogram(
+    "arbiter_tx_send_seconds", "Build, sign and eth_sendRawTransaction latency (the send alone in the async pipeline)."))
+RECEIPT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "arbiter_receipt_wait_seconds", "Time from broadcast to receipt (or drop)."))
+DB_SECONDS = REGISTRY.register(Histogram(
+    "arbiter_db_seconds", "SQLite operation latency, including lock wait.", ("op",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)))
+RPC_ERRORS = REGISTRY.register(Counter(
+    "arbiter_rpc_errors_total", "Failed RPC calls by method.", ("method",)))
+
+# Outcomes
+TX_SENT = REGISTRY.register(Counter(
+    "arbiter_tx_sent_total", "Transactions broadcast."))
+TX_RESULTS = REGISTRY.register(Counter(
+    "arbiter_tx_results_total", "Broadcast transactions by outcome.", ("result",)))
+SETTLEMENTS = REGISTRY.register(Counter(
+    "arbiter_settlements_total", "Matches confirmed settled by this agent."))
+REORGS = REGISTRY.register(Counter(
+    "arbiter_reorgs_total", "Reorgs detected under the scan checkpoint."))
+PIPELINE_BLOCKED_SECONDS = REGISTRY.register(Counter(
+    "arbiter_pipeline_blocked_seconds_total", "Time spent waiting to put into a full stage queue, by stage.", ("stage",)))
+
+# Current state
+SCAN_LAG = REGISTRY.register(Gauge(
+    "arbiter_scan_lag_blocks", "Chain head minus the last fully scanned block."))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "arbiter_in_flight_transactions", "Broadcast transactions awaiting a receipt."))
+PIPELINE_QUEUE_DEPTH = REGISTRY.register(GaugeFamily(
+    "arbiter_pipeline_queue_depth", "Items waiting in each async pipeline stage's input queue.", ("stage",)))
+PIPELINE_QUEUE_CAPACITY = REGISTRY.register(GaugeFamily(
+    "arbiter_pipeline_queue_capacity", "Bound of each async pipeline stage's input queue.", ("stage",)))
+SETTLEMENTS_PER_MINUTE = REGISTRY.register(RateGauge(
+    "arbiter_settlements_per_minute", "Matches confirmed settled in the last 60 seconds."))
@@ -0,0 +1,132 @@
+"""
+The Arbiter - Batched Match Reads
+
+Fetches Arena.matches(id) for many IDs in one eth_call through Multicall3's
+aggregate3, falling back to one call per match where Multicall3 is unavailable.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from web3 import Web3
+from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+from metrics import MATCH_READ_SECONDS, MATCH_READS, RPC_ERRORS
+
+logger = logging.getLogger("Referee.Multicall")
+
+# Canonical Multicall3 deployment (same address on every chain that has it)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [{
+    "type": "function",
+    "name": "aggregate3",
+    "stateMutability": "payable",
+    "inputs": [{
+        "name": "calls", "type": "tuple[]",
+        "components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"}
+        ]
+    }],
+    "outputs": [{
+        "name": "returnData", "type": "tuple[]",
+        "components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"}
+        ]
+    }]
+}]
+
+
+class MatchReader:
+    """Reads Arena.matches() structs for a list of IDs in as few round trips as possible.
+
+    Works with either a Web3 or an AsyncWeb3 instance; use fetch() or afetch() accordingly.
+    """
+
+    def __init__(self, w3, contract, multicall_address: Optional[str] = MULTICALL3_ADDRESS, chunk_size: int = 200):
+        self.contract = contract
+        self.chunk_size = chunk_size
+        self.multicall = None
+        if multicall_address:
+            self.multicall = w3.eth.contract(address=Web3.to_checksum_address(multicall_address), abi=MULTICALL3_ABI)
+
+        matches_abi = contract.get_function_by_name("matches").abi
+        self._selector = bytes(Web3.keccak(text=f"matches({','.join(i['type'] for i in matches_abi['inputs'])})")[:4])
+        self._output_types = [o['type'] for o in matches_abi['outputs']]
+        self._codec = w3.codec
+
+    def _calls(self, match_ids: List[int]) -> List[Tuple[str, bool, bytes]]:
+        return [(self.contract.address, True, self._selector + match_id.to_bytes(32, 'big')) for match_id in match_ids]
+
+    def _decode(self, return_data: bytes) -> Tuple:
+        values = self._codec.decode(self._output_types, return_data)
+        return tuple(Web3.to_checksum_address(v) if t == 'address' else v for t, v in zip(self._output_types, values))
+
+    def _collect(self, match_ids: List[int], results) -> Dict[int, Tuple]:
+        out = {}
+        for match_id, (success, return_data) in zip(match_ids, results):
+            if success:
+                out[match_id] = self._decode(return_data)
+        return out
+
+    def _chunks(self, match_ids: Iterable[int]):
+        ids = list(dict.fromkeys(match_ids))
+        for i in range(0, len(ids), self.chunk_size):
+            yield ids[i:i + self.chunk_size]
+
+    def _on_multicall_error(self, e: Exception):
+        RPC_ERRORS.inc(method='eth_call')
+        if isinstance(e, (BadFunctionCallOutput, ContractLogicError)):
+            # No Multicall3 code at the configured address on this chain
+            logger.warning(f"Multicall3 unavailable ({e}). Falling back to per-match eth_call.")
+            self.multicall = None
+        else:
+            logger.warning(f"Multicall3 batch failed ({e}). Retrying chunk per match.")
+
+    def fetch(self, match_ids: Iterable[int]) -> Dict[int, Tuple]:
+        """Returns {match_id: matches(match_id)}; IDs whose call failed are omitted."""
+        out: Dict[int, Tuple] = {}
+        for chunk in self._chunks(match_ids):
+            if self.multicall is not None and len(chunk) > 1:
+                try:
+                    with MATCH_READ_SECONDS.time(mode='multicall'):
+                        results = self.multicall.functions.aggregate3(self._calls(chunk)).call()
+                    out.update(self._collect(chunk, results))
+                    MATCH_READS.inc(len(chunk), mode='multicall')
+                    continue
+                except Exception as e:
+                    self._on_multicall_error(e)
+            for match_id in chunk:
+                try:
+                    with MATCH_READ_SECONDS.time(mode='single'):
+                        out[match_id] = tuple(self.contract.functions.matches(match_id).call())
+                    MATCH_READS.inc(mode='single')
+                except Exception as e:
+                    RPC_ERRORS.inc(method='eth_call')
+                    logger.error(f"matches({match_id}) read failed: {e}")
+        return out
+
+    async def afetch(self, match_ids: Iterable[int]) -> Dict[int, Tuple]:
+        """AsyncWeb3 counterpart of fetch()."""
+        out: Dict[int, Tuple] = {}
+        for chunk in self._chunks(match_ids):
+            if self.multicall is not None and len(chunk) > 1:
+                try:
+                    with MATCH_READ_SECONDS.time(mode='multicall'):
+                        results = await self.multicall.functions.aggregate3(self._calls(chunk)).call()
+                    out.update(self._collect(chunk, results))
+                    MATCH_READS.inc(len(chunk), mode='multicall')
+                    continue
+                except Exception as e:
+                    self._on_multicall_error(e)
+            for match_id in chunk:
+                try:
+                    with MATCH_READ_SECONDS.time(mode='single'):
+                        out[match_id] = tuple(await self.contract.functions.matches(match_id).call())
+                    MATCH_READS.inc(mode='single')
+                except Exception as e:
+                    RPC_ERRORS.inc(method='eth_call')
+                    logger.error(f"matches({match_id}) read failed: {e}")
+        return out
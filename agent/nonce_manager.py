@@ -0,0 +1,66 @@
+"""
+The Arbiter - Local Nonce Allocation
+
+Hands out sequential nonces for the referee wallet without a
+get_transaction_count round trip per transaction.
+"""
+import threading
+from typing import Optional, Set
+
+# Node error fragments meaning our local view of the nonce has drifted from the chain.
+# "already known" is not one: the node has that exact tx (see outbox.is_already_known)
+NONCE_ERRORS = ("nonce too low", "nonce too high", "replacement transaction underpriced",
+                "invalid nonce", "invalid transaction nonce")
+
+
+def is_nonce_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(fragment in message for fragment in NONCE_ERRORS)
+
+
+class NonceManager:
+    """Thread-safe sequential nonce allocator, synced lazily from the chain's pending count."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+        self._gaps: Set[int] = set()
+
+    @property
+    def synced(self) -> bool:
+        return self._next is not None
+
+    def sync(self, chain_nonce: int):
+        """Adopt the chain's pending nonce as the next one to hand out."""
+        with self._lock:
+            self._next = chain_nonce
+            self._gaps.clear()
+
+    def invalidate(self):
+        """Forget local state; the next caller must sync() before allocating."""
+        with self._lock:
+            self._next = None
+            self._gaps.clear()
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next is None:
+                raise RuntimeError("NonceManager not synced")
+            if self._gaps:
+                nonce = min(self._gaps)
+                self._gaps.discard(nonce)
+                return nonce
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int):
+        """Return a nonce whose transaction never reached the node."""
+        with self._lock:
+            if self._next is None or nonce >= self._next:
+                return
+            if nonce == self._next - 1:
+                self._next = nonce
+            else:
+                # Later nonces are already out; refill this hole before moving on.
+                self._gaps.add(nonce)
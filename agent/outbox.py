@@ -0,0 +1,142 @@
+"""
+The Arbiter - Settlement Outbox
+
+Write-ahead log for the referee's transactions. Every signed transaction is
+stored with its intent (call shape, matches, calldata, gas) and committed
+before it is broadcast. After a crash, the startup reconciler resolves each
+row from its receipt instead of settling the same matches again.
+"""
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from web3 import Web3
+from web3.exceptions import MethodUnavailable, TransactionNotFound
+
+from gas_oracle import Fees
+from nonce_manager import is_nonce_error
+
+# Node error fragments meaning the exact transaction is already in its mempool
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported")
+
+
+def is_already_known(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(fragment in message for fragment in ALREADY_KNOWN_ERRORS)
+
+
+def is_rejection(exc: Exception) -> bool:
+    """True when the node answered a broadcast with an error, so the tx is not in its mempool.
+
+    web3 raises JSON-RPC error responses as ValueError; a nonce complaint also means
+    the node checked the tx, whatever raised it. Anything else (a transport error,
+    a timeout) leaves it unknown whether the node received the tx.
+    """
+    if is_already_known(exc):
+        return False
+    return isinstance(exc, (ValueError, MethodUnavailable)) or is_nonce_error(exc)
+
+
+class Intent(NamedTuple):
+    """What a transaction does: its gas-limit shape, the matches it settles, and the call itself."""
+    shape: str
+    match_ids: Tuple[int, ...]
+    data: bytes
+    gas: int
+
+
+class OutboxEntry(NamedTuple):
+    nonce: int
+    intent: Intent
+    fees: Fees
+    # Every version broadcast at this nonce (fee bumps), oldest first; raw_tx is the latest
+    tx_hashes: List[bytes]
+    raw_tx: bytes
+
+
+class SettlementOutbox:
+    """Signed-but-unconfirmed transactions, keyed by nonce."""
+
+    def __init__(self, db: sqlite3.Connection, lock: threading.RLock):
+        self.db = db
+        self._lock = lock
+        with self._lock:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    nonce INTEGER PRIMARY KEY,
+                    shape TEXT,
+                    match_ids TEXT,
+                    data BLOB,
+                    gas INTEGER,
+                    fees TEXT,
+                    tx_hashes TEXT,
+                    raw_tx BLOB,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def log(self, nonce: int, intent: Intent, fees: Fees, tx_hash: bytes, raw_tx: bytes):
+        """Records a freshly signed transaction; a stale row left at the same nonce is overwritten."""
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO outbox (nonce, shape, match_ids, data, gas, fees, tx_hashes, raw_tx) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (nonce, intent.shape, ",".join(map(str, intent.match_ids)), intent.data, intent.gas,
+                 json.dumps(fees), Web3.to_hex(tx_hash), raw_tx)
+            )
+
+    def log_replacement(self, nonce: int, intent: Intent, fees: Fees, tx_hash: bytes, raw_tx: bytes):
+        """Adds a fee-bumped version of the transaction already logged at this nonce.
+
+        The intent may differ from the logged one (a seeded settlement re-encoded for
+        settleMatch), but settles the same matches.
+        """
+        with self._lock:
+            self.db.execute(
+                "UPDATE outbox SET shape = ?, data = ?, gas = ?, fees = ?, tx_hashes = tx_hashes || ',' || ?, raw_tx = ? "
+                "WHERE nonce = ?",
+                (intent.shape, intent.data, intent.gas, json.dumps(fees), Web3.to_hex(tx_hash), raw_tx, nonce)
+            )
+
+    def remove(self, nonce: int):
+        with self._lock:
+            self.db.execute("DELETE FROM outbox WHERE nonce = ?", (nonce,))
+
+    def entries(self) -> List[OutboxEntry]:
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT nonce, shape, match_ids, data, gas, fees, tx_hashes, raw_tx FROM outbox ORDER BY nonce"
+            ).fetchall()
+        return [
+            OutboxEntry(
+                nonce=nonce,
+                intent=Intent(shape, tuple(int(m) for m in match_ids.split(",") if m), bytes(data), gas),
+                fees=json.loads(fees),
+                tx_hashes=[Web3.to_bytes(hexstr=h) for h in tx_hashes.split(",")],
+                raw_tx=bytes(raw_tx),
+            )
+            for nonce, shape, match_ids, data, gas, fees, tx_hashes, raw_tx in rows
+        ]
+
+    def match_ids(self) -> List[int]:
+        """Every match with a logged transaction, for claiming them before the first scan."""
+        return [match_id for entry in self.entries() for match_id in entry.intent.match_ids]
+
+
+def find_receipts(w3: Web3, entries: List[OutboxEntry], workers: int = 16) -> Dict[int, Optional[Any]]:
+    """Looks up every entry's receipt in one concurrent round. Returns {nonce: receipt or None}."""
+
+    def lookup(entry: OutboxEntry) -> Optional[Any]:
+        for tx_hash in entry.tx_hashes:
+            try:
+                return w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    if not entries:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(entries))) as pool:
+        return dict(zip((entry.nonce for entry in entries), pool.map(lookup, entries)))
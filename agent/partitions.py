@@ -0,0 +1,122 @@
+"""
+The Arbiter - Partition Leases
+
+Splits settlement across WORKER_COUNT referee workers. Match IDs fall into
+partitions by matchId % WORKER_COUNT; worker i is the home of partition i.
+Workers lease partitions through a table in a SQLite file they all share,
+renewing their leases every scan cycle. When a worker stops renewing, its
+partition's lease expires and another worker takes it over; when the home
+worker heartbeats again, the partition is handed back.
+"""
+import time
+import logging
+import sqlite3
+import threading
+from typing import FrozenSet, Set
+
+logger = logging.getLogger("Referee.Partitions")
+
+
+class PartitionLeases:
+    """This worker's view of the shared lease table."""
+
+    def __init__(self, path: str, worker_index: int, worker_count: int, ttl: float = 30.0):
+        if not 0 <= worker_index < worker_count:
+            raise ValueError(f"WORKER_INDEX must be in [0, {worker_count}), got {worker_index}")
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.ttl = ttl
+        self.owned: FrozenSet[int] = frozenset()
+        self.expires_at = 0.0  # when the leases in `owned` lapse unless renewed
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+
+        # Separate from the worker's own state DB: every worker opens this file
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS worker_heartbeats (
+                worker INTEGER PRIMARY KEY,
+                expires_at REAL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS partition_leases (
+                partition INTEGER PRIMARY KEY,
+                worker INTEGER,
+                expires_at REAL
+            )
+        """)
+
+    def partition_of(self, match_id: int) -> int:
+        return match_id % self.worker_count
+
+    def owns(self, match_id: int) -> bool:
+        """True while this worker holds the match's partition; a lease past its expiry counts as lost."""
+        return self.partition_of(match_id) in self.owned and time.time() < self.expires_at
+
+    def refresh(self) -> Set[int]:
+        """Heartbeats, renews held leases and claims free ones. Returns the partitions newly acquired.
+
+        A partition is claimed when its lease has expired and either it is this
+        worker's home or its home worker is not heartbeating. Foreign partitions
+        are only claimed once this worker has been up for a full TTL, so workers
+        started together each get their home partition first. A foreign partition
+        is released as soon as its home worker heartbeats again.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        may_take_over = now - self._started_at >= self.ttl
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute("INSERT OR REPLACE INTO worker_heartbeats (worker, expires_at) VALUES (?, ?)",
+                                (self.worker_index, expires_at))
+                alive = {worker for (worker,) in self.db.execute(
+                    "SELECT worker FROM worker_heartbeats WHERE expires_at > ?", (now,))}
+                leases = {partition: (worker, lease_expiry) for partition, worker, lease_expiry in self.db.execute(
+                    "SELECT partition, worker, expires_at FROM partition_leases")}
+
+                owned, handed_back = set(), set()
+                for partition in range(self.worker_count):
+                    holder, lease_expiry = leases.get(partition, (None, 0.0))
+                    home = partition == self.worker_index
+                    if holder == self.worker_index and lease_expiry > now:
+                        if not home and partition in alive:
+                            self.db.execute("DELETE FROM partition_leases WHERE partition = ? AND worker = ?",
+                                            (partition, self.worker_index))
+                            logger.info(f"Partition {partition}: handed back to worker {partition}")
+                            handed_back.add(partition)
+                            continue
+                    elif lease_expiry > now:
+                        continue
+                    elif not home and (partition in alive or not may_take_over):
+                        # Free, but its home worker is up (or may still be starting) and will claim it
+                        continue
+                    self.db.execute("INSERT OR REPLACE INTO partition_leases (partition, worker, expires_at) "
+                                    "VALUES (?, ?, ?)", (partition, self.worker_index, expires_at))
+                    owned.add(partition)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+            # Leases that lapsed before this renewal count as re-acquired: their matches may have been dropped meanwhile
+            held = self.owned if now < self.expires_at else frozenset()
+            acquired = owned - held
+            for partition in sorted(acquired):
+                logger.info(f"Partition {partition}: leased" + ("" if partition == self.worker_index else " (takeover)"))
+            for partition in sorted(held - owned - handed_back):
+                logger.warning(f"Partition {partition}: lease lost")
+            self.owned = frozenset(owned)
+            self.expires_at = expires_at
+        return acquired
+
+    def release(self):
+        """Gives up every lease and the heartbeat so others can take over without waiting for expiry."""
+        with self._lock:
+            self.db.execute("DELETE FROM partition_leases WHERE worker = ?", (self.worker_index,))
+            self.db.execute("DELETE FROM worker_heartbeats WHERE worker = ?", (self.worker_index,))
+            self.owned = frozenset()
+        self.db.close()
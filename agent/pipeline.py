@@ -0,0 +1,114 @@
+"""
+The Arbiter - Async Pipeline Stages
+
+The async engine runs as a chain of stages, each fed by a bounded queue:
+
+    scanner -> decode -> evaluate -> sign -> broadcast -> confirm
+
+A stage that falls behind fills its queue, and the stage feeding it then
+waits on put() instead of racing ahead, so a slow node or a burst of joins
+backs up to the scanner rather than into memory. Queue depths and the time
+producers spend blocked are exported per stage (see metrics.py).
+
+Work still queued is not yet durable, so the scan checkpoint follows a
+ScanWatermark rather than the scanner: a scanned range only counts as done
+once everything derived from it has been signed into the outbox or dropped.
+"""
+import time
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+from metrics import PIPELINE_QUEUE_DEPTH, PIPELINE_QUEUE_CAPACITY, PIPELINE_BLOCKED_SECONDS
+
+# Concurrent workers per stage. decode, sign and broadcast default to one so
+# events are applied, and nonces sent, in order.
+DEFAULT_WORKERS = {"decode": 1, "evaluate": 4, "sign": 1, "broadcast": 1}
+DEFAULT_QUEUE_SIZE = 256
+
+
+def parse_stage_workers(spec: str) -> Dict[str, int]:
+    """Parses 'evaluate=8,broadcast=2' into the per-stage worker counts, defaults filled in."""
+    workers = dict(DEFAULT_WORKERS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        stage, _, count = item.partition("=")
+        stage = stage.strip()
+        if stage not in DEFAULT_WORKERS:
+            raise ValueError(f"Unknown pipeline stage {stage!r} in PIPELINE_WORKERS (stages: {', '.join(DEFAULT_WORKERS)})")
+        workers[stage] = max(1, int(count))
+    return workers
+
+
+class StageQueue(asyncio.Queue):
+    """A stage's bounded input queue, reporting its depth and how long producers wait on it."""
+
+    def __init__(self, stage: str, maxsize: int = DEFAULT_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.stage = stage
+        PIPELINE_QUEUE_DEPTH.set_function(self.qsize, stage=stage)
+        PIPELINE_QUEUE_CAPACITY.set_function(lambda: maxsize, stage=stage)
+
+    async def put(self, item):
+        if not self.full():
+            self.put_nowait(item)
+            return
+        started = time.monotonic()
+        try:
+            await super().put(item)
+        finally:
+            PIPELINE_BLOCKED_SECONDS.inc(time.monotonic() - started, stage=self.stage)
+
+
+class ScanWatermark:
+    """Moves the scan checkpoint past a range once the pipeline has finished with it.
+
+    The scanner opens a range per scanned chunk and holds one unit of it. Every
+    item derived from the range (its log batch, each event, each settlement)
+    carries the range's token; a stage add()s units for the items it passes on
+    and marks its own done(). Ranges complete in scan order, so the checkpoint
+    never passes a join whose settlement is still only in memory. Items with no
+    token (streamed events, taken-over matches) are not tracked.
+    """
+
+    def __init__(self, save: Callable[[int], None]):
+        self._save = save
+        self._ranges: Dict[int, List[int]] = {}  # token -> [end block, units outstanding], in scan order
+        self._next_token = 0
+
+    def open(self, end: int) -> int:
+        token = self._next_token
+        self._next_token += 1
+        self._ranges[token] = [end, 1]
+        return token
+
+    def add(self, token: Optional[int], units: int = 1):
+        entry = self._ranges.get(token)
+        if entry is not None:
+            entry[1] += units
+
+    def done(self, token: Optional[int], units: int = 1):
+        entry = self._ranges.get(token)
+        if entry is None:
+            return
+        entry[1] -= units
+        checkpoint = None
+        while self._ranges:
+            token, (end, outstanding) = next(iter(self._ranges.items()))
+            if outstanding > 0:
+                break
+            del self._ranges[token]
+            checkpoint = end
+        if checkpoint is not None:
+            self._save(checkpoint)
+
+    def rewind(self, fork: int) -> bool:
+        """Clamps open ranges to a reorg's fork block. False when none are open."""
+        for entry in self._ranges.values():
+            entry[0] = min(entry[0], fork)
+        return bool(self._ranges)
+
+    def reset(self):
+        """Stops tracking every open range (leadership lost: the checkpoint is the new leader's)."""
+        self._ranges.clear()
+
+    def __len__(self) -> int:
+        return len(self._ranges)
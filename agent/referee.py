@@ -1,41 +1,93 @@
 import os
 import json
 import time
-import random
 import logging
 import sqlite3
 import signal
 import sys
+import queue
 import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Set, Tuple, Optional, Any
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Set, Tuple, Optional, Any, Callable, Deque, Dict, Iterable, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from web3 import Web3
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
 from web3.contract import Contract
-from web3.exceptions import TransactionNotFound, TimeExhausted
+from web3.exceptions import ContractLogicError, TransactionNotFound
+from web3.logs import DISCARD
 from dotenv import load_dotenv
+from eth_utils import event_abi_to_log_topic, keccak, to_bytes
+
+from nonce_manager import NonceManager, is_nonce_error
+from confirmer import ReceiptConfirmer
+from batcher import SettlementBatcher, Settlement
+from scan_window import AdaptiveScanWindow, is_scan_overload
+from match_index import MatchIndex
+from multicall import MatchReader, MULTICALL3_ADDRESS
+from match_store import MatchStore
+from streamer import LogStreamer
+from reorg import BlockHashWindow
+from partitions import PartitionLeases
+from leader import LeadershipLost, lease_from_spec
+from targets import TargetSource
+from games import GameEngine, GUESSING_GAME, ZERO_ADDRESS, load_engines
+from health import HealthMonitor
+from rpc_pool import RPCPool, PooledHTTPProvider
+from http_transport import http_provider_from_env
+from gas_oracle import GasOracle, Fees
+from gas_limits import GasLimitCache, SETTLE_GAS, WITHDRAW_GAS, BATCH_BASE_GAS, BATCH_GAS_PER_MATCH
+from calldata import ArenaCalldata, settle_shape, batch_shape, is_seeded, WITHDRAW_FEES, RECOVERABLE_SEED_ERRORS
+from outbox import SettlementOutbox, Intent, OutboxEntry, find_receipts, is_already_known, is_rejection
+from metrics import (REGISTRY, GET_LOGS_SECONDS, GET_LOGS_EVENTS, TX_SEND_SECONDS, TX_SENT, DB_SECONDS,
+                     RPC_ERRORS, SETTLEMENTS, SETTLEMENTS_PER_MINUTE, IN_FLIGHT, REORGS)
 
-# --- Logging Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("referee.log")
-    ]
-)
 logger = logging.getLogger("Referee")
 
+
+# --- Logging Configuration ---
+def configure_logging():
+    """Logs to stdout and referee.log. Only the entry point calls this, so importing the module has no side effects."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler("referee.log")
+        ]
+    )
+
+# Arena events the scanner folds into the local match store
+ARENA_EVENTS = ("MatchCreated", "MatchJoined", "MatchCancelled", "MatchSettled", "EmergencyClaim")
+# Failed (reverted or dropped) settlement transactions a match gets before it is left to emergencyClaim
+MAX_SETTLE_ATTEMPTS = 3
+
+
 class HealthCheckHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for infrastructure health checks (Render/Railway/Docker)."""
+    """HTTP handler for infrastructure health checks (Render/Railway/Docker).
+
+    /health is liveness (the scan loop is making progress), /ready is readiness
+    (every SLO holds). Both answer 503 when breached. The monitor is read from the server.
+    """
     def do_GET(self):
-        if self.path == '/health':
-            self.send_response(200)
+        if self.path in ('/health', '/ready'):
+            ok, checks = self.server.monitor.status(readiness=self.path == '/ready')
+            self.send_response(200 if ok else 503)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
             now = datetime.now(timezone.utc)
-            self.wfile.write(json.dumps({"status": "healthy", "timestamp": str(now)}).encode())
+            self.wfile.write(json.dumps({"status": "healthy" if ok else "unhealthy", "timestamp": str(now),
+                                         "checks": checks}).encode())
+        elif self.path == '/metrics':
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(REGISTRY.render().encode())
         else:
             self.send_response(404)
             self.end_headers()
@@ -44,17 +96,135 @@ class ArbiterAgent:
     def __init__(self):
         load_dotenv()
         self.rpc_url = os.getenv("RPC_URL", "https://testnet-rpc.monad.xyz")
+        # RPC_URLS (comma-separated) enables the multi-endpoint pool; RPC_URL is then ignored
+        rpc_urls = [url.strip() for url in os.getenv("RPC_URLS", "").split(",") if url.strip()]
+        self.rpc_pool = RPCPool(rpc_urls, hedge_after=float(os.getenv("RPC_HEDGE_AFTER", "0.5")),
+                                head_refresh=float(os.getenv("RPC_HEAD_REFRESH", "5"))) if rpc_urls else None
+        if self.rpc_pool:
+            self.rpc_url = rpc_urls[0]
         self.contract_address = Web3.to_checksum_address(os.getenv("CONTRACT_ADDRESS").lower())
         self.private_key = os.getenv("PRIVATE_KEY")
+        # Parsed once: deriving the key and address per signature is most of the signing cost
+        self.account: Optional[LocalAccount] = Account.from_key(self.private_key) if self.private_key else None
         self.referee_address = Web3.to_checksum_address(os.getenv("REFEREE_ADDRESS").lower())
         self.chain_id = int(os.getenv("CHAIN_ID", "10143"))
         
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        self.w3 = Web3(PooledHTTPProvider(self.rpc_pool, http_provider_from_env) if self.rpc_pool
+                       else http_provider_from_env(self.rpc_url))
+        self.health = HealthMonitor(
+            max_heartbeat_age=float(os.getenv("HEALTH_MAX_HEARTBEAT_AGE", "60")),
+            max_lag=int(os.getenv("HEALTH_MAX_LAG_BLOCKS", "200")),
+            max_error_rate=float(os.getenv("HEALTH_MAX_RPC_ERROR_RATE", "0.25")),
+            max_backlog=int(os.getenv("HEALTH_MAX_BACKLOG", "64"))
+        )
+        self.w3.middleware_onion.add(self.health.rpc_middleware, name="health")
         self.contract = self._load_contract()
+        self.multicall_address = os.getenv("MULTICALL_ADDRESS", MULTICALL3_ADDRESS)
+        self.match_reader = MatchReader(self.w3, self.contract, self.multicall_address)
+        self._event_decoders = {
+            Web3.to_hex(event_abi_to_log_topic(getattr(self.contract.events, name)().abi)): getattr(self.contract.events, name)()
+            for name in ARENA_EVENTS
+        }
+
+        # Settlement pipeline: local nonces + background receipt tracking
+        self.nonces = NonceManager()
+        self.confirmer = ReceiptConfirmer(
+            self.w3,
+            max_in_flight=int(os.getenv("MAX_IN_FLIGHT", "16")),
+            replace_after=float(os.getenv("TX_REPLACE_AFTER", "45"))
+        )
+        self.confirmer.on_dropped = lambda nonce: self.nonces.invalidate()
+        IN_FLIGHT.set_function(lambda: self.confirmer.in_flight)
+        self.health.backlog = lambda: self.confirmer.in_flight + (len(self.batcher) if self.batcher else 0)
+
+        # One fee quote per block for every sender
+        self.gas_oracle = GasOracle(
+            self.w3,
+            ttl=float(os.getenv("GAS_ORACLE_TTL", "12")),
+            history_blocks=int(os.getenv("GAS_HISTORY_BLOCKS", "20")),
+            percentile=float(os.getenv("GAS_PRIORITY_PERCENTILE", "50")),
+            base_fee_multiplier=float(os.getenv("GAS_BASE_FEE_MULTIPLIER", "2")),
+            bump_ratio=float(os.getenv("GAS_BUMP_RATIO", "0.125")),
+            eip1559=os.getenv("GAS_LEGACY", "").lower() not in ("1", "true", "yes")
+        )
+
+        # Deterministic targets: seeds from the committed SEED_CHAIN_SECRET chain, verified
+        # on-chain; outside it, a fallback seed from the same secret (or the referee key)
+        seed_secret = os.getenv("SEED_CHAIN_SECRET")
+        fallback_material = (to_bytes(hexstr=seed_secret) if seed_secret
+                             else bytes(self.account.key) if self.account else to_bytes(hexstr=self.referee_address))
+        self.targets = TargetSource(
+            fallback_seed=keccak(b"arbiter.fallback-seed" + fallback_material),
+            secret=to_bytes(hexstr=seed_secret) if seed_secret else None,
+            length=int(os.getenv("SEED_CHAIN_LENGTH", "10000"))
+        )
+        self.head_block = 0
+        self.games = load_engines(self.targets)
+
+        # Calldata per call shape, and a gas limit estimated once per shape
+        self.calldata = ArenaCalldata(self.contract)
+        self.gas_limits = GasLimitCache(
+            margin=float(os.getenv("GAS_LIMIT_MARGIN", "1.25")),
+            headroom=int(os.getenv("GAS_LIMIT_HEADROOM", "25000"))
+        )
+
+        # Batch settlement (disabled when BATCH_MAX_SIZE <= 1)
+        batch_size = int(os.getenv("BATCH_MAX_SIZE", "1"))
+        batch_window = float(os.getenv("BATCH_WINDOW_SECONDS", "2"))
+        self.batcher = SettlementBatcher(batch_size, batch_window) if batch_size > 1 else None
         
+        # Sharding: WORKER_COUNT workers split matches by matchId % WORKER_COUNT, each with
+        # its own key, nonces and state DB; partitions are leased through LEASE_DB
+        worker_count = int(os.getenv("WORKER_COUNT", "1"))
+        worker_index = int(os.getenv("WORKER_INDEX", "0"))
+        self.partitions = PartitionLeases(
+            os.getenv("LEASE_DB", "leases.db"), worker_index, worker_count,
+            ttl=float(os.getenv("LEASE_TTL", "30"))
+        ) if worker_count > 1 else None
+
         # Persistence
-        self.db_path = "agent_state.db"
+        self.db_path = os.getenv("STATE_DB", f"agent_state.worker{worker_index}.db" if self.partitions else "agent_state.db")
         self._init_db()
+
+        # Hot standby: agents sharing LEADER_LEASE and STATE_DB run one at a time; the
+        # others follow the leader's checkpoint and take over when the lease frees up
+        leader_lease = os.getenv("LEADER_LEASE")
+        self.leader_lease = lease_from_spec(
+            leader_lease, f"worker{worker_index}" if self.partitions else "referee",
+            ttl=float(os.getenv("LEADER_LEASE_TTL", "30"))
+        ) if leader_lease else None
+        self.is_leader = self.leader_lease is None
+
+        # eth_getLogs range, tuned at runtime and remembered across restarts
+        self.scan_window = AdaptiveScanWindow(
+            size=int(self._get_state("scan_window") or os.getenv("SCAN_WINDOW_INITIAL", "10")),
+            max_size=int(os.getenv("SCAN_WINDOW_MAX", "2000")),
+            max_logs=int(os.getenv("SCAN_MAX_LOGS", "500")),
+            max_seconds=float(os.getenv("SCAN_MAX_SECONDS", "2.0"))
+        )
+
+        # Parallel catch-up when the checkpoint is far behind head
+        self.backfill_workers = int(os.getenv("BACKFILL_WORKERS", "8"))
+        self.backfill_threshold = int(os.getenv("BACKFILL_THRESHOLD", "500"))
+        # Accrued platform fees below this are not worth a sweep transaction
+        self.fee_sweep_threshold = Web3.to_wei(0.01, 'ether')
+
+        # Only blocks CONFIRMATION_DEPTH below head are scanned, unless SPECULATIVE_SETTLEMENT
+        # opts into settling from the head itself (reorgs are still detected and rewound)
+        self.confirmation_depth = int(os.getenv("CONFIRMATION_DEPTH", "3"))
+        self.speculative = os.getenv("SPECULATIVE_SETTLEMENT", "").lower() in ("1", "true", "yes")
+
+        # Optional eth_subscribe streaming; polling stays on for checkpoints and gap-fill
+        self.ws_url = os.getenv("WS_URL")
+        # Minimum seconds between head-triggered scans in confirmed mode (0 = wake on every head)
+        self.head_wake_interval = float(os.getenv("HEAD_WAKE_INTERVAL", "1"))
+        self.streamer: Optional[LogStreamer] = None
+        self.stream_events: queue.Queue = queue.Queue()
+        self.wake = threading.Event()
+        # Matches released for another settlement attempt next cycle: failed sends, reverted or
+        # dropped settlements, and seeded settlements Arena refused (filled by the confirmer too)
+        self.retries: queue.Queue = queue.Queue()
+        self.settle_attempts: Dict[int, int] = {}  # failed settlement transactions per match
         
         self.running = True
         signal.signal(signal.SIGINT, self._handle_exit)
@@ -72,61 +242,508 @@ class ArbiterAgent:
             sys.exit(1)
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS state (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS processed_matches (
-                    match_id INTEGER PRIMARY KEY,
-                    tx_hash TEXT,
-                    status TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            logger.info("Persistence layer initialized (SQLite)")
+        # One long-lived connection shared by the scan loop and the confirmer thread.
+        # Autocommit by default; _db_transaction() groups a scan cycle into one commit.
+        # sqlite3 keeps compiled statements per connection, so the fixed SQL below is
+        # prepared once and reused for the life of the agent.
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.RLock()
+        self._db_depth = 0
+
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS processed_matches (
+                match_id INTEGER PRIMARY KEY,
+                tx_hash TEXT,
+                status TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        self.outbox = SettlementOutbox(self.db, self._db_lock)
+        self.block_hashes = BlockHashWindow(self.db, self._db_lock, size=int(os.getenv("REORG_WINDOW", "128")))
+        self._load_caches()
+        logger.info("Persistence layer initialized (SQLite, WAL)")
+
+    def _load_caches(self):
+        """Builds the in-memory views of the state DB. Called again on taking over as leader."""
+        with self._db_lock:
+            # Dedup checks are served from memory; the table is only read here
+            self.match_index = MatchIndex()
+            self.match_index.load(self.db.execute("SELECT match_id, status FROM processed_matches"))
+            self.match_store = MatchStore(self.db, self._db_lock)
+            # Matches with a logged, unresolved transaction stay claimed until the outbox is reconciled
+            for match_id in self.outbox.match_ids():
+                self.match_index.mark_pending(match_id)
+
+    def _db_execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with DB_SECONDS.time(op='execute'), self._db_lock:
+            return self.db.execute(sql, params)
+
+    def _db_fetchone(self, sql: str, params: Tuple = ()) -> Optional[Tuple]:
+        with DB_SECONDS.time(op='fetch'), self._db_lock:
+            return self.db.execute(sql, params).fetchone()
+
+    @contextmanager
+    def _db_transaction(self):
+        """Groups every write made inside the block, from any thread, into a single commit."""
+        with self._db_lock:
+            self._db_depth += 1
+            if self._db_depth == 1:
+                self.db.execute("BEGIN")
+        try:
+            yield
+        finally:
+            # Commit even on error: everything written so far (checkpoint included) is consistent.
+            # Only a leader commits, though: after the lease lapses the writes are the new leader's to make.
+            with DB_SECONDS.time(op='commit'), self._db_lock:
+                self._db_depth -= 1
+                if self._db_depth == 0:
+                    self.db.execute("COMMIT" if self._lease_held() else "ROLLBACK")
+
+    def _db_commit_point(self):
+        """Makes progress durable mid-transaction (used by long backfills). Raises LeadershipLost instead of committing for a lapsed leader."""
+        with DB_SECONDS.time(op='commit'), self._db_lock:
+            if self._db_depth > 0:
+                self._ensure_leader()
+                self.db.execute("COMMIT")
+                self.db.execute("BEGIN")
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self._db_fetchone("SELECT value FROM state WHERE key = ?", (key,))
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: Any):
+        self._db_execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, str(value)))
 
     def _get_last_block(self) -> int:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT value FROM state WHERE key = 'last_block'")
-            row = cursor.fetchone()
-            if row:
-                return int(row[0])
-            return max(0, self.w3.eth.block_number - 200) # Default to recent blocks
+        value = self._get_state("last_block")
+        if value is not None:
+            return int(value)
+        return max(0, self.w3.eth.block_number - 200) # Default to recent blocks
 
     def _save_last_block(self, block: int):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('last_block', ?)", (str(block),))
+        self._set_state("last_block", block)
 
     def _is_match_processed(self, match_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT 1 FROM processed_matches WHERE match_id = ? AND status = 'Settled'", (match_id,))
-            return cursor.fetchone() is not None
+        # Pending counts too: the same join can arrive over the stream and again from a rescan
+        return self.match_index.is_known(match_id)
 
     def _mark_match_pending(self, match_id: int, tx_hash: str):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("INSERT OR REPLACE INTO processed_matches (match_id, tx_hash, status) VALUES (?, ?, 'Pending')", (match_id, tx_hash))
+        self._db_execute("INSERT OR REPLACE INTO processed_matches (match_id, tx_hash, status) VALUES (?, ?, 'Pending')", (match_id, tx_hash))
+        self.match_index.mark_pending(match_id)
 
     def _mark_match_settled(self, match_id: int):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("UPDATE processed_matches SET status = 'Settled' WHERE match_id = ?", (match_id,))
+        self._db_execute("UPDATE processed_matches SET status = 'Settled' WHERE match_id = ?", (match_id,))
+        self.match_index.mark_settled(match_id)
+        SETTLEMENTS.inc()
+        SETTLEMENTS_PER_MINUTE.mark()
+
+    def _mark_match_skipped(self, match_id: int):
+        self._db_execute("UPDATE processed_matches SET status = 'Skipped' WHERE match_id = ?", (match_id,))
+        self.match_index.mark_settled(match_id)
+
+    def _release_match(self, match_id: int):
+        """Drops this node's claim on a match, so the next evaluation settles it again."""
+        self._db_execute("DELETE FROM processed_matches WHERE match_id = ? AND status = 'Pending'", (match_id,))
+        self.match_index.clear(match_id)
+
+    def _retry_later(self, match_ids: Iterable[int]):
+        """Releases matches whose settlement failed and has them re-evaluated next cycle.
+
+        The scan is already past their joins; left claimed, they would wait for emergencyClaim.
+        """
+        for match_id in match_ids:
+            self._release_match(match_id)
+            self.retries.put(match_id)
+
+    def _retry_failed(self, match_ids: List[int], failure: str):
+        """Re-settles matches whose settlement reverted or was dropped, unless the chain shows them done.
+
+        Their status is re-read first: a dropped tx may have been mined after all, or
+        another settler got there. A match that keeps failing is marked skipped after
+        MAX_SETTLE_ATTEMPTS, leaving it to emergencyClaim instead of paying for reverts forever.
+        """
+        try:
+            chain = self.match_reader.fetch(match_ids)
+        except Exception as e:
+            logger.error(f"Could not re-read {len(match_ids)} match(es) after their settlement {failure}: {e}")
+            chain = {}
+        retry = []
+        for match_id in match_ids:
+            if match_id in chain:
+                self.match_store.hydrate(match_id, chain[match_id])
+                status = self.match_store.get(match_id)['status']
+                if status != 'Active':
+                    logger.info(f"Match {match_id} is {status} on chain. Nothing to re-settle.")
+                    (self._mark_match_settled if status == 'Settled' else self._mark_match_skipped)(match_id)
+                    self.settle_attempts.pop(match_id, None)
+                    continue
+            attempts = self.settle_attempts.get(match_id, 0) + 1
+            if attempts >= MAX_SETTLE_ATTEMPTS:
+                logger.error(f"❌ Match {match_id}: {attempts} settlement attempts failed. Leaving it to emergencyClaim.")
+                self.settle_attempts.pop(match_id, None)
+                self._mark_match_skipped(match_id)
+                continue
+            self.settle_attempts[match_id] = attempts
+            retry.append(match_id)
+        if retry:
+            logger.warning(f"🔁 Re-settling match(es) {retry} after their settlement {failure}.")
+            self._retry_later(retry)
+
+    def _retry_unverified(self, match_id: int, reason: bytes):
+        """Re-settles a match Arena would not settle from its seed, this time with settleMatch.
+
+        The join block leaving BLOCKHASH's window, or a refused seed, still leaves the
+        match settleable with the fallback target; marking it done would leave it to
+        emergencyClaim. The settlement itself is left to the main loop (see _drain_retries).
+        """
+        logger.warning(f"🔁 Match {match_id}: seeded settlement refused (reason 0x{reason.hex()}). Re-settling with settleMatch.")
+        self.targets.unverified.add(match_id)
+        self._retry_later((match_id,))
 
     def _handle_exit(self, signum, frame):
         logger.info(f"Received signal {signum}. Finalizing current task before shutdown...")
         self.running = False
+        self.wake.set()
+
+    def _on_streamed_events(self, events: List[Any]):
+        """Called from the streamer thread; hands events to the main loop and wakes it.
+
+        Streamed events come from the unconfirmed head, so only speculative mode
+        processes them; otherwise the confirmed scan picks them up.
+        """
+        if self.speculative:
+            for event in events:
+                self.stream_events.put(event)
+        self.wake.set()
+
+    def _hold_leadership(self) -> bool:
+        """Renews the leader lease, or takes it if it is free. False means stand by this cycle."""
+        held = self.leader_lease.hold()
+        if held and not self.is_leader:
+            logger.info("👑 Leader lease acquired. Taking over from the shared checkpoint.")
+            self._load_caches()
+            self.nonces.invalidate()
+        elif not held and self.is_leader:
+            logger.warning("Leader lease lost. Standing by.")
+        if not (held and self.is_leader):
+            # Left over from a lost term: the leader re-evaluates these from the shared state
+            while self.batcher and len(self.batcher):
+                self.batcher.drain()
+        self.is_leader = held
+        return held
+
+    def _ensure_leader(self):
+        """Mid-cycle lease check before signing or committing: renews the lease, or raises LeadershipLost.
+
+        Unlike _hold_leadership it never takes the lease over, so it is safe from any thread.
+        """
+        if self.leader_lease is None:
+            return
+        if self.is_leader and self.leader_lease.hold():
+            return
+        if self.is_leader:
+            logger.warning("Leader lease lost mid-cycle. Abandoning the cycle.")
+        self.is_leader = False
+        raise LeadershipLost(f"leader lease {self.leader_lease.name!r} is no longer held")
+
+    def _lease_held(self) -> bool:
+        try:
+            self._ensure_leader()
+        except LeadershipLost:
+            return False
+        return True
+
+    def _follow_leader(self) -> int:
+        """Standby cycle: tracks the leader's checkpoint in the shared state DB. Returns it."""
+        self._drain_stream()
+        checkpoint = self._get_last_block()
+        self.health.heartbeat(self.w3.eth.block_number - checkpoint)
+        return checkpoint
 
-    def wait_for_receipt_with_retry(self, tx_hash, max_retries=3):
-        """Poll for transaction receipt with retries to handle RPC timeouts."""
-        for attempt in range(max_retries):
+    def _drain_stream(self) -> List[Any]:
+        events = []
+        while True:
             try:
-                return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
-            except TimeExhausted:
-                logger.warning(f"Timeout waiting for receipt (tx: {tx_hash.hex()}). Attempt {attempt+1}/{max_retries}")
-                time.sleep(5)
-        raise Exception(f"Failed to confirm transaction {tx_hash.hex()} after {max_retries} attempts")
+                events.append(self.stream_events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _drain_retries(self) -> List[Any]:
+        """Stand-in join events for the matches _retry_later released since the last cycle."""
+        match_ids = set()
+        while True:
+            try:
+                match_ids.add(self.retries.get_nowait())
+            except queue.Empty:
+                return self._stand_in_joins(match_ids.__contains__)
+
+    def _idle(self, timeout: float):
+        """Sleeps until the next poll, or until the streamer delivers events."""
+        self.wake.wait(timeout)
+        self.wake.clear()
+
+    def _next_nonce(self) -> int:
+        if not self.nonces.synced:
+            self.nonces.sync(self.w3.eth.get_transaction_count(self.referee_address, 'pending'))
+        return self.nonces.allocate()
+
+    def _sign_logged(self, intent: Intent, nonce: int, fees: Fees, replacement: bool = False):
+        """Signs the intent's tx and commits it to the outbox, so it is durable before anyone broadcasts it."""
+        self._ensure_leader()
+        signed_tx = self.account.sign_transaction(self._arena_tx(intent.data, intent.gas, nonce, fees))
+        if replacement:
+            self.outbox.log_replacement(nonce, intent, fees, signed_tx.hash, signed_tx.rawTransaction)
+        else:
+            self.outbox.log(nonce, intent, fees, signed_tx.hash, signed_tx.rawTransaction)
+        self._db_commit_point()
+        return signed_tx
+
+    def _sign_and_send(self, intent: Intent, nonce: int, fees: Fees, replacement: bool = False) -> bytes:
+        with TX_SEND_SECONDS.time():
+            signed_tx = self._sign_logged(intent, nonce, fees, replacement)
+            return self._send_signed(signed_tx, nonce)
+
+    def _send_signed(self, signed_tx: Any, nonce: int) -> bytes:
+        """Broadcasts an outbox-logged tx. Raises only if the node definitely rejected it.
+
+        "Already known" means the node has it. When the outcome is unknown (transport
+        error, timeout) the tx is treated as sent too: its outbox row stays and the
+        confirmer finds its receipt, bumps it, or leaves it to the next reconcile.
+        """
+        try:
+            return self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            return self._sent_anyway(e, signed_tx, nonce)
+
+    @staticmethod
+    def _sent_anyway(error: Exception, signed_tx: Any, nonce: int) -> bytes:
+        """The hash of a tx whose broadcast raised, unless the node definitely rejected it (then re-raises)."""
+        RPC_ERRORS.inc(method='eth_sendRawTransaction')
+        if is_rejection(error):
+            raise error
+        if not is_already_known(error):
+            logger.warning(f"Broadcast of nonce {nonce} may not have reached the node ({error}). Tracking it as sent.")
+        return signed_tx.hash
+
+    def _send_transaction(self, intent: Intent, on_sent: Optional[Callable[[bytes], None]] = None) -> bytes:
+        """Signs and broadcasts with a locally allocated nonce, then hands the tx to the confirmer.
+
+        Blocks only while MAX_IN_FLIGHT transactions are already outstanding. A nonce
+        rejected by the node triggers one resync from chain and a retry; a send whose
+        outcome is unknown is confirmed like any other (see _send_signed). If the tx sits
+        unmined, the confirmer re-sends it at the same nonce with bumped fees. Its
+        receipt is handled by _complete().
+        """
+        self.confirmer.acquire_slot()
+        fees = self.gas_oracle.fees()
+        for attempt in range(2):
+            nonce = self._next_nonce()
+            try:
+                tx_hash = self._sign_and_send(intent, nonce, fees)
+            except Exception as e:
+                # Not signed, or rejected by the node: nothing for a restart to reconcile
+                self.outbox.remove(nonce)
+                if is_nonce_error(e):
+                    self.nonces.invalidate()
+                    if attempt == 0:
+                        logger.warning(f"Nonce {nonce} rejected ({e}). Resyncing from chain.")
+                        continue
+                else:
+                    self.nonces.release(nonce)
+                self.confirmer.release_slot()
+                raise
+
+            TX_SENT.inc()
+            if on_sent:
+                on_sent(tx_hash)
+            self.confirmer.track(tx_hash, nonce, partial(self._complete, nonce, intent),
+                                 replace=self._replacer(intent, nonce, fees))
+            return tx_hash
+
+    def _complete(self, nonce: int, intent: Intent, receipt: Optional[Any]):
+        """Applies a transaction's outcome. A dropped tx keeps its outbox row for the next reconcile."""
+        if receipt is not None:
+            self.outbox.remove(nonce)
+        self.gas_limits.observe(intent.shape, intent.gas, receipt)
+        if not intent.match_ids:
+            if receipt is not None and receipt.status == 1:
+                logger.info("✅ Fee sweep completed.")
+            else:
+                logger.error("❌ Fee sweep failed to confirm.")
+        elif len(intent.match_ids) == 1:
+            self._on_settlement_receipt(intent.match_ids[0], receipt, intent)
+        else:
+            self._on_batch_receipt(list(intent.match_ids), receipt)
+
+    def _estimate_gas(self, data: bytes) -> int:
+        return self.w3.eth.estimate_gas({'from': self.referee_address, 'to': self.contract_address, 'data': data})
+
+    def _arena_tx(self, data: bytes, gas: int, nonce: int, fees: Fees) -> dict:
+        """A ready-to-sign Arena call; nothing left for web3 to look up.
+
+        With the nonce allocated locally, the fee quote warmed by the main loop and
+        the gas limit cached for the call shape, signing this needs no RPC at all.
+        """
+        return {
+            'from': self.referee_address,
+            'to': self.contract_address,
+            'value': 0,
+            'data': data,
+            'nonce': nonce,
+            'gas': gas,
+            'chainId': self.chain_id,
+            **fees
+        }
+
+    def _replacer(self, intent: Intent, nonce: int, fees: Fees) -> Callable[[], bytes]:
+        """Fee-bump policy for a stuck tx: each replacement outbids the last one and the current market.
+
+        A seeded settlement whose join blocks are about to leave Arena's window is
+        replaced with its settleMatch form instead (see _unseeded_call).
+        """
+        last = [fees, intent]
+
+        def replace() -> bytes:
+            bumped = self.gas_oracle.bump(last[0], self.gas_oracle.fees())
+            current = last[1]
+            call = self._unseeded_call(current, self.w3.eth.block_number)
+            if call is not None:
+                shape, data = call
+                gas = self.gas_limits.get(shape, lambda: self._estimate_gas(data), fallback=self._settle_gas(current),
+                                          units=len(current.match_ids))
+                current = Intent(shape, current.match_ids, data, gas)
+            tx_hash = self._sign_and_send(current, nonce, bumped, replacement=True)
+            last[:] = [bumped, current]
+            return tx_hash
+        return replace
+
+    @staticmethod
+    def _settle_gas(intent: Intent) -> int:
+        """Gas limit to fall back on for a settlement when estimation fails."""
+        count = len(intent.match_ids)
+        return SETTLE_GAS if count == 1 else BATCH_BASE_GAS + BATCH_GAS_PER_MATCH * count
+
+    def _unseeded_call(self, intent: Intent, head: int) -> Optional[Tuple[str, bytes]]:
+        """(shape, calldata) re-encoding a seeded settlement for settleMatch(es) once any of its
+        join blocks has left the verify window at head; None while Arena can still verify them all."""
+        if not is_seeded(intent.shape) or all(self._verifiable_seed(match_id, head) is not None
+                                              for match_id in intent.match_ids):
+            return None
+        self.targets.unverified.update(intent.match_ids)
+        outcomes = self._evaluate_matches([(match_id, self.match_store.get(match_id)) for match_id in intent.match_ids])
+        if len(outcomes) != len(intent.match_ids):
+            return None
+        batch = [(match_id, *outcomes[match_id]) for match_id in intent.match_ids]
+        logger.warning(f"⏳ Match(es) {list(intent.match_ids)} leaving the blockhash window. Replacing with settleMatch.")
+        return self._settle_call(*batch[0]) if len(batch) == 1 else self._batch_call(batch)
+
+    def _reconcile_outbox(self) -> List[Tuple[OutboxEntry, bytes]]:
+        """Resolves transactions an earlier run logged but never saw confirmed.
+
+        All receipts are looked up in one concurrent round. Mined entries are completed
+        as if the receipt had just arrived. Unmined entries whose nonce is still open are
+        rebroadcast as signed. The rest are dropped and their matches released for
+        re-evaluation. Returns the rebroadcast (entry, tx_hash) pairs for the caller to confirm.
+        """
+        entries = self.outbox.entries()
+        if not entries:
+            return []
+        logger.info(f"📬 Reconciling {len(entries)} unconfirmed transaction(s) from the outbox...")
+        receipts = find_receipts(self.w3, entries)
+        chain_nonce = self.w3.eth.get_transaction_count(self.referee_address, 'latest')
+
+        resumed = []
+        for entry in entries:
+            receipt = receipts.get(entry.nonce)
+            if receipt is not None:
+                for match_id in entry.intent.match_ids:
+                    self._mark_match_pending(match_id, receipt.transactionHash.hex())
+                self._complete(entry.nonce, entry.intent, receipt)
+                continue
+            if entry.nonce >= chain_nonce:
+                try:
+                    self.w3.eth.send_raw_transaction(entry.raw_tx)
+                except Exception as e:
+                    if is_rejection(e):
+                        logger.warning(f"Outbox nonce {entry.nonce} could not be rebroadcast ({e}). Dropping it.")
+                        self._drop_outbox_entry(entry)
+                        continue
+                    if not is_already_known(e):
+                        logger.warning(f"Rebroadcast of outbox nonce {entry.nonce} may not have reached the node ({e}). Confirming it anyway.")
+                logger.info(f"📤 Rebroadcast outbox nonce {entry.nonce} ({Web3.to_hex(entry.tx_hashes[-1])})")
+                resumed.append((entry, entry.tx_hashes[-1]))
+                continue
+            logger.warning(f"Outbox nonce {entry.nonce} was used by a transaction we never logged. Dropping it.")
+            self._drop_outbox_entry(entry)
+        return resumed
+
+    def _drop_outbox_entry(self, entry: OutboxEntry):
+        self.outbox.remove(entry.nonce)
+        for match_id in entry.intent.match_ids:
+            self._release_match(match_id)
+
+    def _resume_outbox(self):
+        """Reconciles the outbox and hands rebroadcast transactions to the confirmer."""
+        try:
+            resumed = self._reconcile_outbox()
+        except Exception as e:
+            # Their matches stay claimed, so nothing is settled twice; the next start retries
+            logger.error(f"Outbox reconciliation failed: {e}")
+            return
+        for entry, tx_hash in resumed:
+            self.confirmer.acquire_slot()
+            self.confirmer.track(tx_hash, entry.nonce, partial(self._complete, entry.nonce, entry.intent),
+                                 replace=self._replacer(entry.intent, entry.nonce, entry.fees),
+                                 earlier=entry.tx_hashes[:-1])
+
+    def _sync_seed_chain(self):
+        """Lines the configured seed chain up with the one committed on Arena (one read at startup)."""
+        if not self.targets.links:
+            return
+        try:
+            functions = self.contract.functions
+            self.targets.sync(functions.seedChainStart().call(), functions.seedEpoch().call(),
+                              functions.seedAnchor().call())
+        except Exception as e:
+            logger.error(f"Could not read the seed chain from Arena ({e}). Settling without on-chain verification.")
+
+    def _game_of(self, record: Dict[str, Any]) -> Optional[GameEngine]:
+        # Records stored before game types existed are guessing games
+        game_type = record['game_type'] if record.get('game_type') is not None else GUESSING_GAME
+        return self.games.get(game_type)
+
+    def _verifiable_seed(self, match_id: int, head: Optional[int] = None) -> Optional[bytes]:
+        """The seed for settleMatchWithSeed, or None unless the chain covers the match and Arena can decide its game."""
+        record = self.match_store.get(match_id)
+        game = self._game_of(record) if record else None
+        if game is None or not game.verifiable:
+            return None
+        return self.targets.verifiable_seed(match_id, record, self.head_block if head is None else head)
+
+    def _settle_call(self, match_id: int, winner: str, target_number: int) -> Tuple[str, bytes]:
+        """(shape, calldata) for one settlement: settleMatchWithSeed when the chain covers it."""
+        seed = self._verifiable_seed(match_id)
+        if seed is not None:
+            return settle_shape(winner, seeded=True), self.calldata.settle_match_with_seed(match_id, seed)
+        return settle_shape(winner), self.calldata.settle_match(match_id, winner, target_number)
+
+    def _batch_call(self, batch: List[Settlement]) -> Tuple[str, bytes]:
+        """(shape, calldata) for a batch: settleMatchesWithSeed only if every match can use it."""
+        match_ids, winners, targets = (list(column) for column in zip(*batch))
+        seeds = [self._verifiable_seed(match_id) for match_id in match_ids]
+        if all(seed is not None for seed in seeds):
+            return batch_shape(len(batch), seeded=True), self.calldata.settle_matches_with_seed(match_ids, seeds)
+        return batch_shape(len(batch)), self.calldata.settle_matches(match_ids, winners, targets)
 
     def settle_match(self, match_id: int, winner_address: str, target_number: int):
         if not self.private_key:
@@ -136,109 +753,286 @@ class ArbiterAgent:
         logger.info(f"⚖️  Settling match {match_id} | Winner: {winner_address} | Target: {target_number}")
         
         try:
-            # Dynamic Gas Estimation with 25% buffer for Testnet spikes
-            base_gas_price = self.w3.eth.gas_price
-            gas_price = int(base_gas_price * 1.25)
-            nonce = self.w3.eth.get_transaction_count(self.referee_address, 'pending')
-            
-            tx_params = {
-                'from': self.referee_address,
-                'nonce': nonce,
-                'gas': 350000, 
-                'gasPrice': gas_price,
-                'chainId': self.chain_id
-            }
-            
-            tx = self.contract.functions.settleMatch(match_id, winner_address, target_number).build_transaction(tx_params)
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            logger.info(f"📤 Tx Sent: {tx_hash.hex()}. Polling for confirmation...")
-            self._mark_match_pending(match_id, tx_hash.hex())
-            
-            receipt = self.wait_for_receipt_with_retry(tx_hash)
-            
-            if receipt.status == 1:
-                logger.info(f"✅ Match {match_id} SETTLED in block {receipt.blockNumber}")
-                self._mark_match_settled(match_id)
-            else:
-                logger.error(f"❌ Match {match_id} REVERTED. Check contract state or gas.")
+            shape, data = self._settle_call(match_id, winner_address, target_number)
+            gas = self.gas_limits.get(shape, lambda: self._estimate_gas(data), fallback=SETTLE_GAS)
+            tx_hash = self._send_transaction(
+                Intent(shape, (match_id,), data, gas),
+                on_sent=lambda tx_hash: self._mark_match_pending(match_id, tx_hash.hex())
+            )
+            logger.info(f"📤 Tx Sent: {tx_hash.hex()}. Confirming in background ({self.confirmer.in_flight} in flight)")
+        except LeadershipLost:
+            raise
         except Exception as e:
             logger.error(f"❌ Critical error settling match {match_id}: {e}")
+            self._retry_later((match_id,))
+
+    def _on_settlement_receipt(self, match_id: int, receipt, intent: Optional[Intent] = None):
+        if receipt is None:
+            logger.error(f"❌ Match {match_id} settlement was dropped before confirmation.")
+            self._retry_failed([match_id], "was dropped")
+        elif receipt.status == 1:
+            logger.info(f"✅ Match {match_id} SETTLED in block {receipt.blockNumber}")
+            self._mark_match_settled(match_id)
+            self.settle_attempts.pop(match_id, None)
+        else:
+            reason = self._revert_reason(intent, receipt) if intent and is_seeded(intent.shape) else None
+            if reason in RECOVERABLE_SEED_ERRORS:
+                self._retry_unverified(match_id, reason)
+                return
+            logger.error(f"❌ Match {match_id} REVERTED. Check contract state or gas.")
+            self._retry_failed([match_id], "reverted")
+
+    def _revert_reason(self, intent: Intent, receipt) -> Optional[bytes]:
+        """The selector of the custom error a reverted call failed with, found by replaying it at its block."""
+        try:
+            self.w3.eth.call({'from': self.referee_address, 'to': self.contract_address, 'data': intent.data,
+                              'gas': intent.gas}, block_identifier=receipt.blockNumber)
+        except ContractLogicError as e:
+            data = e.data if isinstance(e.data, str) else ""
+            return bytes.fromhex(data[2:10]) if data.startswith("0x") and len(data) >= 10 else None
+        except Exception as e:
+            logger.warning(f"Could not replay reverted tx {receipt.transactionHash.hex()}: {e}")
+        return None
+
+    def settle_batch(self, batch: List[Settlement]):
+        """Settles several matches with one Arena.settleMatches transaction."""
+        if len(batch) == 1:
+            return self.settle_match(*batch[0])
+        if not self.private_key:
+            logger.error("PRIVATE_KEY not configured")
+            return
+
+        match_ids = [match_id for match_id, _, _ in batch]
+        logger.info(f"⚖️  Settling batch of {len(batch)} matches: {match_ids}")
+
+        try:
+            shape, data = self._batch_call(batch)
+            gas = self.gas_limits.get(shape, lambda: self._estimate_gas(data),
+                                      fallback=BATCH_BASE_GAS + BATCH_GAS_PER_MATCH * len(batch), units=len(batch))
+
+            def on_sent(tx_hash: bytes):
+                for match_id in match_ids:
+                    self._mark_match_pending(match_id, tx_hash.hex())
+
+            tx_hash = self._send_transaction(Intent(shape, tuple(match_ids), data, gas), on_sent=on_sent)
+            logger.info(f"📤 Batch Tx Sent: {tx_hash.hex()}. Confirming in background ({self.confirmer.in_flight} in flight)")
+        except LeadershipLost:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Critical error settling batch {match_ids}: {e}")
+            self._retry_later(match_ids)
+
+    def _on_batch_receipt(self, match_ids: List[int], receipt):
+        if receipt is None:
+            logger.error(f"❌ Batch {match_ids} was dropped before confirmation.")
+            self._retry_failed(match_ids, "was dropped")
+            return
+        if receipt.status != 1:
+            logger.error(f"❌ Batch {match_ids} REVERTED. Check contract state or gas.")
+            self._retry_failed(match_ids, "reverted")
+            return
+
+        for event in self.contract.events.MatchSettled().process_receipt(receipt, errors=DISCARD):
+            logger.info(f"✅ Match {event['args']['matchId']} SETTLED in block {receipt.blockNumber}")
+            self._mark_match_settled(event['args']['matchId'])
+            self.settle_attempts.pop(event['args']['matchId'], None)
+        for event in self.contract.events.MatchSettlementSkipped().process_receipt(receipt, errors=DISCARD):
+            match_id, reason = event['args']['matchId'], event['args']['reason']
+            if reason in RECOVERABLE_SEED_ERRORS:
+                self._retry_unverified(match_id, reason)
+                continue
+            logger.warning(f"⏭️  Match {match_id} skipped by contract (reason 0x{reason.hex()})")
+            self._mark_match_skipped(match_id)
+
+    def _queue_settlement(self, match_id: int, winner: str, target_number: int):
+        if not self._still_owned(match_id):
+            return
+        if self.batcher is None:
+            self.settle_match(match_id, winner, target_number)
+            return
+        self.batcher.add(match_id, winner, target_number)
+        if self.batcher.due():
+            self.flush_settlements()
+
+    def flush_settlements(self, force: bool = False):
+        """Sends every batch that is due (or everything buffered, when forced)."""
+        while self.batcher and len(self.batcher) and (force or self.batcher.due()):
+            batch = [settlement for settlement in self.batcher.drain() if self._still_owned(settlement[0])]
+            if batch:
+                self.settle_batch(batch)
+
+    def _sweeps_fees(self) -> bool:
+        # One sweeper is enough when several workers share the contract
+        return bool(self.private_key) and not (self.partitions and self.partitions.worker_index != 0)
 
     def withdraw_platform_fees(self):
-        if not self.private_key: return
+        if not self._sweeps_fees(): return
 
         try:
             total_fees = self.contract.functions.totalFees().call()
             # Sweep if significant
-            if total_fees < self.w3.to_wei(0.01, 'ether'):
+            if total_fees < self.fee_sweep_threshold:
                 return
 
             logger.info(f"💰 Cleaning fees ({self.w3.from_wei(total_fees, 'ether')} MON)...")
             
-            gas_price = int(self.w3.eth.gas_price * 1.2)
-            nonce = self.w3.eth.get_transaction_count(self.referee_address, 'pending')
-
-            tx = self.contract.functions.withdrawFees().build_transaction({
-                'from': self.referee_address,
-                'nonce': nonce,
-                'gas': 200000,
-                'gasPrice': gas_price,
-                'chainId': self.chain_id
-            })
-
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            receipt = self.wait_for_receipt_with_retry(tx_hash)
-            if receipt.status == 1:
-                logger.info("✅ Fee sweep completed.")
+            data = self.calldata.withdraw_fees_data
+            gas = self.gas_limits.get(WITHDRAW_FEES, lambda: self._estimate_gas(data), fallback=WITHDRAW_GAS)
+            self._send_transaction(Intent(WITHDRAW_FEES, (), data, gas))
+        except LeadershipLost:
+            raise
         except Exception as e:
             logger.error(f"❌ Error during fee sweep: {e}")
 
+    def _evaluate_matches(self, matches: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, Tuple[str, int]]:
+        """Decides a batch of matches, one engine pass per game type. Returns {match_id: (winner, target)}.
+
+        Matches whose game type has no engine here are left out, unsettled, for a
+        referee that has one.
+        """
+        by_game: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        for match_id, record in matches:
+            game = self._game_of(record)
+            if game is None:
+                logger.warning(f"   Match {match_id}: no engine for game type {record['game_type']}. Leaving it unsettled.")
+                continue
+            by_game.setdefault(game.game_type, []).append((match_id, record))
+
+        outcomes = {}
+        for game_type, batch in by_game.items():
+            try:
+                results = self.games[game_type].evaluate(batch)
+            except Exception as e:
+                logger.error(f"Game {game_type} failed to evaluate {len(batch)} match(es): {e}")
+                continue
+            outcomes.update(zip((match_id for match_id, _ in batch), results))
+        return outcomes
+
     def process_match_event(self, event):
-        match_id = event['args']['matchId']
-        opponent = event['args']['opponent']
-        
-        if self._is_match_processed(match_id):
-            return
+        self.process_match_events([event])
 
-        logger.info(f"🔔 Event: MatchJoined | ID: {match_id} | Opponent: {opponent}")
-        
-        try:
-            match_data = self.contract.functions.matches(match_id).call()
-            creator = match_data[1]
-            creator_guess = match_data[7]
-            opponent_guess = match_data[8]
-            
-            logger.info(f"   Context: Creator {creator} ({creator_guess}) vs Opponent {opponent} ({opponent_guess})")
+    def _apply_events(self, events: List[Any]) -> Tuple[List[Any], List[int]]:
+        """Folds Arena events into the match store.
 
-            target_number = random.randint(1, 100)
-            logger.info(f"🎯 Calculated Target: {target_number}")
+        Every event is folded in, but only joins in this worker's partitions are
+        returned: the MatchJoined events still needing settlement, and the IDs among
+        them whose data the store lacks (MatchCreated never seen, e.g. created
+        before the first scanned block).
+        """
+        joins = []
+        for event in events:
+            self.match_store.apply(event)
+            match_id = event['args']['matchId']
+            if event['event'] == 'MatchJoined' and self._owns(match_id) and not self._is_match_processed(match_id):
+                joins.append(event)
 
-            diff_creator = abs(creator_guess - target_number)
-            diff_opponent = abs(opponent_guess - target_number)
+        missing = [event['args']['matchId'] for event in joins
+                   if not MatchStore.is_complete(self.match_store.get(event['args']['matchId']))]
+        return joins, missing
 
-            if diff_creator < diff_opponent:
-                winner = creator
-            elif diff_opponent < diff_creator:
-                winner = opponent
-            else:
-                winner = "0x0000000000000000000000000000000000000000"
-                logger.info("🤝 Draw detected")
+    def _owns(self, match_id: int) -> bool:
+        return self.partitions is None or self.partitions.owns(match_id)
 
-            self.settle_match(match_id, winner, target_number)
-            
-        except Exception as e:
-            logger.error(f"Error processing match lifecycle for {match_id}: {e}")
+    def _still_owned(self, match_id: int) -> bool:
+        """Ownership check right before a settlement is queued or sent.
+
+        A partition lost since the match was evaluated is the new holder's to settle;
+        this worker's claim on the match is dropped.
+        """
+        if self._owns(match_id):
+            return True
+        logger.warning(f"Match {match_id}: partition {self.partitions.partition_of(match_id)} no longer leased. Leaving it to its holder.")
+        self._release_match(match_id)
+        return False
+
+    def _renew_leases(self):
+        """Mid-cycle renewal for long backfills: the leader lease, and the partitions with their takeovers."""
+        self._ensure_leader()
+        for settlement in self._evaluate_joins(self._refresh_partitions()):
+            self._queue_settlement(*settlement)
+
+    def _refresh_partitions(self) -> List[Any]:
+        """Renews this worker's partition leases.
+
+        Returns stand-in join events for the unsettled matches of newly acquired
+        partitions: the scan is already past their joins, which the previous holder
+        may never have settled.
+        """
+        if self.partitions is None:
+            return []
+        acquired = self.partitions.refresh()
+        return self._stand_in_joins(lambda match_id: self.partitions.partition_of(match_id) in acquired)
+
+    def _unsettled_joins(self) -> List[Any]:
+        """Stand-in join events for every owned active match with no settlement claimed.
+
+        Run when this node takes up settling (startup, or winning leadership): the
+        checkpoint may be past a join whose settlement never reached the outbox.
+        """
+        return self._stand_in_joins(self._owns)
+
+    def _stand_in_joins(self, include: Callable[[int], bool]) -> List[Any]:
+        return [
+            {'event': 'MatchJoined', 'args': {'matchId': match_id, 'opponent': record['opponent']}}
+            for match_id, record in self.match_store.active()
+            if include(match_id) and not self._is_match_processed(match_id)
+        ]
+
+    def _evaluate_joins(self, joins: List[Any]) -> List[Settlement]:
+        """Decides every join from the local store, with no RPC reads."""
+        ready = []
+        for event in joins:
+            match_id = event['args']['matchId']
+            opponent = event['args']['opponent']
+            if self._is_match_processed(match_id):
+                continue
+            logger.info(f"🔔 Event: MatchJoined | ID: {match_id} | Opponent: {opponent}")
+
+            try:
+                record = self.match_store.get(match_id)
+                if not MatchStore.is_complete(record):
+                    raise Exception("match data unavailable")
+                if record['status'] != 'Active':
+                    logger.info(f"   Match {match_id} already {record['status']} on-chain. Skipping.")
+                    continue
+
+                logger.info(f"   Context: Creator {record['creator']} ({record['creator_guess']}) "
+                            f"vs Opponent {opponent} ({record['opponent_guess']})")
+                ready.append((match_id, record))
+
+            except Exception as e:
+                logger.error(f"Error processing match lifecycle for {match_id}: {e}")
+
+        settlements = []
+        for match_id, (winner, target_number) in self._evaluate_matches(ready).items():
+            logger.info(f"🎯 Match {match_id}: Target {target_number}" + (" | 🤝 Draw" if winner == ZERO_ADDRESS else ""))
+            self.match_index.mark_pending(match_id)
+            settlements.append((match_id, winner, target_number))
+        return settlements
+
+    def process_match_events(self, events: List[Any]):
+        """Folds a range of Arena events into the match store, then evaluates and settles its joins.
+
+        matches() is only read, in one batch, for joins the store cannot resolve.
+        """
+        joins, missing = self._apply_events(events)
+        if missing:
+            try:
+                for match_id, match_data in self.match_reader.fetch(missing).items():
+                    self.match_store.hydrate(match_id, match_data)
+            except Exception as e:
+                logger.error(f"Error reading match data for {len(missing)} match(es): {e}")
+
+        for settlement in self._evaluate_joins(joins):
+            self._queue_settlement(*settlement)
 
     def start_health_server(self, port=8080):
         """Starts a lightweight health check server."""
         def run_server():
-            HTTPServer.allow_reuse_address = True
+            ThreadingHTTPServer.allow_reuse_address = True
             try:
-                server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
+                server = ThreadingHTTPServer(('0.0.0.0', port), HealthCheckHandler)
+                server.monitor = self.health
                 logger.info(f"🩺 Health check server active on port {port}")
                 server.serve_forever()
             except Exception as e:
@@ -247,70 +1041,308 @@ class ArbiterAgent:
         thread = threading.Thread(target=run_server, daemon=True)
         thread.start()
 
-    def _get_logs_v_agnostic(self, start: int, end: int):
-        """Robustly calls get_logs by trying multiple argument formats."""
+    def _arena_log_filter(self, start: int, end: int) -> dict:
+        """One eth_getLogs filter covering every match lifecycle event."""
+        return {
+            'address': self.contract_address,
+            'fromBlock': start,
+            'toBlock': end,
+            'topics': [list(self._event_decoders)]
+        }
+
+    def _decode_logs(self, logs) -> List[Any]:
+        return [self._event_decoders[Web3.to_hex(log['topics'][0])].process_log(log)
+                for log in logs if log['topics'] and Web3.to_hex(log['topics'][0]) in self._event_decoders]
+
+    def _get_arena_logs(self, start: int, end: int) -> List[Any]:
+        with GET_LOGS_SECONDS.time():
+            try:
+                logs = self.w3.eth.get_logs(self._arena_log_filter(start, end))
+            except Exception:
+                RPC_ERRORS.inc(method='eth_getLogs')
+                raise
+        GET_LOGS_EVENTS.inc(len(logs))
+        return self._decode_logs(logs)
+
+    def _scan_to(self, last_block: int, current_block: int) -> int:
+        """Scans (last_block, current_block] with the adaptive window. Returns the new checkpoint."""
+        start = last_block + 1
+        while start <= current_block and self.running:
+            end = min(start + self.scan_window.size - 1, current_block)
+
+            # Read before the logs, so a reorg in between shows up as a mismatch on the next scan
+            hashes = self._read_block_hashes(self.block_hashes.first_recorded(start, end, current_block), end)
+            started = time.monotonic()
+            try:
+                events = self._get_arena_logs(start, end)
+            except Exception as rpc_e:
+                if self._scan_overloaded(rpc_e, start, end):
+                    continue
+                raise
+            self._scan_succeeded(len(events), time.monotonic() - started)
+
+            self.process_match_events(events)
+
+            self._save_last_block(end)
+            self.block_hashes.record_many(hashes)
+            last_block = end
+            start = end + 1
+
+        return last_block
+
+    # Scan decisions shared with the async engine, which only adds the awaits around them.
+
+    def _scan_overloaded(self, error: Exception, start: int, end: int) -> bool:
+        """After a failed scan of [start, end]: True if the window shrank and the range is worth retrying."""
+        if not is_scan_overload(error) or not self.scan_window.record_overload():
+            return False
+        logger.warning(f"RPC overloaded on {end - start + 1}-block scan. Shrinking window to {self.scan_window.size}.")
+        self._set_state("scan_window", self.scan_window.size)
+        return True
+
+    def _scan_succeeded(self, log_count: int, elapsed: float):
+        if self.scan_window.record_success(log_count, elapsed):
+            logger.debug(f"Scan window tuned to {self.scan_window.size} blocks")
+            self._set_state("scan_window", self.scan_window.size)
+
+    @staticmethod
+    def _split_segment(error: Exception, start: int, end: int) -> int:
+        """Where to halve a backfill segment whose fetch failed; re-raises unless splitting can help."""
+        if not is_scan_overload(error) or start == end:
+            raise error
+        return (start + end) // 2
+
+    def _backfill_segments(self, last_block: int, target_block: int) -> Deque[Tuple[int, int]]:
+        """(start, end) ranges covering (last_block, target_block], one scan window each."""
+        segment = self.scan_window.size
+        ranges = deque((start, min(start + segment - 1, target_block))
+                       for start in range(last_block + 1, target_block + 1, segment))
+        logger.info(f"⏩ Backfilling {target_block - last_block} blocks in {len(ranges)} segments "
+                    f"({self.backfill_workers} workers)")
+        return ranges
+
+    def _rewind_for_reorg(self, last_block: int, fork: int) -> List[int]:
+        """Forgets the orphaned block hashes above the fork. Returns the matches the orphaned blocks touched."""
+        REORGS.inc()
+        logger.warning(f"⚠️  Reorg: block {last_block} is no longer canonical. Rewinding to block {fork}.")
+        self.block_hashes.rewind(fork)
+        return self.match_store.touched_after(fork)
+
+    def _read_block_hashes(self, first: int, last: int) -> List[Tuple[int, bytes]]:
+        """(number, hash) for blocks first..last, read in one concurrent round."""
+        numbers = range(first, last + 1)
+        if len(numbers) == 1:
+            return [(last, self.w3.eth.get_block(last)['hash'])]
+        with ThreadPoolExecutor(max_workers=min(16, len(numbers))) as pool:
+            return list(zip(numbers, pool.map(lambda number: self.w3.eth.get_block(number)['hash'], numbers)))
+
+    def _scan_target(self, current_block: int) -> int:
+        """Highest block to scan: the head when speculative, otherwise CONFIRMATION_DEPTH below it."""
+        return current_block if self.speculative else max(0, current_block - self.confirmation_depth)
+
+    def _check_reorg(self, last_block: int) -> int:
+        """Returns the block to scan from: last_block, or the fork point if last_block was orphaned.
+
+        Costs one header read per cycle: the next block's parentHash against the stored hash.
+        """
+        expected = self.block_hashes.get(last_block)
+        if expected is None:
+            return last_block
+        if Web3.to_hex(self.w3.eth.get_block(last_block + 1)['parentHash']) == expected:
+            return last_block
+
+        fork = self._find_fork_point(last_block)
+        touched = self._rewind_for_reorg(last_block, fork)
+        if touched:
+            try:
+                self._roll_back_matches(fork, self.match_reader.fetch(touched))
+            except Exception as e:
+                logger.error(f"Could not re-read {len(touched)} match(es) touched by the reorg: {e}")
+        self._save_last_block(fork)
+        return fork
+
+    def _roll_back_matches(self, fork: int, chain: Dict[int, Tuple]):
+        """Resets matches whose events came from orphaned blocks to their canonical matches() state.
+
+        The rescan from the fork re-applies whatever is still on the canonical chain. A
+        match recorded as settled that is active again lost its settlement to the reorg,
+        and is released to be settled again.
+        """
+        in_outbox = set(self.outbox.match_ids())
+        lost = []
+        for match_id, match_data in chain.items():
+            self.match_store.hydrate(match_id, match_data, event_block=fork)
+            record = self.match_store.get(match_id)
+            if record['status'] == 'Active' and self.match_index.is_settled(match_id) and match_id not in in_outbox:
+                self._db_execute("DELETE FROM processed_matches WHERE match_id = ?", (match_id,))
+                lost.append(match_id)
+        logger.warning(f"Re-derived {len(chain)} match(es) from chain after the reorg"
+                       + (f"; re-settling {lost}" if lost else ""))
+        self._retry_later(lost)
+
+    def _find_fork_point(self, last_block: int) -> int:
+        """Newest stored block that is still canonical, with the stored span read in one concurrent round."""
+        stored = self.block_hashes.newest_first(last_block)
+        canonical = dict(self._read_block_hashes(stored[-1][0], stored[0][0])) if stored else {}
+        return self.block_hashes.fork_point(last_block, canonical)
+
+    def _fetch_segment(self, start: int, end: int) -> List[Any]:
+        """Fetches one backfill segment, splitting it in half while the RPC reports overload."""
         try:
-            # Try snake_case (Web3.py v6 default)
-            return self.contract.events.MatchJoined.get_logs(from_block=start, to_block=end)
-        except (TypeError, ValueError):
-            # Try camelCase (Web3.py v5 default)
-            return self.contract.events.MatchJoined.get_logs(fromBlock=start, toBlock=end)
+            return list(self._get_arena_logs(start, end))
+        except Exception as rpc_e:
+            mid = self._split_segment(rpc_e, start, end)
+            return self._fetch_segment(start, mid) + self._fetch_segment(mid + 1, end)
+
+    def _backfill(self, last_block: int, target_block: int) -> int:
+        """Fetches (last_block, target_block] on a worker pool, processing segments in block order.
+
+        The checkpoint only moves past a segment once it and every segment before it
+        have been fetched and processed, so a failure never leaves a gap behind it.
+        """
+        checkpoint = last_block
+        ranges = self._backfill_segments(last_block, target_block)
+
+        with ThreadPoolExecutor(max_workers=self.backfill_workers, thread_name_prefix="backfill") as pool:
+            in_flight = deque()
+            completed = 0
+            try:
+                while (ranges or in_flight) and self.running:
+                    # Keep a bounded number of segments ahead of the ordered consumer
+                    while ranges and len(in_flight) < self.backfill_workers * 2:
+                        start, end = ranges.popleft()
+                        in_flight.append((end, pool.submit(self._fetch_segment, start, end)))
+
+                    end, future = in_flight.popleft()
+                    self.process_match_events(future.result())
+                    self._save_last_block(end)
+                    last_block = end
+                    # A long backfill is progress, not a stuck loop
+                    self.health.heartbeat(target_block - last_block)
+
+                    completed += 1
+                    if completed % self.backfill_workers == 0:
+                        self._renew_leases()
+                        self.flush_settlements(force=True)
+                        self._db_commit_point()
+            except LeadershipLost:
+                raise
+            except Exception as e:
+                logger.error(f"Backfill stopped at block {last_block}: {e}")
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+
+        # Backfilled blocks sit far below head; only the new checkpoint's hash is needed
+        if last_block > checkpoint:
+            self.block_hashes.record(last_block, self.w3.eth.get_block(last_block)['hash'])
+        return last_block
 
     def run(self, poll_interval: int = 5):
         logger.info("=" * 60)
         logger.info("🤖 THE ARBITER - Professional Referee Node")
         logger.info(f"Address:  {self.referee_address}")
         logger.info(f"Target:   {self.contract_address}")
+        if self.partitions:
+            logger.info(f"Worker:   {self.partitions.worker_index} of {self.partitions.worker_count}")
         logger.info("=" * 60)
         
         self.start_health_server()
+        self.confirmer.start()
+        self._sync_seed_chain()
+        if self.is_leader:
+            self._resume_outbox()
+        if self.ws_url:
+            self.streamer = LogStreamer(self, self.ws_url, on_events=self._on_streamed_events,
+                                        head_interval=self.head_wake_interval)
+            self.streamer.on_reconnect = self.wake.set
+            if not self.speculative:
+                self.streamer.on_head = self.wake.set
+            self.streamer.start()
         
         last_block = self._get_last_block()
         logger.info(f"Recovery: Scanning from block {last_block}...")
         
         last_fee_withdrawal_day = datetime.now(timezone.utc).day - 1
+        recovered = self._unsettled_joins() if self.is_leader else []
 
         while self.running:
             try:
+                if self.leader_lease:
+                    was_leader = self.is_leader
+                    if not self._hold_leadership():
+                        last_block = self._follow_leader()
+                        self._idle(poll_interval)
+                        continue
+                    if not was_leader:
+                        self._resume_outbox()
+                        last_block = self._get_last_block()
+                        recovered = self._unsettled_joins()
+
                 now = datetime.now(timezone.utc)
                 if now.hour == 0 and now.day != last_fee_withdrawal_day:
                     self.withdraw_platform_fees()
                     last_fee_withdrawal_day = now.day
 
                 current_block = self.w3.eth.block_number
-                
-                if current_block > last_block:
-                    chunk_size = 10 
-                    
-                    for start in range(last_block + 1, current_block + 1, chunk_size):
-                        if not self.running: break
-                        end = min(start + chunk_size - 1, current_block)
-                        
-                        try:
-                            events = self._get_logs_v_agnostic(start, end)
-                            for event in events:
-                                self.process_match_event(event)
-                        except Exception as rpc_e:
-                            if "413" in str(rpc_e) or "Entity Too Large" in str(rpc_e):
-                                logger.warning(f"RPC size limit hit. Retrying with minimal window.")
-                                # Emergency sub-scan
-                                sub_chunk = 2
-                                for sub_start in range(start, end + 1, sub_chunk):
-                                    sub_end = min(sub_start + sub_chunk - 1, end)
-                                    events = self._get_logs_v_agnostic(sub_start, sub_end)
-                                    for event in events: self.process_match_event(event)
-                            else:
-                                raise rpc_e
-
-                        self._save_last_block(end)
-                        last_block = end
-                
-                time.sleep(poll_interval)
-                
+                self.head_block = current_block
+                self.gas_oracle.observe_block(current_block)
+                if self.account:
+                    # Refresh the fee quote here so the send path finds it cached
+                    self.gas_oracle.fees()
+
+                orphaned = self._refresh_partitions()
+
+                # One SQLite commit per cycle for the checkpoint and all status writes
+                with self._db_transaction():
+                    settlements, recovered = self._evaluate_joins(orphaned + recovered + self._drain_retries()), []
+                    for settlement in settlements:
+                        self._queue_settlement(*settlement)
+                    streamed = self._drain_stream()
+                    if streamed:
+                        self.process_match_events(streamed)
+
+                    target_block = self._scan_target(current_block)
+                    if target_block > last_block:
+                        last_block = self._check_reorg(last_block)
+                    if target_block - last_block > self.backfill_threshold:
+                        last_block = self._backfill(last_block, target_block)
+                    elif target_block > last_block:
+                        last_block = self._scan_to(last_block, target_block)
+
+                    # Nothing batched may outlive the commit that checkpoints past its join
+                    self.flush_settlements(force=True)
+                self.health.heartbeat(current_block - last_block)
+                self._idle(poll_interval)
+
+            except LeadershipLost as e:
+                logger.warning(f"Cycle abandoned: {e}. Its uncommitted writes were rolled back.")
             except Exception as e:
                 logger.error(f"Main loop exception: {e}")
-                time.sleep(poll_interval)
+                self._idle(poll_interval)
+
+        if self.is_leader:
+            self.flush_settlements(force=True)
+        logger.info(f"Waiting for {self.confirmer.in_flight} in-flight settlement(s) to confirm...")
+        self.confirmer.stop()
+        if self.partitions and self.is_leader:
+            self.partitions.release()
+        if self.leader_lease:
+            self.leader_lease.release()
+        self.db.close()
 
 if __name__ == "__main__":
+    configure_logging()
     agent = ArbiterAgent()
-    agent.run()
+    if os.getenv("AGENT_ENGINE", "sync").lower() == "async":
+        import asyncio
+        from async_engine import AsyncArbiterEngine
+        from pipeline import parse_stage_workers, DEFAULT_QUEUE_SIZE
+        asyncio.run(AsyncArbiterEngine(
+            agent,
+            workers=parse_stage_workers(os.getenv("PIPELINE_WORKERS", "")),
+            queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE))),
+            max_in_flight=agent.confirmer.max_in_flight
+        ).run())
+    else:
+        agent.run()
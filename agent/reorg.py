@@ -0,0 +1,73 @@
+"""
+The Arbiter - Reorg Tracking
+
+Keeps the hash of every scanned block within the window of the head next to
+the checkpoint. Before each scan, the next block's parentHash is compared with
+the stored hash of the checkpoint block; a mismatch means the chain under the
+checkpoint changed. The fork point is then found by walking the stored hashes
+back until one is still canonical, and the scanner rewinds to it.
+"""
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from web3 import Web3
+
+
+class BlockHashWindow:
+    """Rolling window of (block number, hash) pairs for scanned blocks, persisted in SQLite."""
+
+    def __init__(self, db: sqlite3.Connection, lock: threading.RLock, size: int = 128):
+        self.db = db
+        self._lock = lock
+        self.size = size
+        with self._lock:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS block_hashes (
+                    number INTEGER PRIMARY KEY,
+                    hash TEXT
+                )
+            """)
+
+    def record(self, number: int, block_hash: bytes):
+        self.record_many([(number, block_hash)])
+
+    def record_many(self, blocks: Iterable[Tuple[int, bytes]]):
+        """Stores (number, hash) pairs and drops those more than `size` blocks below the newest."""
+        rows = [(number, Web3.to_hex(block_hash)) for number, block_hash in blocks]
+        if not rows:
+            return
+        with self._lock:
+            self.db.executemany("INSERT OR REPLACE INTO block_hashes (number, hash) VALUES (?, ?)", rows)
+            self.db.execute("DELETE FROM block_hashes WHERE number <= ?", (max(rows)[0] - self.size,))
+
+    def first_recorded(self, start: int, end: int, head: int) -> int:
+        """First block of a scanned range [start, end] to record: those within `size` of head, and always end."""
+        return min(end, max(start, head - self.size + 1))
+
+    def get(self, number: int) -> Optional[str]:
+        with self._lock:
+            row = self.db.execute("SELECT hash FROM block_hashes WHERE number = ?", (number,)).fetchone()
+        return row[0] if row else None
+
+    def newest_first(self, below: int) -> List[Tuple[int, str]]:
+        """Stored pairs under `below`, newest first: the fork-point search order."""
+        with self._lock:
+            return self.db.execute(
+                "SELECT number, hash FROM block_hashes WHERE number < ? ORDER BY number DESC", (below,)
+            ).fetchall()
+
+    def fork_point(self, last_block: int, canonical: Dict[int, bytes]) -> int:
+        """Newest stored block under last_block whose hash matches `canonical` (number -> the node's hash).
+
+        A fork deeper than the window rewinds by the whole window.
+        """
+        for number, block_hash in self.newest_first(last_block):
+            if number in canonical and Web3.to_hex(canonical[number]) == block_hash:
+                return number
+        return max(0, last_block - self.size)
+
+    def rewind(self, number: int):
+        """Forgets every block above `number` (they were orphaned)."""
+        with self._lock:
+            self.db.execute("DELETE FROM block_hashes WHERE number > ?", (number,))
@@ -0,0 +1,321 @@
+"""
+The Arbiter - Multi-RPC Provider Pool
+
+Spreads JSON-RPC traffic over several endpoints. Each endpoint is scored by
+observed latency and failure rate. Reads go to the best healthy node and fail
+over down the ranking. Slow eth_getLogs / eth_call requests are hedged to a
+second node, and raw transactions are broadcast to every healthy node. Every
+node's head is probed in the background at most once per head_refresh seconds,
+piggybacked on ordinary traffic, so eth_getLogs can skip lagging nodes.
+"""
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+
+logger = logging.getLogger("Referee.RPC")
+
+HEDGED_METHODS = ("eth_getLogs", "eth_call")
+BROADCAST_METHODS = ("eth_sendRawTransaction",)
+
+
+class Endpoint:
+    """Running latency / failure statistics for one RPC URL."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None  # EWMA seconds, all methods
+        self.method_latency: Dict[str, float] = {}
+        self.error_rate = 0.0  # EWMA of failed calls
+        self.failures = 0  # consecutive
+        self.down_until = 0.0
+        self.head = 0  # highest eth_blockNumber seen from this node
+
+    def score(self, default_latency: float) -> float:
+        """Lower is better. Failures weigh heavily so a flaky fast node loses to a steady one."""
+        return (self.latency if self.latency is not None else default_latency) * (1 + 4 * self.error_rate)
+
+
+class RPCPool:
+    """Endpoint ranking shared by the sync and async pooled providers."""
+
+    def __init__(self, urls: List[str], hedge_after: float = 0.5, max_failures: int = 3,
+                 cooldown: float = 30.0, alpha: float = 0.2, head_refresh: float = 5.0):
+        if not urls:
+            raise ValueError("RPCPool needs at least one URL")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.hedge_after = hedge_after
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.head_refresh = head_refresh
+        self._heads_probed_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def _ewma(self, previous: Optional[float], sample: float) -> float:
+        return sample if previous is None else previous + self.alpha * (sample - previous)
+
+    def record(self, endpoint: Endpoint, method: str, elapsed: float, ok: bool):
+        with self._lock:
+            endpoint.error_rate = self._ewma(endpoint.error_rate, 0.0 if ok else 1.0)
+            if ok:
+                endpoint.latency = self._ewma(endpoint.latency, elapsed)
+                endpoint.method_latency[method] = self._ewma(endpoint.method_latency.get(method), elapsed)
+                if endpoint.failures >= self.max_failures:
+                    logger.info(f"🔌 RPC {endpoint.url} recovered")
+                endpoint.failures = 0
+                return
+            endpoint.failures += 1
+            if endpoint.failures == self.max_failures:
+                logger.warning(f"🔌 RPC {endpoint.url} failed {endpoint.failures} times in a row. "
+                               f"Benching it for {self.cooldown:.0f}s.")
+            if endpoint.failures >= self.max_failures:
+                endpoint.down_until = time.monotonic() + self.cooldown
+
+    def note_response(self, endpoint: Endpoint, method: str, response: Dict[str, Any]):
+        if method == "eth_blockNumber" and isinstance(response.get('result'), str):
+            with self._lock:
+                endpoint.head = max(endpoint.head, int(response['result'], 16))
+
+    def heads_due(self) -> bool:
+        """True at most once per head_refresh seconds (and only with several nodes): time to probe every head."""
+        if len(self.endpoints) < 2:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._heads_probed_at < self.head_refresh:
+                return False
+            self._heads_probed_at = now
+        return True
+
+    def is_healthy(self, endpoint: Endpoint) -> bool:
+        return endpoint.failures < self.max_failures or time.monotonic() >= endpoint.down_until
+
+    def ranked(self, method: str = "", params: Any = None) -> List[Endpoint]:
+        """Healthy endpoints best-first, then benched ones as a last resort.
+
+        eth_getLogs with an explicit toBlock only goes to nodes whose head has reached
+        it, since a lagging node answers with a silently truncated log list.
+        """
+        to_block = self._to_block(method, params)
+        with self._lock:
+            known = [e.latency for e in self.endpoints if e.latency is not None]
+            default = min(known) if known else 0.0
+            ordered = sorted(self.endpoints, key=lambda e: e.score(default))
+        healthy = [e for e in ordered if self.is_healthy(e)]
+        if to_block is not None:
+            caught_up = [e for e in healthy if e.head >= to_block]
+            healthy = caught_up or healthy
+        return healthy + [e for e in ordered if e not in healthy]
+
+    def healthy(self) -> List[Endpoint]:
+        return [e for e in self.ranked() if self.is_healthy(e)] or self.ranked()
+
+    def hedge_delay(self, endpoint: Endpoint, method: str) -> float:
+        """Wait this long on the primary before asking a second node."""
+        typical = endpoint.method_latency.get(method)
+        return max(self.hedge_after, 2 * typical) if typical is not None else self.hedge_after
+
+    @staticmethod
+    def _to_block(method: str, params: Any) -> Optional[int]:
+        if method != "eth_getLogs" or not params or not isinstance(params[0], dict):
+            return None
+        to_block = params[0].get('toBlock')
+        if isinstance(to_block, int):
+            return to_block
+        if isinstance(to_block, str) and to_block.startswith("0x"):
+            return int(to_block, 16)
+        return None
+
+
+def _is_success(response: Dict[str, Any]) -> bool:
+    return 'error' not in response
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """Web3 provider that routes each request through an RPCPool."""
+
+    def __init__(self, pool: RPCPool, provider_factory: Callable[[str], JSONBaseProvider] = HTTPProvider):
+        super().__init__()
+        self.pool = pool
+        self._providers = {e.url: provider_factory(e.url) for e in pool.endpoints}
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(pool.endpoints), thread_name_prefix="rpc-pool")
+
+    def __str__(self) -> str:
+        return f"RPC pool of {len(self.pool.endpoints)}: {', '.join(e.url for e in self.pool.endpoints)}"
+
+    def _call(self, endpoint: Endpoint, method: str, params: Any) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            response = self._providers[endpoint.url].make_request(method, params)
+        except Exception:
+            self.pool.record(endpoint, method, time.monotonic() - started, ok=False)
+            raise
+        # A JSON-RPC error (revert, bad nonce) is an answer, not a node failure
+        self.pool.record(endpoint, method, time.monotonic() - started, ok=True)
+        self.pool.note_response(endpoint, method, response)
+        return response
+
+    def make_request(self, method, params):
+        if self.pool.heads_due():
+            for endpoint in self.pool.endpoints:
+                self._executor.submit(self._probe_head, endpoint)
+        if method in BROADCAST_METHODS:
+            return self._broadcast(method, params)
+        candidates = self.pool.ranked(method, params)
+        if method in HEDGED_METHODS and len(candidates) > 1:
+            return self._hedged(candidates, method, params)
+        return self._failover(candidates, method, params)
+
+    def _probe_head(self, endpoint: Endpoint):
+        try:
+            self._call(endpoint, "eth_blockNumber", [])
+        except Exception as e:
+            logger.debug(f"Head probe of {endpoint.url} failed: {e}")
+
+    def _failover(self, candidates: List[Endpoint], method: str, params: Any):
+        error: Optional[Exception] = None
+        for endpoint in candidates:
+            try:
+                return self._call(endpoint, method, params)
+            except Exception as e:
+                logger.warning(f"{method} failed on {endpoint.url} ({e}). Trying next node.")
+                error = e
+        raise error
+
+    def _hedged(self, candidates: List[Endpoint], method: str, params: Any):
+        primary, backup = candidates[0], candidates[1]
+        futures = [self._executor.submit(self._call, primary, method, params)]
+        done, _ = wait(futures, timeout=self.pool.hedge_delay(primary, method))
+        if not done:
+            futures.append(self._executor.submit(self._call, backup, method, params))
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        # Both hedged attempts raised; walk the rest of the ranking
+        return self._failover(candidates[len(futures):] or candidates, method, params)
+
+    def _broadcast(self, method: str, params: Any):
+        """Sends to every healthy node and returns the first acceptance (or the first rejection)."""
+        futures = [self._executor.submit(self._call, endpoint, method, params) for endpoint in self.pool.healthy()]
+        rejection = error = None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            if _is_success(response):
+                return response
+            rejection = rejection or response
+        if rejection is not None:
+            return rejection
+        raise error
+
+
+class AsyncPooledHTTPProvider(AsyncJSONBaseProvider):
+    """AsyncWeb3 counterpart of PooledHTTPProvider, sharing the same RPCPool."""
+
+    def __init__(self, pool: RPCPool, provider_factory: Callable[[str], AsyncJSONBaseProvider] = AsyncHTTPProvider):
+        super().__init__()
+        self.pool = pool
+        self._providers = {e.url: provider_factory(e.url) for e in pool.endpoints}
+        self._probes: Set[asyncio.Task] = set()
+
+    def __str__(self) -> str:
+        return f"Async RPC pool of {len(self.pool.endpoints)}: {', '.join(e.url for e in self.pool.endpoints)}"
+
+    async def close(self):
+        for probe in self._probes:
+            probe.cancel()
+        for provider in self._providers.values():
+            if hasattr(provider, 'close'):
+                await provider.close()
+
+    async def _call(self, endpoint: Endpoint, method: str, params: Any) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            response = await self._providers[endpoint.url].make_request(method, params)
+        except Exception:
+            self.pool.record(endpoint, method, time.monotonic() - started, ok=False)
+            raise
+        self.pool.record(endpoint, method, time.monotonic() - started, ok=True)
+        self.pool.note_response(endpoint, method, response)
+        return response
+
+    async def make_request(self, method, params):
+        if self.pool.heads_due():
+            for endpoint in self.pool.endpoints:
+                probe = asyncio.create_task(self._probe_head(endpoint))
+                self._probes.add(probe)
+                probe.add_done_callback(self._probes.discard)
+        if method in BROADCAST_METHODS:
+            return await self._broadcast(method, params)
+        candidates = self.pool.ranked(method, params)
+        if method in HEDGED_METHODS and len(candidates) > 1:
+            return await self._hedged(candidates, method, params)
+        return await self._failover(candidates, method, params)
+
+    async def _probe_head(self, endpoint: Endpoint):
+        try:
+            await self._call(endpoint, "eth_blockNumber", [])
+        except Exception as e:
+            logger.debug(f"Head probe of {endpoint.url} failed: {e}")
+
+    async def _failover(self, candidates: List[Endpoint], method: str, params: Any):
+        error: Optional[Exception] = None
+        for endpoint in candidates:
+            try:
+                return await self._call(endpoint, method, params)
+            except Exception as e:
+                logger.warning(f"{method} failed on {endpoint.url} ({e}). Trying next node.")
+                error = e
+        raise error
+
+    async def _hedged(self, candidates: List[Endpoint], method: str, params: Any):
+        primary, backup = candidates[0], candidates[1]
+        tasks = [asyncio.create_task(self._call(primary, method, params))]
+        done, _ = await asyncio.wait(tasks, timeout=self.pool.hedge_delay(primary, method))
+        if not done:
+            tasks.append(asyncio.create_task(self._call(backup, method, params)))
+
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        return await self._failover(candidates[len(tasks):] or candidates, method, params)
+
+    async def _broadcast(self, method: str, params: Any):
+        tasks = [asyncio.create_task(self._call(endpoint, method, params)) for endpoint in self.pool.healthy()]
+        for task in tasks:
+            # Slower nodes keep going after the first acceptance; don't warn about their errors
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        rejection = error = None
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                response = await next_done
+            except Exception as e:
+                error = error or e
+                continue
+            if _is_success(response):
+                return response
+            rejection = rejection or response
+        if rejection is not None:
+            return rejection
+        raise error
@@ -0,0 +1,67 @@
+"""
+The Arbiter - Adaptive Log Scan Window
+
+Sizes eth_getLogs block ranges from observed responses: grow while calls stay
+well under the log-count and latency budgets, shrink on oversize/timeout errors.
+"""
+import asyncio
+
+import requests
+
+# Error fragments RPC providers use when a getLogs range is too expensive to serve.
+OVERLOAD_ERRORS = (
+    "413", "entity too large", "timeout", "timed out", "query returned more than",
+    "response size", "limit exceeded", "block range", "too many results",
+)
+
+
+def is_scan_overload(exc: Exception) -> bool:
+    """True if the error means the range was too large rather than the node being broken."""
+    if isinstance(exc, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+        return True
+    message = str(exc).lower()
+    return any(fragment in message for fragment in OVERLOAD_ERRORS)
+
+
+class AdaptiveScanWindow:
+    """Multiplicative-increase / multiplicative-decrease block range for log scans.
+
+    An overload caps growth at 3/4 of the failing size; the cap is lifted again
+    after probe_after consecutive in-budget scans so the window can re-explore.
+    """
+
+    def __init__(self, size: int = 10, min_size: int = 1, max_size: int = 2000,
+                 max_logs: int = 500, max_seconds: float = 2.0, probe_after: int = 50):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_logs = max_logs
+        self.max_seconds = max_seconds
+        self.probe_after = probe_after
+        self.ceiling = max_size
+        self.size = self._clamp(size)
+        self._streak = 0
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.ceiling, int(size)))
+
+    def record_success(self, log_count: int, elapsed: float) -> bool:
+        """Feeds back one successful scan. Returns True if the size changed."""
+        previous = self.size
+        if log_count > self.max_logs or elapsed > self.max_seconds:
+            self._streak = 0
+            self.size = self._clamp(self.size // 2)
+        elif log_count < self.max_logs // 2 and elapsed < self.max_seconds / 2:
+            self._streak += 1
+            if self._streak >= self.probe_after and self.ceiling < self.max_size:
+                self.ceiling = min(self.max_size, self.ceiling * 2)
+                self._streak = 0
+            self.size = self._clamp(self.size * 2)
+        return self.size != previous
+
+    def record_overload(self) -> bool:
+        """Halves the window after a 413/timeout. Returns False if already at the minimum."""
+        previous = self.size
+        self._streak = 0
+        self.ceiling = max(self.min_size, previous * 3 // 4)
+        self.size = self._clamp(previous // 2)
+        return self.size != previous
@@ -0,0 +1,110 @@
+"""
+The Arbiter - WebSocket Log Streaming
+
+Subscribes to Arena logs and new heads over eth_subscribe and pushes decoded
+events into the referee's normal processing path as soon as the node sees
+them. The polling scanner keeps running underneath: it owns the checkpoint,
+and it fills any gap left while the socket was down.
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+
+from web3 import AsyncWeb3
+from web3.providers import WebsocketProviderV2
+
+logger = logging.getLogger("Referee.Stream")
+
+
+class LogStreamer:
+    """Maintains an eth_subscribe connection, reconnecting with backoff until the agent stops."""
+
+    def __init__(self, agent, ws_url: str, on_events: Callable[[List[Any]], None], stale_after: float = 30.0,
+                 head_interval: float = 0.0):
+        self.agent = agent
+        self.ws_url = ws_url
+        self.on_events = on_events
+        self.stale_after = stale_after
+        # Minimum gap between on_head calls; heads inside it are coalesced into the next one
+        self.head_interval = head_interval
+        self._head_fired_at = float("-inf")
+
+        self.connected = False
+        self.reconnects = 0
+        self.last_head_at = 0.0
+        # Fired on reconnect so the polling scanner gap-fills right away
+        self.on_reconnect: Optional[Callable[[], None]] = None
+        # Fired on new heads, at most once per head_interval (e.g. to scan a newly confirmed block
+        # without waiting for the poll)
+        self.on_head: Optional[Callable[[], None]] = None
+
+    def start(self):
+        """Runs the stream on its own event loop thread (for the blocking agent)."""
+        threading.Thread(target=lambda: asyncio.run(self.run()), name="log-streamer", daemon=True).start()
+
+    async def run(self):
+        backoff = 1
+        while self.agent.running:
+            try:
+                await self._stream()
+                backoff = 1
+            except Exception as e:
+                logger.warning(f"Websocket stream lost ({e}). Polling covers the gap; reconnecting in {backoff}s.")
+            finally:
+                self.connected = False
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+            self.reconnects += 1
+
+    async def _stream(self):
+        async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(self.ws_url)) as w3:
+            logs_sub = await w3.eth.subscribe("logs", {
+                'address': self.agent.contract_address,
+                'topics': [list(self.agent._event_decoders)]
+            })
+            await w3.eth.subscribe("newHeads")
+
+            self.connected = True
+            self.last_head_at = time.monotonic()
+            logger.info(f"📡 Streaming Arena logs over {self.ws_url}")
+            if self.reconnects and self.on_reconnect:
+                self.on_reconnect()
+
+            watchdog = asyncio.create_task(self._watchdog(w3))
+            try:
+                async for message in w3.ws.process_subscriptions():
+                    if not self.agent.running:
+                        break
+                    params = message.get('params', message)
+                    if params.get('subscription') == logs_sub:
+                        log = params['result']
+                        if not log.get('removed'):
+                            self.on_events(self.agent._decode_logs([log]))
+                    else:
+                        self._new_head()
+            finally:
+                watchdog.cancel()
+
+    def _new_head(self):
+        """Records a head and fires on_head unless it already fired within head_interval.
+
+        A skipped head is not lost: the cycle it would have woken scans up to the latest head
+        anyway, and the next head (or the poll) after the interval picks it up.
+        """
+        now = time.monotonic()
+        self.last_head_at = now
+        if self.on_head and now - self._head_fired_at >= self.head_interval:
+            self._head_fired_at = now
+            self.on_head()
+
+    async def _watchdog(self, w3):
+        """Drops the socket if heads stop arriving, so a silently dead stream gets replaced."""
+        while True:
+            await asyncio.sleep(self.stale_after / 2)
+            if time.monotonic() - self.last_head_at > self.stale_after:
+                logger.warning(f"No new heads for {self.stale_after:.0f}s. Recycling websocket.")
+                await w3.provider.disconnect()
+                return
@@ -0,0 +1,117 @@
+"""
+The Arbiter - Target Derivation
+
+Derives each match's target number from a seed, the match ID and the entropy
+Arena recorded at join, exactly as Arena.deriveTarget does. The same match
+always gets the same target, so a retried or resumed settlement needs nothing
+stored beyond the match itself.
+
+Seeds come from the hash chain committed with Arena.commitSeedChain: link k
+is keccak256 applied (length - k) times to SEED_CHAIN_SECRET, and the
+anchor is one hash past link 0. Matches joined in a chain epoch are settled
+with settleMatchWithSeed, which checks the seed and derives target and winner
+on-chain. Print the anchor to commit with:
+
+    SEED_CHAIN_SECRET=0x... python targets.py --length 10000
+"""
+import os
+import logging
+import argparse
+from typing import Any, Dict, List, Optional, Set
+
+from eth_utils import keccak, to_bytes
+
+logger = logging.getLogger("Referee.Targets")
+
+# Arena can only read the last 256 block hashes; the margin covers inclusion delay,
+# including fee-bump replacements (which re-check the window before signing)
+VERIFY_WINDOW = 192
+
+
+def derive_target(seed: bytes, match_id: int, entropy: bytes) -> int:
+    """keccak256(abi.encode(seed, matchId, entropy)) % 100 + 1."""
+    return int.from_bytes(keccak(seed + match_id.to_bytes(32, 'big') + entropy), 'big') % 100 + 1
+
+
+def seed_chain(secret: bytes, length: int) -> List[bytes]:
+    """The chain's links in reveal order: link k hashes to link k - 1, link 0 to the anchor."""
+    links = [keccak(secret)]
+    for _ in range(length - 1):
+        links.append(keccak(links[-1]))
+    links.reverse()
+    return links
+
+
+class TargetSource:
+    """Seeds by epoch, for the committed chain (start_epoch onward) and a fallback for everything else.
+
+    Matches outside the chain (joined before it was committed, or after it ran out)
+    are settled with settleMatch and a target from the fallback seed: still
+    deterministic, but not checked on-chain.
+    """
+
+    def __init__(self, fallback_seed: bytes, secret: Optional[bytes] = None, length: int = 0):
+        self.fallback_seed = fallback_seed
+        # Hashed once here, off the settlement path
+        self.links = seed_chain(secret, length) if secret and length > 0 else []
+        self.start_epoch: Optional[int] = None
+        # Matches Arena refused a seeded settlement for, or that ran out of window
+        # mid-settlement: settled with settleMatch and the fallback seed from then on
+        self.unverified: Set[int] = set()
+
+    def sync(self, chain_start: int, epoch: int, anchor: bytes) -> bool:
+        """Aligns the chain with Arena's seedChainStart / seedEpoch / seedAnchor. False if they disagree."""
+        if not self.links:
+            return False
+        index = epoch - chain_start
+        expected = keccak(self.links[index]) if 0 <= index < len(self.links) else None
+        # Exhausted chains still match their last revealed link
+        if expected != anchor and not (index == len(self.links) and self.links[-1] == anchor):
+            logger.error(f"SEED_CHAIN_SECRET does not match the committed chain at epoch {epoch}. "
+                         f"Settling without on-chain verification.")
+            self.start_epoch = None
+            return False
+        self.start_epoch = chain_start
+        remaining = len(self.links) - index
+        logger.info(f"🔗 Seed chain in sync at epoch {epoch} ({remaining} seeds left)")
+        if remaining <= 0:
+            logger.warning("Seed chain exhausted. Commit a new one with Arena.commitSeedChain.")
+        return True
+
+    def chain_seed(self, epoch: Optional[int]) -> Optional[bytes]:
+        """The committed seed for an epoch, or None when the epoch is not covered by the chain."""
+        if self.start_epoch is None or epoch is None:
+            return None
+        index = epoch - self.start_epoch
+        return self.links[index] if 0 <= index < len(self.links) else None
+
+    def verifiable_seed(self, match_id: int, record: Optional[Dict[str, Any]], head: int) -> Optional[bytes]:
+        """The seed to settle with settleMatchWithSeed, or None when the match must use settleMatch."""
+        if not record or record['join_block'] is None or head - record['join_block'] >= VERIFY_WINDOW:
+            return None
+        if match_id in self.unverified:
+            return None
+        return self.chain_seed(record['seed_epoch'])
+
+    def target(self, match_id: int, record: Dict[str, Any]) -> int:
+        seed = None if match_id in self.unverified else self.chain_seed(record['seed_epoch'])
+        seed = seed or self.fallback_seed
+        # join_hash is only missing for matches stored before it was recorded
+        return derive_target(seed, match_id, record['join_hash'] or bytes(32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--length", type=int, default=int(os.getenv("SEED_CHAIN_LENGTH", "10000")))
+    args = parser.parse_args()
+
+    secret = os.getenv("SEED_CHAIN_SECRET")
+    if not secret:
+        parser.error("SEED_CHAIN_SECRET is not set")
+    links = seed_chain(to_bytes(hexstr=secret), args.length)
+    print(f"anchor: 0x{keccak(links[0]).hex()}")
+    print(f"Commit it with Arena.commitSeedChain(anchor); the chain covers {args.length} epochs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+from async_engine import AsyncArbiterEngine
+from confirmer import ReceiptConfirmer
+from health import HealthMonitor
+from outbox import Intent, OutboxEntry
+
+ARENA_ABI = json.load(open(os.path.join(os.path.dirname(__file__), "Arena.json")))["abi"]
+FEES = {'maxFeePerGas': 100, 'maxPriorityFeePerGas': 2}
+
+
+def stub_agent(resumed):
+    """The parts of ArbiterAgent the engine touches while resuming and confirming the outbox."""
+    agent = SimpleNamespace(
+        rpc_pool=None, rpc_url="http://127.0.0.1:1", health=HealthMonitor(),
+        contract_address="0x" + "11" * 20, contract=SimpleNamespace(abi=ARENA_ABI), multicall_address=None,
+        gas_oracle=SimpleNamespace(for_w3=lambda w3: None), _save_last_block=lambda block: None,
+        confirmer=ReceiptConfirmer(None, poll_interval=0.0, timeout=60.0, replace_after=30.0),
+        completed=[],
+    )
+    agent._reconcile_outbox = lambda: resumed
+    agent._complete = lambda nonce, intent, receipt: agent.completed.append(nonce)
+    return agent
+
+
+def outbox_entry(nonce: int) -> OutboxEntry:
+    tx_hash = nonce.to_bytes(32, 'big')
+    return OutboxEntry(nonce, Intent("settle", (nonce,), b"", 150000), FEES, [tx_hash], b"raw")
+
+
+def test_resume_with_more_outbox_rows_than_confirmer_slots():
+    resumed = [(outbox_entry(nonce), nonce.to_bytes(32, 'big')) for nonce in range(10)]
+    agent = stub_agent(resumed)
+
+    async def scenario():
+        engine = AsyncArbiterEngine(agent, max_in_flight=4)
+
+        async def mined(outstanding):
+            return {nonce: SimpleNamespace(status=1) for nonce in outstanding}
+
+        engine._collect_receipts = mined
+        confirmer = asyncio.create_task(engine.confirmer())
+        await engine._resume_outbox()
+        # Every resumed match is claimed before the scanner could see it again
+        assert engine.in_flight == set(range(10))
+        await asyncio.wait_for(asyncio.gather(*engine._resuming), timeout=5)
+        while len(agent.completed) < 10:
+            await asyncio.sleep(0)
+        confirmer.cancel()
+        return engine
+
+    engine = asyncio.run(asyncio.wait_for(scenario(), timeout=10))
+    assert sorted(agent.completed) == list(range(10))
+    assert engine.in_flight == set()
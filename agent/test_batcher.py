@@ -0,0 +1,56 @@
+import math
+
+from batcher import SettlementBatcher
+
+WINNER = "0x000000000000000000000000000000000000dEaD"
+
+
+def test_empty_batcher_is_never_due():
+    batcher = SettlementBatcher(max_size=3, window=2.0)
+    assert len(batcher) == 0
+    assert math.isinf(batcher.time_until_due())
+    assert not batcher.due()
+    assert batcher.drain() == []
+
+
+def test_due_when_full():
+    batcher = SettlementBatcher(max_size=3, window=60.0)
+    for match_id in range(2):
+        batcher.add(match_id, WINNER, 50)
+    assert not batcher.due()
+    batcher.add(2, WINNER, 50)
+    assert batcher.due()
+
+
+def test_due_when_window_elapses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("batcher.time.monotonic", lambda: now[0])
+    batcher = SettlementBatcher(max_size=10, window=2.0)
+    batcher.add(1, WINNER, 50)
+    now[0] = 101.5
+    assert batcher.time_until_due() == 0.5
+    now[0] = 102.0
+    assert batcher.due()
+
+
+def test_window_runs_from_oldest_entry(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("batcher.time.monotonic", lambda: now[0])
+    batcher = SettlementBatcher(max_size=10, window=2.0)
+    batcher.add(1, WINNER, 50)
+    now[0] = 1.9
+    batcher.add(2, WINNER, 50)
+    now[0] = 2.0
+    assert batcher.due()
+
+
+def test_drain_takes_oldest_max_size():
+    batcher = SettlementBatcher(max_size=2, window=60.0)
+    for match_id in range(5):
+        batcher.add(match_id, WINNER, match_id + 1)
+    assert batcher.drain() == [(0, WINNER, 1), (1, WINNER, 2)]
+    assert len(batcher) == 3
+    assert batcher.due()
+    assert [match_id for match_id, _, _ in batcher.drain()] == [2, 3]
+    assert batcher.drain() == [(4, WINNER, 5)]
+    assert len(batcher) == 0
@@ -0,0 +1,164 @@
+from types import SimpleNamespace
+
+import pytest
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+
+from confirmer import ReceiptConfirmer
+
+
+class Chain:
+    """Just enough of a Web3 for the confirmer: a head, per-block receipts and per-tx lookups."""
+
+    def __init__(self, block_receipts: bool = True):
+        self.head = 10
+        self.blocks = {}
+        self.block_receipts = block_receipts
+        self.eth = self
+        self.manager = SimpleNamespace(request_blocking=self.request_blocking)
+        self.lookups = 0
+
+    @property
+    def block_number(self) -> int:
+        return self.head
+
+    def mine(self, tx_hash: bytes, status: int = 1):
+        self.head += 1
+        # As eth_getBlockReceipts returns them, after web3's attrdict middleware
+        self.blocks[self.head] = [AttributeDict({'transactionHash': "0x" + tx_hash.hex(), 'status': hex(status),
+                                                 'blockNumber': hex(self.head)})]
+
+    def request_blocking(self, method, params):
+        if not self.block_receipts:
+            raise ValueError({'code': -32601, 'message': "the method eth_getBlockReceipts does not exist"})
+        return self.blocks.get(int(params[0], 16), [])
+
+    def get_transaction_receipt(self, tx_hash):
+        self.lookups += 1
+        for receipts in self.blocks.values():
+            for receipt in receipts:
+                if receipt['transactionHash'] == "0x" + tx_hash.hex():
+                    return AttributeDict({**receipt, 'transactionHash': tx_hash, 'status': int(receipt['status'], 16)})
+        raise TransactionNotFound(tx_hash)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1000.0}
+    monkeypatch.setattr("confirmer.time.monotonic", lambda: now['t'])
+
+    def advance(seconds: float):
+        now['t'] += seconds
+    return advance
+
+
+def confirmer_on(chain: Chain, **options) -> ReceiptConfirmer:
+    return ReceiptConfirmer(chain, max_in_flight=2, poll_interval=0.0, **options)
+
+
+def tracked(confirmer: ReceiptConfirmer, tx_hash: bytes, nonce: int, results: list, **options):
+    assert confirmer.acquire_slot(timeout=0)
+    confirmer.track(tx_hash, nonce, results.append, **options)
+
+
+def test_mined_receipt_completes_the_tx_and_frees_its_slot(clock):
+    chain = Chain()
+    confirmer, results = confirmer_on(chain), []
+    tracked(confirmer, b"\x01" * 32, 0, results)
+    tracked(confirmer, b"\x02" * 32, 1, results)
+    assert not confirmer.acquire_slot(timeout=0)
+
+    confirmer._poll_once()
+    assert results == [] and confirmer.in_flight == 2
+    chain.mine(b"\x01" * 32)
+    confirmer._poll_once()
+    assert [r.status for r in results] == [1]
+    assert confirmer.in_flight == 1
+    assert confirmer.acquire_slot(timeout=0)
+    # Found in the block's receipts, not looked up one by one
+    assert chain.lookups == 0
+
+
+def test_falls_back_to_per_tx_lookups_without_block_receipts(clock):
+    chain = Chain(block_receipts=False)
+    confirmer, results = confirmer_on(chain), []
+    tracked(confirmer, b"\x01" * 32, 0, results)
+    chain.mine(b"\x01" * 32, status=0)
+    confirmer._poll_once()
+    assert not confirmer.blocks.supported
+    assert [r.status for r in results] == [0]
+
+
+def test_stuck_tx_is_replaced_and_the_replacement_completes_it(clock):
+    chain = Chain()
+    confirmer, results = confirmer_on(chain, replace_after=30.0, max_replacements=2, timeout=600.0), []
+    replacements = iter([b"\x0b" * 32, b"\x0c" * 32, b"\x0d" * 32])
+    tracked(confirmer, b"\x0a" * 32, 5, results, replace=lambda: next(replacements))
+
+    clock(29)
+    confirmer._poll_once()
+    clock(1)
+    confirmer._poll_once()
+    clock(30)
+    confirmer._poll_once()
+    clock(30)
+    confirmer._poll_once()  # max_replacements reached: no third bump
+    entry = confirmer._pending[b"\x0a" * 32]
+    assert entry['hashes'] == [b"\x0a" * 32, b"\x0b" * 32, b"\x0c" * 32]
+    assert entry['replacements'] == 2
+
+    chain.mine(b"\x0b" * 32)
+    confirmer._poll_once()
+    assert results[0].transactionHash == b"\x0b" * 32
+    assert confirmer.in_flight == 0
+
+
+def test_failed_replacement_keeps_waiting_on_the_original(clock):
+    chain = Chain()
+    confirmer, results = confirmer_on(chain, replace_after=30.0), []
+
+    def nonce_too_low():
+        raise ValueError("nonce too low")
+    tracked(confirmer, b"\x0a" * 32, 5, results, replace=nonce_too_low)
+    clock(30)
+    confirmer._poll_once()
+    assert confirmer._pending[b"\x0a" * 32]['hashes'] == [b"\x0a" * 32]
+    chain.mine(b"\x0a" * 32)
+    confirmer._poll_once()
+    assert len(results) == 1
+
+
+def test_unmined_tx_is_dropped_after_the_timeout(clock):
+    chain = Chain()
+    confirmer, results, dropped = confirmer_on(chain, timeout=180.0), [], []
+    confirmer.on_dropped = dropped.append
+    tracked(confirmer, b"\x01" * 32, 7, results, earlier=[b"\x00" * 32])
+    clock(179)
+    confirmer._poll_once()
+    assert results == []
+    clock(1)
+    confirmer._poll_once()
+    assert results == [None] and dropped == [7]
+    assert confirmer.in_flight == 0
+    # Checked once more by hash, every known version, before giving up
+    assert chain.lookups == 2
+
+
+def test_earlier_versions_count_as_the_same_tx(clock):
+    chain = Chain()
+    confirmer, results = confirmer_on(chain), []
+    tracked(confirmer, b"\x02" * 32, 3, results, earlier=[b"\x01" * 32])
+    chain.mine(b"\x01" * 32)
+    confirmer._poll_once()
+    assert results[0].transactionHash == b"\x01" * 32
+
+
+def test_due():
+    confirmer = ReceiptConfirmer(None, timeout=100.0, replace_after=10.0, max_replacements=1)
+    entry = confirmer.new_entry(1, [b"\x01"], replace=lambda: None, sent_at=0.0)
+    assert confirmer.due(entry, 9.0) == (False, False)
+    assert confirmer.due(entry, 10.0) == (False, True)
+    entry['replacements'] = 1
+    assert confirmer.due(entry, 50.0) == (False, False)
+    assert confirmer.due(entry, 100.0) == (True, False)
+    assert confirmer.due(confirmer.new_entry(1, [b"\x01"], None, 0.0), 50.0) == (False, False)
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+import games
+from games import ENGINES, GUESSING_GAME, ZERO_ADDRESS, GameEngine, GuessingGame, load_engines, register_engine
+
+CREATOR, OPPONENT = "0xcreator", "0xopponent"
+
+
+class FixedTargets:
+    """A TargetSource stand-in: each match's target is looked up by its ID."""
+
+    def __init__(self, targets):
+        self.targets = targets
+
+    def target(self, match_id, record):
+        return self.targets[match_id]
+
+
+def record(creator_guess: int, opponent_guess: int):
+    return {'creator': CREATOR, 'opponent': OPPONENT, 'creator_guess': creator_guess, 'opponent_guess': opponent_guess}
+
+
+def closest_guess(target: int, creator_guess: int, opponent_guess: int) -> str:
+    """Arena._closestGuess, one match at a time."""
+    creator_distance, opponent_distance = abs(creator_guess - target), abs(opponent_guess - target)
+    if creator_distance == opponent_distance:
+        return ZERO_ADDRESS
+    return CREATOR if creator_distance < opponent_distance else OPPONENT
+
+
+def test_closest_guess_wins_and_ties_draw():
+    engine = GuessingGame(FixedTargets({0: 50, 1: 50, 2: 50, 3: 1}))
+    outcomes = engine.evaluate([(0, record(48, 55)), (1, record(60, 45)), (2, record(40, 60)), (3, record(100, 1))])
+    assert outcomes == [(CREATOR, 50), (OPPONENT, 50), (ZERO_ADDRESS, 50), (OPPONENT, 1)]
+
+
+def test_batch_agrees_with_the_contract_rule():
+    rng = random.Random(7)
+    targets = {match_id: rng.randint(1, 100) for match_id in range(1000)}
+    matches = [(match_id, record(rng.randint(1, 100), rng.randint(1, 100))) for match_id in targets]
+    outcomes = GuessingGame(FixedTargets(targets)).evaluate(matches)
+    assert outcomes == [(closest_guess(targets[match_id], r['creator_guess'], r['opponent_guess']), targets[match_id])
+                        for match_id, r in matches]
+    # Plain ints, ready for ABI encoding
+    assert all(type(target) is int for _, target in outcomes)
+
+
+def test_empty_batch():
+    assert GuessingGame(FixedTargets({})).evaluate([]) == []
+
+
+def test_registered_engines_are_loaded_per_game_type(monkeypatch):
+    class CreatorWins(GameEngine):
+        game_type = 7
+        name = "creator-wins"
+
+        def evaluate(self, matches):
+            return [(r['creator'], 0) for _, r in matches]
+
+    monkeypatch.setattr(games, "ENGINES", dict(ENGINES))
+    register_engine(7, CreatorWins)
+    targets = FixedTargets({})
+    engines = load_engines(targets)
+    assert isinstance(engines[GUESSING_GAME], GuessingGame) and engines[GUESSING_GAME].verifiable
+    assert engines[7].targets is targets and not engines[7].verifiable
+    assert engines[7].evaluate([(0, record(1, 2))]) == [(CREATOR, 0)]
+
+
+def test_engines_must_implement_evaluate():
+    with pytest.raises(TypeError):
+        GameEngine(FixedTargets({}))
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from gas_limits import GasLimitCache
+
+
+def test_estimates_once_per_shape_with_margin_and_headroom():
+    cache = GasLimitCache(margin=1.25, headroom=25000)
+    calls = []
+    estimate = lambda: calls.append(1) or 100000
+    assert cache.get("settle", estimate, fallback=1) == 150000
+    assert cache.get("settle", estimate, fallback=1) == 150000
+    assert len(calls) == 1
+    assert cache.cached("settle") == 150000
+    assert cache.cached("settle_draw") is None
+
+
+def test_batch_headroom_scales_with_the_matches_it_settles():
+    cache = GasLimitCache(margin=1.0, headroom=25000)
+    assert cache.get("settle_batch_1", lambda: 100000, fallback=1) == 125000
+    assert cache.get("settle_batch_8", lambda: 500000, fallback=1, units=8) == 700000
+
+
+def test_failed_estimate_uses_fallback_without_caching():
+    cache = GasLimitCache()
+
+    def reverts():
+        raise ValueError("execution reverted")
+    assert cache.get("settle", reverts, fallback=350000) == 350000
+    assert cache.cached("settle") is None
+    assert cache.get("settle", lambda: 100, fallback=350000) == int(100 * 1.25) + 25000
+
+
+def test_aget_matches_get():
+    cache = GasLimitCache(margin=1.0, headroom=1000)
+
+    async def estimate():
+        return 50000
+    assert asyncio.run(cache.aget("settle_batch_2", estimate, fallback=1, units=2)) == 52000
+    assert cache.cached("settle_batch_2") == 52000
+
+
+def receipt(status: int, gas_used: int = 0):
+    return SimpleNamespace(status=status, gasUsed=gas_used)
+
+
+def test_observe_drops_the_limit_after_a_revert_or_out_of_gas():
+    cache = GasLimitCache(margin=1.0, headroom=0)
+    cache.get("settle", lambda: 100000, fallback=1)
+    cache.observe("settle", 100000, receipt(1, 60000))
+    cache.observe("settle", 100000, None)
+    assert cache.cached("settle") == 100000
+    cache.observe("settle", 100000, receipt(0, 100000))
+    assert cache.cached("settle") is None
+
+    cache.get("settle", lambda: 100000, fallback=1)
+    cache.observe("settle", 100000, receipt(0, 40000))
+    assert cache.cached("settle") is None
@@ -0,0 +1,101 @@
+import pytest
+
+from gas_oracle import GasOracle
+
+GWEI = 10 ** 9
+
+
+class Eth:
+    def __init__(self, history=None, gas_price: int = 10 * GWEI, max_priority_fee: int = 3 * GWEI):
+        self.history = history
+        self.gas_price = gas_price
+        self.max_priority_fee = max_priority_fee
+        self.history_calls = 0
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.history_calls += 1
+        if isinstance(self.history, Exception):
+            raise self.history
+        return self.history
+
+
+def oracle_on(eth: Eth, **options) -> GasOracle:
+    return GasOracle(type("W3", (), {'eth': eth})(), **options)
+
+
+def history(base_fee: int, tips):
+    return {'baseFeePerGas': [base_fee // 2, base_fee], 'reward': [[tip] for tip in tips]}
+
+
+def test_eip1559_quote_from_fee_history():
+    oracle = oracle_on(Eth(history(20 * GWEI, [1 * GWEI, 0, 3 * GWEI, 2 * GWEI])))
+    # Median of the non-zero tips; twice the next base fee plus the tip
+    assert oracle.fees() == {'maxFeePerGas': 42 * GWEI, 'maxPriorityFeePerGas': 2 * GWEI}
+
+
+def test_empty_rewards_fall_back_to_the_node_tip():
+    oracle = oracle_on(Eth(history(20 * GWEI, [0, 0])))
+    assert oracle.fees()['maxPriorityFeePerGas'] == 3 * GWEI
+
+
+@pytest.mark.parametrize("bad_history", [{'baseFeePerGas': [0, 0], 'reward': []}, ValueError("method not found")])
+def test_unusable_fee_history_switches_to_legacy(bad_history):
+    eth = Eth(bad_history)
+    oracle = oracle_on(eth)
+    assert oracle.fees() == {'gasPrice': int(10 * GWEI * 1.25)}
+    assert not oracle.eip1559
+    oracle.observe_block(5)
+    oracle.fees()
+    assert eth.history_calls == 1
+
+
+def test_quote_is_refreshed_once_per_block():
+    eth = Eth(history(20 * GWEI, [GWEI]))
+    oracle = oracle_on(eth)
+    oracle.observe_block(100)
+    oracle.fees()
+    oracle.fees()
+    oracle.observe_block(99)  # an older head changes nothing
+    oracle.fees()
+    assert eth.history_calls == 1
+    oracle.observe_block(101)
+    oracle.fees()
+    assert eth.history_calls == 2
+
+
+def test_failed_refresh_reuses_the_last_quote():
+    eth = Eth(history(20 * GWEI, [GWEI]))
+    oracle = oracle_on(eth)
+    quote = oracle.fees()
+    eth.history = ConnectionError("timeout")
+    oracle.observe_block(1)
+    assert oracle.fees() == quote
+    assert oracle.eip1559
+
+
+def test_bump_raises_every_field_by_the_ratio():
+    oracle = GasOracle(None, bump_ratio=0.125)
+    assert oracle.bump({'maxFeePerGas': 800, 'maxPriorityFeePerGas': 80}) == {'maxFeePerGas': 901,
+                                                                              'maxPriorityFeePerGas': 91}
+    assert oracle.bump({'gasPrice': 1000}) == {'gasPrice': 1126}
+
+
+def test_bump_never_lands_below_the_market():
+    oracle = GasOracle(None, bump_ratio=0.125)
+    bumped = oracle.bump({'maxFeePerGas': 800, 'maxPriorityFeePerGas': 80},
+                         {'maxFeePerGas': 2000, 'maxPriorityFeePerGas': 10})
+    assert bumped == {'maxFeePerGas': 2000, 'maxPriorityFeePerGas': 91}
+
+
+def test_bump_keeps_max_fee_at_least_the_tip():
+    oracle = GasOracle(None, bump_ratio=0.125)
+    bumped = oracle.bump({'maxFeePerGas': 100, 'maxPriorityFeePerGas': 100}, {'maxPriorityFeePerGas': 500})
+    assert bumped['maxFeePerGas'] >= bumped['maxPriorityFeePerGas'] == 500
+
+
+def test_repeated_bumps_compound():
+    oracle = GasOracle(None, bump_ratio=0.125)
+    fees = {'gasPrice': 1000}
+    for _ in range(3):
+        previous, fees = fees, oracle.bump(fees)
+        assert fees['gasPrice'] >= previous['gasPrice'] * 1.125
@@ -0,0 +1,95 @@
+import pytest
+
+from health import HealthMonitor
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1000.0}
+    monkeypatch.setattr("health.time.monotonic", lambda: now['t'])
+
+    def advance(seconds: float):
+        now['t'] += seconds
+    return advance
+
+
+def failing(checks):
+    return sorted(name for name, check in checks.items() if not check['ok'])
+
+
+def test_fresh_monitor_is_live_and_ready(clock):
+    ok, checks = HealthMonitor().status(readiness=True)
+    assert ok and failing(checks) == []
+
+
+def test_stale_heartbeat_fails_liveness(clock):
+    monitor = HealthMonitor(max_heartbeat_age=60.0)
+    clock(60)
+    assert monitor.status(readiness=False)[0]
+    clock(1)
+    ok, checks = monitor.status(readiness=False)
+    assert not ok and failing(checks) == ['heartbeat_age_seconds']
+    monitor.heartbeat(lag=0)
+    assert monitor.status(readiness=False)[0]
+
+
+def test_lag_and_backlog_fail_readiness_only(clock):
+    monitor = HealthMonitor(max_lag=200, max_backlog=64)
+    monitor.heartbeat(lag=201)
+    monitor.backlog = lambda: 65
+    assert monitor.status(readiness=False)[0]
+    ok, checks = monitor.status(readiness=True)
+    assert not ok and failing(checks) == ['lag_blocks', 'settlement_backlog']
+    monitor.heartbeat(lag=200)
+    monitor.backlog = lambda: 64
+    assert monitor.status(readiness=True)[0]
+
+
+def test_backlog_that_cannot_be_read_is_a_breach(clock):
+    monitor = HealthMonitor()
+
+    def broken():
+        raise RuntimeError("db locked")
+    monitor.backlog = broken
+    assert failing(monitor.checks()) == ['settlement_backlog']
+
+
+def test_error_rate_needs_enough_calls_to_judge(clock):
+    monitor = HealthMonitor(max_error_rate=0.25, min_calls=20)
+    for _ in range(19):
+        monitor.record_rpc(False)
+    assert monitor.checks()['rpc_error_rate']['ok']
+    monitor.record_rpc(False)
+    assert not monitor.checks()['rpc_error_rate']['ok']
+
+
+def test_error_rate_threshold_and_window(clock):
+    monitor = HealthMonitor(max_error_rate=0.25, min_calls=4, window=300.0)
+    for ok in (True, True, True, False):
+        monitor.record_rpc(ok)
+    assert monitor.error_rate() == (0.25, 4)
+    assert monitor.checks()['rpc_error_rate']['ok']
+    monitor.record_rpc(False)
+    assert not monitor.checks()['rpc_error_rate']['ok']
+    # Old calls age out of the window
+    clock(301)
+    assert monitor.error_rate() == (0.0, 0)
+    assert monitor.checks()['rpc_error_rate']['ok']
+
+
+def test_middleware_counts_errors_and_exceptions(clock):
+    monitor = HealthMonitor()
+    responses = iter([{'result': "0x1"}, {'error': {'code': -32000}}])
+
+    def make_request(method, params):
+        response = next(responses, None)
+        if response is None:
+            raise ConnectionError("refused")
+        return response
+
+    middleware = monitor.rpc_middleware(make_request, None)
+    middleware("eth_blockNumber", [])
+    middleware("eth_blockNumber", [])
+    with pytest.raises(ConnectionError):
+        middleware("eth_blockNumber", [])
+    assert monitor.error_rate() == (pytest.approx(2 / 3), 3)
@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+
+from leader import FileLease, LeaderLease, LeadershipLost, SQLiteLease, lease_from_spec, register_backend
+from referee import ArbiterAgent
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'wall': 1000.0, 'mono': 50.0}
+    monkeypatch.setattr("leader.time.time", lambda: now['wall'])
+    monkeypatch.setattr("leader.time.monotonic", lambda: now['mono'])
+
+    def advance(seconds: float):
+        now['wall'] += seconds
+        now['mono'] += seconds
+    return advance
+
+
+@pytest.fixture
+def sqlite_lease(tmp_path):
+    opened = []
+
+    def open_lease(holder: str, ttl: float = 30.0) -> SQLiteLease:
+        lease = SQLiteLease(str(tmp_path / "leader.db"), "referee", ttl)
+        lease.holder = holder
+        opened.append(lease)
+        return lease
+
+    yield open_lease
+    for lease in opened:
+        lease.db.close()
+
+
+def test_sqlite_lease_is_exclusive_until_it_expires(sqlite_lease, clock):
+    first, second = sqlite_lease("a"), sqlite_lease("b")
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    clock(29)
+    assert first.try_acquire()  # renewed: expires 30s from now
+    clock(29)
+    assert not second.try_acquire()
+    clock(2)
+    assert second.try_acquire()
+    assert not first.try_acquire()
+
+
+def test_sqlite_lease_release_frees_it_at_once(sqlite_lease, clock):
+    first, second = sqlite_lease("a"), sqlite_lease("b")
+    assert first.try_acquire()
+    second.release()  # not the holder: no effect
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+
+
+def test_hold_renews_at_most_every_third_of_the_ttl(sqlite_lease, clock, monkeypatch):
+    lease = sqlite_lease("a", ttl=30.0)
+    calls = []
+    try_acquire = lease.try_acquire
+    monkeypatch.setattr(lease, "try_acquire", lambda: calls.append(1) or try_acquire())
+    assert lease.hold()
+    clock(9)
+    assert lease.hold()
+    assert len(calls) == 1
+    clock(1)
+    assert lease.hold()
+    assert len(calls) == 2
+
+
+def test_hold_rechecks_immediately_after_losing_the_lease(sqlite_lease, clock):
+    first, second = sqlite_lease("a"), sqlite_lease("b")
+    assert second.try_acquire()
+    assert not first.hold()
+    second.release()
+    assert first.hold()
+
+
+def test_file_lease_is_exclusive_per_open_file(tmp_path):
+    first = FileLease(str(tmp_path / "referee.lock"), "referee", 30.0)
+    second = FileLease(str(tmp_path / "referee.lock"), "referee", 30.0)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_lease_from_spec(tmp_path):
+    assert isinstance(lease_from_spec(f"file:{tmp_path / 'x.lock'}", "referee", 30.0), FileLease)
+    with pytest.raises(ValueError):
+        lease_from_spec("redis:", "referee", 30.0)
+    with pytest.raises(ValueError):
+        lease_from_spec("nosuch:somewhere", "referee", 30.0)
+
+
+def test_register_backend(monkeypatch):
+    class Always(LeaderLease):
+        def __init__(self, location, name, ttl):
+            super().__init__(name, ttl)
+            self.location = location
+
+        def try_acquire(self):
+            return True
+
+        def release(self):
+            pass
+
+    monkeypatch.setattr("leader.BACKENDS", {})
+    register_backend("always", Always)
+    lease = lease_from_spec("always:here", "referee", 10.0)
+    assert lease.location == "here" and lease.hold()
+
+
+class StubLease:
+    name = "referee"
+
+    def __init__(self, held: bool):
+        self.held = held
+
+    def hold(self) -> bool:
+        return self.held
+
+
+def test_ensure_leader_raises_once_the_lease_is_gone():
+    agent = SimpleNamespace(leader_lease=StubLease(True), is_leader=True)
+    ArbiterAgent._ensure_leader(agent)
+    agent.leader_lease.held = False
+    with pytest.raises(LeadershipLost):
+        ArbiterAgent._ensure_leader(agent)
+    assert not agent.is_leader
+
+
+def test_ensure_leader_never_takes_the_lease_over():
+    agent = SimpleNamespace(leader_lease=StubLease(True), is_leader=False)
+    with pytest.raises(LeadershipLost):
+        ArbiterAgent._ensure_leader(agent)
+    assert not agent.is_leader
+
+
+def test_ensure_leader_without_a_lease():
+    ArbiterAgent._ensure_leader(SimpleNamespace(leader_lease=None, is_leader=True))
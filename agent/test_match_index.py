@@ -0,0 +1,57 @@
+import threading
+
+from match_index import MatchIndex
+
+
+def test_transitions():
+    index = MatchIndex()
+    assert not index.is_known(5)
+    index.mark_pending(5)
+    assert index.is_pending(5) and not index.is_settled(5) and index.is_known(5)
+    index.mark_settled(5)
+    assert index.is_settled(5) and not index.is_pending(5)
+    index.clear(5)
+    assert not index.is_known(5)
+
+
+def test_neighbouring_ids_share_bytes_without_interfering():
+    index = MatchIndex()
+    for match_id in range(16):
+        if match_id % 3 == 0:
+            index.mark_settled(match_id)
+        elif match_id % 3 == 1:
+            index.mark_pending(match_id)
+    index.clear(4)
+    assert [match_id for match_id in range(16) if index.is_settled(match_id)] == [0, 3, 6, 9, 12, 15]
+    assert [match_id for match_id in range(16) if index.is_pending(match_id)] == [1, 7, 10, 13]
+
+
+def test_ids_beyond_the_bitmap_are_unknown():
+    index = MatchIndex()
+    assert not index.is_known(10 ** 6)
+    index.mark_settled(10 ** 6)
+    assert index.is_settled(10 ** 6) and not index.is_known(10 ** 6 - 1)
+    # Two bits per match
+    assert len(index._settled) + len(index._pending) <= 2 * ((10 ** 6 >> 3) + 1) * 2
+
+
+def test_load_keeps_only_terminal_rows():
+    index = MatchIndex()
+    index.load([(1, 'Settled'), (2, 'Skipped'), (3, 'Pending')])
+    assert index.is_settled(1) and index.is_settled(2)
+    assert not index.is_known(3)
+
+
+def test_concurrent_marks_are_not_lost():
+    index = MatchIndex()
+
+    def mark(start: int):
+        for match_id in range(start, 4000, 4):
+            index.mark_settled(match_id)
+
+    threads = [threading.Thread(target=mark, args=(start,)) for start in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(index.is_settled(match_id) for match_id in range(4000))
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+
+import pytest
+
+from match_store import MatchStore
+
+CREATOR, OPPONENT = "0x" + "aa" * 20, "0x" + "bb" * 20
+JOIN_HASH = b"\x42" * 32
+
+
+def event(name: str, match_id: int, block: int, **args):
+    return {'event': name, 'args': {'matchId': match_id, **args}, 'blockNumber': block, 'blockHash': b"\x00" * 32}
+
+
+def created(match_id: int, block: int = 10, guess: int = 40, game_type: int = 0):
+    return event('MatchCreated', match_id, block, creator=CREATOR, stake=10 ** 18, guess=guess, gameType=game_type)
+
+
+def joined(match_id: int, block: int = 11, guess: int = 60, epoch: int = 2):
+    return {**event('MatchJoined', match_id, block, opponent=OPPONENT, guess=guess, seedEpoch=epoch), 'blockHash': JOIN_HASH}
+
+
+def chain_match(status: int, join_block: int = 11):
+    """An Arena.matches() struct (Utils.Match field order) for a match guessed 40 vs 60."""
+    # id, creator, opponent, stake, status, winner, lastUpdate, creatorGuess, opponentGuess, targetNumber,
+    # joinBlock, seedEpoch, gameType
+    return (0, CREATOR, OPPONENT, 10 ** 18, status, None, 0, 40, 60, 0, join_block, 2, 0)
+
+
+@pytest.fixture
+def db():
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def store(db):
+    return MatchStore(db, threading.RLock())
+
+
+def test_created_then_joined_builds_a_complete_active_match(store):
+    store.apply(created(1))
+    record = store.get(1)
+    assert record['status'] == 'Pending' and not MatchStore.is_complete(record)
+    assert store.active() == []
+
+    store.apply(joined(1))
+    record = store.get(1)
+    assert MatchStore.is_complete(record)
+    assert (record['status'], record['join_block'], record['join_hash'], record['seed_epoch']) == ('Active', 11, JOIN_HASH, 2)
+    assert (record['creator_guess'], record['opponent_guess'], record['stake']) == (40, 60, 10 ** 18)
+    assert store.active() == [(1, record)]
+
+
+def test_join_seen_before_create_is_active_but_incomplete(store):
+    store.apply(joined(1))
+    assert store.get(1)['status'] == 'Active'
+    assert not MatchStore.is_complete(store.get(1))
+    store.apply(created(1, block=9))
+    assert MatchStore.is_complete(store.get(1)) and store.get(1)['status'] == 'Active'
+
+
+@pytest.mark.parametrize("name, status", [('MatchSettled', 'Settled'), ('MatchCancelled', 'Cancelled'),
+                                          ('EmergencyClaim', 'Cancelled')])
+def test_closing_events_leave_the_open_set(store, name, status):
+    store.apply(created(1))
+    store.apply(joined(1))
+    store.apply(event(name, 1, 12))
+    assert store.get(1)['status'] == status
+    assert store.active() == [] and 1 not in store._open
+    # A late join replayed from a rescan does not reopen it
+    store.apply(joined(1))
+    assert store.get(1)['status'] == status
+
+
+def test_unknown_events_are_ignored(store):
+    store.apply(event('FeesWithdrawn', 1, 12))
+    assert store.get(1) is None
+
+
+def test_touched_after_lists_matches_with_events_above_a_block(store):
+    store.apply(created(1, block=10))
+    store.apply(created(2, block=20))
+    store.apply(joined(1, block=30))
+    assert sorted(store.touched_after(15)) == [1, 2]
+    assert store.touched_after(30) == []
+
+
+def test_open_matches_survive_a_restart(db, store):
+    store.apply(created(1))
+    store.apply(joined(1))
+    store.apply(created(2))
+    store.apply(event('MatchSettled', 2, 12))
+    reopened = MatchStore(db, threading.RLock())
+    assert set(reopened._open) == {1}
+    assert reopened.get(1) == store.get(1)
+    assert reopened.get(2)['status'] == 'Settled'
+
+
+def test_hydrate_keeps_the_join_hash_from_the_event(store):
+    store.apply(created(1))
+    store.apply(joined(1, block=11))
+    store.hydrate(1, chain_match(status=2))
+    record = store.get(1)
+    assert record['status'] == 'Settled'
+    assert record['join_hash'] == JOIN_HASH and record['event_block'] == 11
+
+
+def test_hydrate_a_match_never_seen_in_logs(store):
+    store.hydrate(5, chain_match(status=1), event_block=7)
+    record = store.get(5)
+    assert record['status'] == 'Active' and MatchStore.is_complete(record)
+    assert (record['join_block'], record['join_hash'], record['event_block']) == (11, None, 7)
+    assert store.active() == [(5, record)]
+
+
+def test_hydrate_a_pending_match_has_no_join_block(store):
+    store.hydrate(5, chain_match(status=0, join_block=0))
+    assert store.get(5)['join_block'] is None
+    assert store.get(5)['status'] == 'Pending'
+
+
+def test_old_databases_gain_the_new_columns(db):
+    db.execute("CREATE TABLE matches (match_id INTEGER PRIMARY KEY, creator TEXT, stake TEXT, creator_guess INTEGER, "
+               "opponent TEXT, opponent_guess INTEGER, status TEXT)")
+    db.execute("INSERT INTO matches VALUES (1, ?, '5', 10, ?, 20, 'Active')", (CREATOR, OPPONENT))
+    record = MatchStore(db, threading.RLock()).get(1)
+    assert record['game_type'] == 0 and record['join_block'] is None and record['stake'] == 5
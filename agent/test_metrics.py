@@ -0,0 +1,92 @@
+import pytest
+
+from metrics import Counter, Gauge, GaugeFamily, Histogram, RateGauge, Registry
+
+
+def test_counter_renders_labelled_series_sorted():
+    counter = Counter("tx_total", "Transactions.", ("result",))
+    counter.inc(result="success")
+    counter.inc(2, result="reverted")
+    counter.inc(result="success")
+    assert counter.render() == "\n".join([
+        "# HELP tx_total Transactions.",
+        "# TYPE tx_total counter",
+        'tx_total{result="reverted"} 2',
+        'tx_total{result="success"} 2',
+    ])
+    assert counter.value(result="success") == 2 and counter.value(result="dropped") == 0
+
+
+def test_unlabelled_counter_and_float_values():
+    counter = Counter("seconds_total", "Seconds.")
+    counter.inc(0.5)
+    counter.inc(0.25)
+    assert counter.render().splitlines()[-1] == "seconds_total 0.75"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("mode",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, mode="single")
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{mode="single",le="0.1"} 2',
+        'latency_seconds_bucket{mode="single",le="1.0"} 3',
+        'latency_seconds_bucket{mode="single",le="+Inf"} 4',
+        'latency_seconds_sum{mode="single"} 3.65',
+        'latency_seconds_count{mode="single"} 4',
+    ]
+    assert histogram.count(mode="single") == 4 and histogram.count(mode="multicall") == 0
+
+
+def test_histogram_time_observes_even_when_the_block_raises():
+    histogram = Histogram("op_seconds", "Op.")
+    with pytest.raises(ValueError):
+        with histogram.time():
+            raise ValueError("boom")
+    assert histogram.count() == 1
+
+
+def test_gauge_callbacks_are_read_at_scrape_time():
+    gauge = Gauge("in_flight", "In flight.")
+    gauge.set(3)
+    assert gauge.render().splitlines()[-1] == "in_flight 3"
+    depth = {'value': 5}
+    gauge.set_function(lambda: depth['value'])
+    depth['value'] = 7
+    assert gauge.render().splitlines()[-1] == "in_flight 7"
+
+
+def test_failing_callbacks_drop_only_their_sample():
+    def broken():
+        raise RuntimeError("closed")
+    gauge = Gauge("broken", "Broken.")
+    gauge.set_function(broken)
+    assert gauge.render() == "# HELP broken Broken.\n# TYPE broken gauge"
+
+    family = GaugeFamily("queue_depth", "Depth.", ("stage",))
+    family.set_function(broken, stage="sign")
+    family.set_function(lambda: 4, stage="decode")
+    assert family.render().splitlines()[2:] == ['queue_depth{stage="decode"} 4']
+    assert family.value(stage="decode") == 4 and family.value(stage="missing") == 0
+
+
+def test_rate_gauge_counts_the_trailing_window(monkeypatch):
+    now = {'t': 100.0}
+    monkeypatch.setattr("metrics.time.monotonic", lambda: now['t'])
+    rate = RateGauge("per_minute", "Per minute.", window=60.0)
+    rate.mark(3)
+    now['t'] += 30
+    rate.mark()
+    assert rate.value() == 4
+    now['t'] += 31
+    assert rate.value() == 1
+
+
+def test_registry_renders_every_metric_in_order():
+    registry = Registry()
+    registry.register(Counter("a_total", "A."))
+    registry.register(Gauge("b", "B."))
+    text = registry.render()
+    assert text.endswith("\n")
+    assert [line for line in text.splitlines() if line.startswith("# TYPE")] == ["# TYPE a_total counter",
+                                                                                 "# TYPE b gauge"]
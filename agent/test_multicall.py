@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.providers import BaseProvider
+
+from multicall import MULTICALL3_ADDRESS, MatchReader
+
+ARENA_ABI = json.load(open(os.path.join(os.path.dirname(__file__), "Arena.json")))["abi"]
+ARENA_ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+MATCH_TYPES = [o['type'] for o in next(item for item in ARENA_ABI if item.get('name') == "matches")['outputs']]
+AGGREGATE3 = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+
+def match_struct(match_id: int):
+    return [match_id, "0x" + "aa" * 20, "0x" + "bb" * 20, 10 ** 18, 1, "0x" + "00" * 20, 0, 40, 60, 0, 11, 2, 0]
+
+
+class Node(BaseProvider):
+    """Answers eth_call for Arena.matches() and, when deployed, Multicall3.aggregate3.
+
+    IDs in `missing` revert, as a matches() read of a failing node would. `multicall` is
+    'deployed', 'absent' (no code: empty return data) or 'flaky' (the batch call errors).
+    """
+
+    def __init__(self, multicall: str = "deployed", missing=()):
+        self.multicall = multicall
+        self.missing = set(missing)
+        self.calls = []
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {'jsonrpc': "2.0", 'id': 1, 'result': "0x1"}
+        if method == "eth_getCode":
+            # web3 checks for code when a call returns nothing
+            return {'jsonrpc': "2.0", 'id': 1, 'result': "0x" if self.multicall == "absent" else "0x6000"}
+        assert method == "eth_call"
+        to, data = Web3.to_checksum_address(params[0]['to']), bytes.fromhex(params[0]['data'][2:])
+        if to == ARENA_ADDRESS:
+            self.calls.append("matches")
+            match_id = int.from_bytes(data[4:], 'big')
+            if match_id in self.missing:
+                return {'jsonrpc': "2.0", 'id': 1, 'error': {'code': 3, 'message': "execution reverted"}}
+            return {'jsonrpc': "2.0", 'id': 1, 'result': "0x" + self.matches(match_id).hex()}
+        self.calls.append("aggregate3")
+        if self.multicall == "absent":
+            return {'jsonrpc': "2.0", 'id': 1, 'result': "0x"}
+        if self.multicall == "flaky":
+            raise ConnectionError("connection reset")
+        assert data[:4] == AGGREGATE3
+        (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+        results = []
+        for target, _, call_data in calls:
+            match_id = int.from_bytes(call_data[4:], 'big')
+            ok = match_id not in self.missing
+            results.append((ok, self.matches(match_id) if ok else b""))
+        return {'jsonrpc': "2.0", 'id': 1, 'result': "0x" + encode(['(bool,bytes)[]'], [results]).hex()}
+
+    @staticmethod
+    def matches(match_id: int) -> bytes:
+        return encode(MATCH_TYPES, match_struct(match_id))
+
+
+def reader_on(node: Node, **options) -> MatchReader:
+    w3 = Web3(node)
+    return MatchReader(w3, w3.eth.contract(address=ARENA_ADDRESS, abi=ARENA_ABI), **options)
+
+
+def test_reads_a_batch_in_one_multicall():
+    node = Node()
+    out = reader_on(node, chunk_size=2).fetch([3, 1, 3, 2])
+    assert sorted(out) == [1, 2, 3]
+    assert out[2][0] == 2 and out[2][7:9] == (40, 60)
+    assert out[2][1] == Web3.to_checksum_address("0x" + "aa" * 20)
+    # Duplicates dropped, then chunked: [3, 1] and [2], the lone ID read directly
+    assert node.calls == ["aggregate3", "matches"]
+
+
+def test_failed_calls_inside_a_multicall_are_omitted():
+    out = reader_on(Node(missing={2})).fetch([1, 2, 3])
+    assert sorted(out) == [1, 3]
+
+
+def test_missing_multicall_falls_back_to_single_reads_for_good():
+    node = Node(multicall="absent")
+    reader = reader_on(node)
+    assert sorted(reader.fetch([1, 2])) == [1, 2]
+    assert reader.multicall is None
+    assert sorted(reader.fetch([3, 4])) == [3, 4]
+    assert node.calls == ["aggregate3", "matches", "matches", "matches", "matches"]
+
+
+def test_failed_batch_is_retried_per_match_and_multicall_kept():
+    node = Node(multicall="flaky", missing={2})
+    reader = reader_on(node)
+    assert sorted(reader.fetch([1, 2, 3])) == [1, 3]
+    assert reader.multicall is not None
+    assert node.calls == ["aggregate3", "matches", "matches", "matches"]
+
+
+def test_without_a_multicall_address_every_read_is_single():
+    node = Node()
+    assert sorted(reader_on(node, multicall_address=None).fetch([1, 2])) == [1, 2]
+    assert node.calls == ["matches", "matches"]
+
+
+def test_multicall_address_is_the_canonical_deployment():
+    assert reader_on(Node()).multicall.address == MULTICALL3_ADDRESS
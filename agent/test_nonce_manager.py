@@ -0,0 +1,75 @@
+import pytest
+
+from nonce_manager import NonceManager, is_nonce_error
+
+
+def synced(chain_nonce: int = 7) -> NonceManager:
+    nonces = NonceManager()
+    nonces.sync(chain_nonce)
+    return nonces
+
+
+def test_allocate_requires_sync():
+    nonces = NonceManager()
+    assert not nonces.synced
+    with pytest.raises(RuntimeError):
+        nonces.allocate()
+
+
+def test_allocates_sequentially_from_chain_nonce():
+    nonces = synced(7)
+    assert [nonces.allocate() for _ in range(3)] == [7, 8, 9]
+
+
+def test_releasing_newest_nonce_rewinds():
+    nonces = synced(7)
+    nonces.allocate()
+    nonces.release(nonces.allocate())
+    assert nonces.allocate() == 8
+
+
+def test_released_gap_is_refilled_before_new_nonces():
+    nonces = synced(0)
+    for _ in range(5):
+        nonces.allocate()
+    nonces.release(3)
+    nonces.release(1)
+    assert [nonces.allocate() for _ in range(3)] == [1, 3, 5]
+
+
+def test_release_ignores_nonces_never_handed_out():
+    nonces = synced(5)
+    nonces.release(5)
+    nonces.release(9)
+    assert nonces.allocate() == 5
+
+
+def test_sync_drops_gaps():
+    nonces = synced(0)
+    for _ in range(3):
+        nonces.allocate()
+    nonces.release(0)
+    nonces.sync(10)
+    assert nonces.allocate() == 10
+
+
+def test_invalidate_forces_resync():
+    nonces = synced(3)
+    nonces.allocate()
+    nonces.invalidate()
+    assert not nonces.synced
+    with pytest.raises(RuntimeError):
+        nonces.allocate()
+    nonces.sync(4)
+    assert nonces.allocate() == 4
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("nonce too low: next nonce 12, tx nonce 10", True),
+    ("Invalid transaction nonce", True),
+    ("replacement transaction underpriced", True),
+    ("already known", False),
+    ("insufficient funds for gas * price + value", False),
+])
+def test_is_nonce_error(message, expected):
+    assert is_nonce_error(ValueError({"code": -32000, "message": message})) is expected
@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from outbox import Intent, SettlementOutbox, find_receipts, is_already_known, is_rejection
+from referee import ArbiterAgent
+
+FEES = {'maxFeePerGas': 100, 'maxPriorityFeePerGas': 2}
+
+
+def tx_hash(nonce: int, version: int = 0) -> bytes:
+    return bytes([nonce, version]) * 16
+
+
+def intent(*match_ids: int) -> Intent:
+    return Intent("settle", match_ids, b"\x01\x02", 150000)
+
+
+@pytest.fixture
+def outbox():
+    db = sqlite3.connect(":memory:", check_same_thread=False)
+    yield SettlementOutbox(db, threading.RLock())
+    db.close()
+
+
+def test_log_and_entries_round_trip(outbox):
+    outbox.log(7, intent(3, 4), FEES, tx_hash(7), b"raw7")
+    outbox.log(5, intent(1), FEES, tx_hash(5), b"raw5")
+    entries = outbox.entries()
+    assert [entry.nonce for entry in entries] == [5, 7]
+    assert entries[1].intent == intent(3, 4)
+    assert entries[1].fees == FEES
+    assert entries[1].tx_hashes == [tx_hash(7)]
+    assert entries[1].raw_tx == b"raw7"
+    assert outbox.match_ids() == [1, 3, 4]
+
+
+def test_log_replacement_keeps_every_hash(outbox):
+    outbox.log(5, intent(1), FEES, tx_hash(5), b"raw")
+    bumped = {'maxFeePerGas': 120, 'maxPriorityFeePerGas': 3}
+    outbox.log_replacement(5, Intent("settle_unseeded", (1,), b"\x03", 160000), bumped, tx_hash(5, 1), b"raw2")
+    [entry] = outbox.entries()
+    assert entry.tx_hashes == [tx_hash(5), tx_hash(5, 1)]
+    assert entry.intent.shape == "settle_unseeded"
+    assert entry.fees == bumped
+    assert entry.raw_tx == b"raw2"
+
+
+def test_log_overwrites_a_stale_row_and_remove_deletes(outbox):
+    outbox.log(5, intent(1), FEES, tx_hash(5), b"old")
+    outbox.log(5, intent(2), FEES, tx_hash(5, 1), b"new")
+    assert [entry.intent.match_ids for entry in outbox.entries()] == [(2,)]
+    outbox.remove(5)
+    assert outbox.entries() == []
+
+
+@pytest.mark.parametrize("error, rejected", [
+    (ValueError("insufficient funds for gas * price + value"), True),
+    (ValueError("already known"), False),
+    (ValueError("nonce too low"), True),
+    (TimeoutError("read timed out"), False),
+    (ConnectionError("connection reset"), False),
+])
+def test_is_rejection(error, rejected):
+    assert is_rejection(error) == rejected
+
+
+def test_is_already_known_variants():
+    assert is_already_known(ValueError("Known transaction: 0xabc"))
+    assert is_already_known(ValueError("ALREADY IMPORTED"))
+    assert not is_already_known(ValueError("replacement transaction underpriced"))
+
+
+class Node:
+    """Just enough of w3.eth for the reconciler: receipts by hash, the mined nonce and a mempool."""
+
+    def __init__(self, mined_nonce: int, receipts=None, broadcast_error=None):
+        self.mined_nonce = mined_nonce
+        self.receipts = receipts or {}
+        self.broadcast_error = broadcast_error
+        self.broadcast = []
+        self.eth = self
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+    def get_transaction_count(self, address, block_identifier):
+        return self.mined_nonce
+
+    def send_raw_transaction(self, raw_tx):
+        if self.broadcast_error:
+            raise self.broadcast_error
+        self.broadcast.append(raw_tx)
+
+
+def reconciler(outbox: SettlementOutbox, node: Node):
+    """An agent stub recording what _reconcile_outbox completes, claims and drops."""
+    agent = SimpleNamespace(outbox=outbox, w3=node, referee_address="0xref",
+                            completed=[], pending=[], dropped=[])
+    agent._complete = lambda nonce, intent, receipt: agent.completed.append((nonce, receipt))
+    agent._mark_match_pending = lambda match_id, tx: agent.pending.append(match_id)
+    agent._drop_outbox_entry = lambda entry: agent.dropped.append(entry.nonce)
+    return agent
+
+
+def test_reconcile_completes_mined_rebroadcasts_open_and_drops_used_nonces(outbox):
+    receipt = SimpleNamespace(transactionHash=tx_hash(4, 1), status=1)
+    outbox.log(3, intent(1), FEES, tx_hash(3), b"raw3")       # nonce used by something else
+    outbox.log(4, intent(2), FEES, tx_hash(4), b"raw4")       # mined, via its fee bump
+    outbox.log_replacement(4, intent(2), FEES, tx_hash(4, 1), b"raw4b")
+    outbox.log(5, intent(3), FEES, tx_hash(5), b"raw5")       # still open
+    node = Node(mined_nonce=5, receipts={tx_hash(4, 1): receipt})
+    agent = reconciler(outbox, node)
+
+    resumed = ArbiterAgent._reconcile_outbox(agent)
+    assert [(entry.nonce, hash_) for entry, hash_ in resumed] == [(5, tx_hash(5))]
+    assert node.broadcast == [b"raw5"]
+    assert agent.completed == [(4, receipt)]
+    assert agent.pending == [2]
+    assert agent.dropped == [3]
+
+
+def test_reconcile_drops_rejected_rebroadcasts_but_resumes_unknown_outcomes(outbox):
+    outbox.log(5, intent(1), FEES, tx_hash(5), b"raw5")
+    rejected = reconciler(outbox, Node(mined_nonce=5, broadcast_error=ValueError("insufficient funds")))
+    assert ArbiterAgent._reconcile_outbox(rejected) == []
+    assert rejected.dropped == [5]
+
+    timed_out = reconciler(outbox, Node(mined_nonce=5, broadcast_error=TimeoutError("read timed out")))
+    assert [entry.nonce for entry, _ in ArbiterAgent._reconcile_outbox(timed_out)] == [5]
+    assert timed_out.dropped == []
+
+
+def test_find_receipts_checks_every_version(outbox):
+    outbox.log(5, intent(1), FEES, tx_hash(5), b"raw")
+    outbox.log_replacement(5, intent(1), FEES, tx_hash(5, 1), b"raw2")
+    outbox.log(6, intent(2), FEES, tx_hash(6), b"raw")
+    node = Node(mined_nonce=0, receipts={tx_hash(5, 1): "receipt"})
+    assert find_receipts(node, outbox.entries()) == {5: "receipt", 6: None}
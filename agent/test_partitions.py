@@ -0,0 +1,108 @@
+import pytest
+
+from partitions import PartitionLeases
+
+
+@pytest.fixture
+def leases(tmp_path):
+    opened = []
+
+    def open_worker(worker_index: int, worker_count: int = 3, ttl: float = 30.0) -> PartitionLeases:
+        worker = PartitionLeases(str(tmp_path / "leases.db"), worker_index, worker_count, ttl=ttl)
+        opened.append(worker)
+        return worker
+
+    yield open_worker
+    for worker in opened:
+        worker.db.close()
+
+
+def test_rejects_worker_index_out_of_range(tmp_path):
+    with pytest.raises(ValueError):
+        PartitionLeases(str(tmp_path / "leases.db"), 3, 3)
+
+
+def test_partition_of_and_owns(leases):
+    worker = leases(1)
+    worker.refresh()
+    assert worker.partition_of(7) == 1
+    assert worker.owns(7)
+    assert not worker.owns(6)
+
+
+def test_each_worker_claims_only_its_home_partition_at_startup(leases):
+    workers = [leases(index) for index in range(3)]
+    assert [worker.refresh() for worker in workers] == [{0}, {1}, {2}]
+    # Renewals acquire nothing new
+    assert workers[0].refresh() == set()
+    assert workers[0].owned == {0}
+
+
+def test_takes_over_a_dead_workers_partition_after_a_ttl(leases, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("partitions.time.time", lambda: now[0])
+    first, second = leases(0, 2, ttl=30.0), leases(1, 2, ttl=30.0)
+    first.refresh()
+    second.refresh()
+
+    # Worker 1 stops renewing; once its lease and heartbeat expire, worker 0 takes over
+    now[0] += 20
+    assert first.refresh() == set()
+    now[0] += 11
+    assert first.refresh() == {1}
+    assert first.owns(3)
+
+
+def test_hands_partition_back_when_home_worker_returns(leases, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("partitions.time.time", lambda: now[0])
+    first = leases(0, 2, ttl=30.0)
+    first.refresh()
+    now[0] += 20
+    first.refresh()
+    now[0] += 11
+    assert first.refresh() == {1}
+
+    returning = leases(1, 2, ttl=30.0)
+    returning.refresh()
+    first.refresh()
+    assert first.owned == {0}
+    assert returning.refresh() == {1}
+
+
+def test_release_frees_leases_without_waiting_for_expiry(leases, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("partitions.time.time", lambda: now[0])
+    survivor = leases(1, 2, ttl=30.0)
+    now[0] += 40
+    leaving = leases(0, 2, ttl=30.0)
+    leaving.refresh()
+    assert survivor.refresh() == {1}
+
+    leaving.release()
+    assert survivor.refresh() == {0}
+
+
+def test_owns_nothing_once_leases_lapse_unrenewed(leases, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("partitions.time.time", lambda: now[0])
+    worker = leases(0, 2, ttl=30.0)
+    worker.refresh()
+    now[0] += 29
+    assert worker.owns(2)
+    # A long backfill that never renewed: another worker may hold the partition by now
+    now[0] += 1
+    assert not worker.owns(2)
+    worker.refresh()
+    assert worker.owns(2)
+
+
+def test_renewing_a_lapsed_lease_counts_as_reacquiring_it(leases, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("partitions.time.time", lambda: now[0])
+    worker = leases(0, 1, ttl=30.0)
+    assert worker.refresh() == {0}
+    now[0] += 10
+    assert worker.refresh() == set()
+    now[0] += 31
+    assert worker.refresh() == {0}
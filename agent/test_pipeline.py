@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from pipeline import DEFAULT_WORKERS, ScanWatermark, StageQueue, parse_stage_workers
+
+
+@pytest.fixture
+def watermark():
+    saved = []
+    mark = ScanWatermark(saved.append)
+    mark.saved = saved
+    return mark
+
+
+def test_checkpoint_waits_for_every_item_of_a_range(watermark):
+    token = watermark.open(100)
+    watermark.add(token, 2)  # two events decoded from the range
+    watermark.done(token)    # the scanner is finished with it
+    watermark.done(token)
+    assert watermark.saved == []
+    watermark.done(token)
+    assert watermark.saved == [100]
+    assert len(watermark) == 0
+
+
+def test_ranges_complete_in_scan_order(watermark):
+    first, second, third = watermark.open(100), watermark.open(200), watermark.open(300)
+    watermark.add(first)
+    watermark.done(second)
+    watermark.done(third)
+    assert watermark.saved == []
+    watermark.done(first)
+    assert watermark.saved == []
+    watermark.done(first)
+    # One save for everything that completed behind the slow range
+    assert watermark.saved == [300]
+
+
+def test_untracked_items_are_ignored(watermark):
+    token = watermark.open(100)
+    watermark.add(None)
+    watermark.done(None)
+    watermark.done(12345)
+    assert watermark.saved == [] and len(watermark) == 1
+    watermark.done(token)
+    assert watermark.saved == [100]
+
+
+def test_rewind_clamps_open_ranges_to_the_fork(watermark):
+    assert not watermark.rewind(50)
+    first, second = watermark.open(100), watermark.open(200)
+    assert watermark.rewind(150)
+    watermark.done(first)
+    watermark.done(second)
+    assert watermark.saved == [100, 150]
+
+
+def test_reset_forgets_open_ranges(watermark):
+    token = watermark.open(100)
+    watermark.reset()
+    watermark.done(token)
+    assert watermark.saved == [] and len(watermark) == 0
+
+
+def test_parse_stage_workers():
+    assert parse_stage_workers("") == DEFAULT_WORKERS
+    assert parse_stage_workers(" evaluate=8, broadcast=0 ") == {**DEFAULT_WORKERS, 'evaluate': 8, 'broadcast': 1}
+    with pytest.raises(ValueError):
+        parse_stage_workers("verify=2")
+
+
+def test_full_stage_queue_blocks_the_producer():
+    async def scenario():
+        queue = StageQueue("test-stage", maxsize=1)
+        await queue.put(1)
+        blocked = asyncio.create_task(queue.put(2))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert await queue.get() == 1
+        await blocked
+        return await queue.get()
+
+    assert asyncio.run(scenario()) == 2
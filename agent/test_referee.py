@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+from referee import ArbiterAgent, MAX_SETTLE_ATTEMPTS
+
+ACTIVE, SETTLED, CANCELLED = 1, 2, 3
+
+
+def chain_match(status: int):
+    """An Arena.matches() struct with only the fields MatchStore.hydrate reads filled in."""
+    return (0, "0xcreator", "0xopponent", 10 ** 18, status, 0, 0, 10, 90, 0, 100, 0, 0)
+
+
+class Store:
+    def __init__(self):
+        self.records = {}
+
+    def hydrate(self, match_id, match_data, event_block=None):
+        self.records[match_id] = {'status': {ACTIVE: 'Active', SETTLED: 'Settled', CANCELLED: 'Cancelled'}[match_data[4]]}
+
+    def get(self, match_id):
+        return self.records.get(match_id)
+
+
+def retrying_agent(chain, reader_error=None):
+    """An agent stub recording what _retry_failed retries, settles and skips."""
+    def fetch(match_ids):
+        if reader_error:
+            raise reader_error
+        return {match_id: chain[match_id] for match_id in match_ids if match_id in chain}
+
+    agent = SimpleNamespace(match_reader=SimpleNamespace(fetch=fetch), match_store=Store(), settle_attempts={},
+                            retried=[], settled=[], skipped=[])
+    agent._retry_later = agent.retried.extend
+    agent._mark_match_settled = agent.settled.append
+    agent._mark_match_skipped = agent.skipped.append
+    return agent
+
+
+def test_retries_only_matches_still_active_on_chain():
+    agent = retrying_agent({1: chain_match(ACTIVE), 2: chain_match(SETTLED), 3: chain_match(CANCELLED)})
+    ArbiterAgent._retry_failed(agent, [1, 2, 3], "reverted")
+    assert agent.retried == [1]
+    assert agent.settled == [2]
+    assert agent.skipped == [3]
+    assert agent.settle_attempts == {1: 1}
+
+
+def test_retries_when_the_chain_cannot_be_read():
+    agent = retrying_agent({}, reader_error=ConnectionError("down"))
+    ArbiterAgent._retry_failed(agent, [4], "was dropped")
+    assert agent.retried == [4]
+
+
+def test_gives_up_after_max_attempts():
+    agent = retrying_agent({1: chain_match(ACTIVE)})
+    for _ in range(MAX_SETTLE_ATTEMPTS - 1):
+        ArbiterAgent._retry_failed(agent, [1], "reverted")
+    assert agent.retried == [1] * (MAX_SETTLE_ATTEMPTS - 1)
+    ArbiterAgent._retry_failed(agent, [1], "reverted")
+    assert agent.skipped == [1]
+    assert agent.settle_attempts == {}
+
+
+@pytest.mark.parametrize("receipt, failure", [(None, "was dropped"), (SimpleNamespace(status=0), "reverted")])
+def test_batch_receipt_failures_are_retried(receipt, failure):
+    calls = []
+    agent = SimpleNamespace(_retry_failed=lambda match_ids, why: calls.append((match_ids, why)))
+    ArbiterAgent._on_batch_receipt(agent, [5, 6], receipt)
+    assert calls == [([5, 6], failure)]
@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+
+import pytest
+from eth_utils import keccak
+from web3 import Web3
+
+from reorg import BlockHashWindow
+
+
+def block_hash(number: int, fork: str = "") -> bytes:
+    return keccak(text=f"{fork}block{number}")
+
+
+@pytest.fixture
+def window():
+    db = sqlite3.connect(":memory:", check_same_thread=False)
+    yield BlockHashWindow(db, threading.RLock(), size=8)
+    db.close()
+
+
+def stored(window: BlockHashWindow):
+    return [number for number, _ in window.newest_first(10 ** 9)][::-1]
+
+
+def test_record_and_get(window):
+    window.record(5, block_hash(5))
+    assert window.get(5) == Web3.to_hex(block_hash(5))
+    assert window.get(6) is None
+
+
+def test_record_replaces_hash(window):
+    window.record(5, block_hash(5))
+    window.record(5, block_hash(5, "fork"))
+    assert window.get(5) == Web3.to_hex(block_hash(5, "fork"))
+
+
+def test_record_many_keeps_size_below_newest(window):
+    window.record_many((number, block_hash(number)) for number in range(1, 21))
+    assert stored(window) == list(range(13, 21))
+
+
+def test_record_many_prunes_relative_to_newest_in_any_order(window):
+    window.record_many([(20, block_hash(20)), (3, block_hash(3)), (15, block_hash(15))])
+    assert stored(window) == [15, 20]
+
+
+def test_record_many_ignores_empty_input(window):
+    window.record(5, block_hash(5))
+    window.record_many([])
+    assert stored(window) == [5]
+
+
+@pytest.mark.parametrize("start, end, head, expected", [
+    (1, 20, 20, 13),    # only the last `size` blocks below head
+    (15, 20, 20, 15),   # whole range already within the window
+    (1, 20, 100, 20),   # range far below head: still record its end
+    (1, 20, 22, 15),
+])
+def test_first_recorded(window, start, end, head, expected):
+    assert window.first_recorded(start, end, head) == expected
+
+
+def test_newest_first_and_rewind(window):
+    window.record_many((number, block_hash(number)) for number in range(10, 15))
+    assert [number for number, _ in window.newest_first(13)] == [12, 11, 10]
+    window.rewind(11)
+    assert stored(window) == [10, 11]
+
+
+def test_fork_point_is_newest_canonical_block(window):
+    window.record_many((number, block_hash(number)) for number in range(10, 18))
+    canonical = {number: block_hash(number, "" if number <= 14 else "fork") for number in range(10, 18)}
+    assert window.fork_point(17, canonical) == 14
+
+
+def test_fork_point_only_looks_below_last_block(window):
+    window.record_many((number, block_hash(number)) for number in range(10, 18))
+    canonical = {number: block_hash(number) for number in range(10, 18)}
+    assert window.fork_point(15, canonical) == 14
+
+
+def test_fork_deeper_than_window_rescans_all_of_it(window):
+    window.record_many((number, block_hash(number)) for number in range(10, 18))
+    canonical = {number: block_hash(number, "fork") for number in range(10, 18)}
+    assert window.fork_point(17, canonical) == 17 - window.size
+
+
+def test_fork_point_with_nothing_stored(window):
+    assert window.fork_point(3, {}) == 0
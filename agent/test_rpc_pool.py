@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from rpc_pool import AsyncPooledHTTPProvider, PooledHTTPProvider, RPCPool
+
+
+class FakeNode:
+    """A provider answering from a fixed head; records every method it was asked."""
+
+    def __init__(self, url: str, head: int = 100, error: Exception = None):
+        self.url = url
+        self.head = head
+        self.error = error
+        self.calls = []
+
+    def answer(self, method, params):
+        self.calls.append(method)
+        if self.error:
+            raise self.error
+        if method == "eth_blockNumber":
+            return {'jsonrpc': "2.0", 'id': 1, 'result': hex(self.head)}
+        return {'jsonrpc': "2.0", 'id': 1, 'result': self.url}
+
+    def make_request(self, method, params):
+        return self.answer(method, params)
+
+
+class AsyncFakeNode(FakeNode):
+    async def make_request(self, method, params):
+        return self.answer(method, params)
+
+
+@pytest.fixture
+def cluster():
+    def build(heads, node=FakeNode, provider=PooledHTTPProvider, probe=False, **pool_options):
+        pool = RPCPool([f"http://node{i}" for i in range(len(heads))], **pool_options)
+        nodes = {f"http://node{i}": node(f"http://node{i}", head) for i, head in enumerate(heads)}
+        if not probe:
+            pool._heads_probed_at = time.monotonic()
+        return pool, nodes, provider(pool, provider_factory=nodes.__getitem__)
+    return build
+
+
+def test_block_number_goes_to_one_node(cluster):
+    pool, nodes, provider = cluster([100, 90, 80])
+    assert int(provider.make_request("eth_blockNumber", [])['result'], 16) == 100
+    assert sum(node.calls.count("eth_blockNumber") for node in nodes.values()) == 1
+
+
+def test_heads_are_probed_once_per_interval(cluster):
+    pool, nodes, provider = cluster([100, 90, 80], probe=True, head_refresh=60.0)
+    provider.make_request("eth_chainId", [])
+    provider.make_request("eth_chainId", [])
+    provider._executor.shutdown(wait=True)
+    assert [node.calls.count("eth_blockNumber") for node in nodes.values()] == [1, 1, 1]
+    assert [endpoint.head for endpoint in pool.endpoints] == [100, 90, 80]
+
+
+def test_single_node_is_never_probed(cluster):
+    pool, nodes, provider = cluster([100], probe=True)
+    provider.make_request("eth_chainId", [])
+    assert nodes["http://node0"].calls == ["eth_chainId"]
+
+
+def test_get_logs_skips_nodes_behind_its_to_block(cluster):
+    pool, nodes, provider = cluster([80, 100])
+    pool.endpoints[0].head, pool.endpoints[1].head = 80, 100
+    pool.record(pool.endpoints[0], "eth_call", 0.01, ok=True)
+    pool.record(pool.endpoints[1], "eth_call", 0.5, ok=True)
+    assert [e.url for e in pool.ranked("eth_getLogs", [{'toBlock': hex(95)}])][0] == "http://node1"
+    assert [e.url for e in pool.ranked("eth_getLogs", [{'toBlock': 50}])][0] == "http://node0"
+    # Nobody has reached it: fall back to the normal ranking
+    assert [e.url for e in pool.ranked("eth_getLogs", [{'toBlock': 500}])][0] == "http://node0"
+
+
+def test_failing_node_is_benched_and_reads_fail_over(cluster):
+    pool, nodes, provider = cluster([100, 100], max_failures=2, cooldown=60.0)
+    nodes["http://node0"].error = ConnectionError("refused")
+    assert provider.make_request("eth_chainId", [])['result'] == "http://node1"
+    assert pool.is_healthy(pool.endpoints[0])
+    pool.record(pool.endpoints[0], "eth_chainId", 0.01, ok=False)
+    assert not pool.is_healthy(pool.endpoints[0])
+    assert [e.url for e in pool.ranked()] == ["http://node1", "http://node0"]
+
+
+def test_raw_transactions_go_to_every_healthy_node(cluster):
+    pool, nodes, provider = cluster([100, 100, 100])
+    provider.make_request("eth_sendRawTransaction", ["0x00"])
+    provider._executor.shutdown(wait=True)
+    assert all(node.calls == ["eth_sendRawTransaction"] for node in nodes.values())
+
+
+def test_async_provider_probes_heads_in_the_background(cluster):
+    pool, nodes, provider = cluster([100, 90], node=AsyncFakeNode, provider=AsyncPooledHTTPProvider, probe=True)
+
+    async def scenario():
+        result = await provider.make_request("eth_blockNumber", [])
+        await asyncio.gather(*provider._probes)
+        return result
+
+    assert int(asyncio.run(scenario())['result'], 16) == 100
+    assert [endpoint.head for endpoint in pool.endpoints] == [100, 90]
+    # One routed read plus one probe per node
+    assert sum(node.calls.count("eth_blockNumber") for node in nodes.values()) == 3
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+import requests
+
+from scan_window import AdaptiveScanWindow, is_scan_overload
+
+
+def test_initial_size_is_clamped():
+    assert AdaptiveScanWindow(size=0).size == 1
+    assert AdaptiveScanWindow(size=5000, max_size=2000).size == 2000
+
+
+def test_grows_while_under_half_budget():
+    window = AdaptiveScanWindow(size=10, max_logs=500, max_seconds=2.0)
+    assert window.record_success(log_count=10, elapsed=0.1)
+    assert window.size == 20
+
+
+def test_holds_between_half_and_full_budget():
+    window = AdaptiveScanWindow(size=10, max_logs=500, max_seconds=2.0)
+    assert not window.record_success(log_count=300, elapsed=0.1)
+    assert not window.record_success(log_count=10, elapsed=1.5)
+    assert window.size == 10
+
+
+def test_halves_when_over_budget():
+    window = AdaptiveScanWindow(size=64, max_logs=500, max_seconds=2.0)
+    window.record_success(log_count=501, elapsed=0.1)
+    assert window.size == 32
+    window.record_success(log_count=10, elapsed=2.5)
+    assert window.size == 16
+
+
+def test_never_grows_past_max_size():
+    window = AdaptiveScanWindow(size=1500, max_size=2000)
+    window.record_success(0, 0.0)
+    assert window.size == 2000
+    assert not window.record_success(0, 0.0)
+
+
+def test_overload_halves_and_caps_growth():
+    window = AdaptiveScanWindow(size=400, max_size=2000, probe_after=50)
+    assert window.record_overload()
+    assert window.size == 200
+    assert window.ceiling == 300
+    for _ in range(5):
+        window.record_success(0, 0.0)
+    assert window.size == 300
+
+
+def test_overload_at_minimum_reports_no_change():
+    window = AdaptiveScanWindow(size=1)
+    assert not window.record_overload()
+    assert window.size == 1
+
+
+def test_ceiling_is_lifted_after_probe_after_quiet_scans():
+    window = AdaptiveScanWindow(size=400, max_size=2000, probe_after=3)
+    window.record_overload()
+    for _ in range(2):
+        window.record_success(0, 0.0)
+    assert window.size == 300
+    window.record_success(0, 0.0)
+    assert window.ceiling == 600
+    assert window.size == 600
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (requests.exceptions.Timeout(), True),
+    (asyncio.TimeoutError(), True),
+    (ValueError({"code": -32005, "message": "query returned more than 10000 results"}), True),
+    (Exception("413 Client Error: Request Entity Too Large"), True),
+    (ValueError({"code": -32601, "message": "method not found"}), False),
+])
+def test_is_scan_overload(exc, expected):
+    assert is_scan_overload(exc) is expected
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from streamer import LogStreamer
+
+
+def test_head_wakeups_are_debounced(monkeypatch):
+    now = {'t': 100.0}
+    monkeypatch.setattr("streamer.time.monotonic", lambda: now['t'])
+    woken = []
+    streamer = LogStreamer(SimpleNamespace(), "ws://node", on_events=None, head_interval=1.0)
+    streamer.on_head = lambda: woken.append(now['t'])
+    for t in (100.0, 100.25, 100.5, 100.75, 101.0, 101.25, 102.5):
+        now['t'] = t
+        streamer._new_head()
+    assert woken == [100.0, 101.0, 102.5]
+    # Staleness is judged on every head, fired or not
+    assert streamer.last_head_at == 102.5
+
+
+def test_zero_interval_wakes_on_every_head():
+    woken = []
+    streamer = LogStreamer(SimpleNamespace(), "ws://node", on_events=None)
+    streamer.on_head = lambda: woken.append(1)
+    for _ in range(3):
+        streamer._new_head()
+    assert len(woken) == 3
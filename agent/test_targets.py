@@ -0,0 +1,96 @@
+import random
+
+import pytest
+from eth_abi import encode
+from eth_utils import keccak
+
+from targets import TargetSource, VERIFY_WINDOW, derive_target, seed_chain
+
+
+def arena_derive_target(seed: bytes, match_id: int, entropy: bytes) -> int:
+    """Arena.deriveTarget: uint256(keccak256(abi.encode(seed, matchId, entropy))) % 100 + 1."""
+    return int.from_bytes(keccak(encode(['bytes32', 'uint256', 'bytes32'], [seed, match_id, entropy])), 'big') % 100 + 1
+
+
+def test_derive_target_matches_abi_encode():
+    rng = random.Random(1234)
+    for _ in range(500):
+        seed, entropy = rng.randbytes(32), rng.randbytes(32)
+        match_id = rng.choice([0, 1, rng.getrandbits(64), rng.getrandbits(256)])
+        assert derive_target(seed, match_id, entropy) == arena_derive_target(seed, match_id, entropy)
+
+
+def test_derive_target_known_vector():
+    # Seed and join-block hash of the first match in testSettleMatchWithSeed (contracts/test/Arena.t.sol);
+    # the targets are what Arena.deriveTarget returns for them
+    link0 = seed_chain(b"secret".ljust(32, b"\0"), 2)[0]
+    entropy = keccak(encode(['string', 'uint256'], ["block", 100]))
+    assert link0 == keccak(keccak(b"secret".ljust(32, b"\0")))
+    assert derive_target(link0, 0, entropy) == 74
+    assert derive_target(link0, 1, entropy) == 25
+
+
+def test_derive_target_range():
+    assert {derive_target(bytes(32), match_id, bytes(32)) for match_id in range(2000)} == set(range(1, 101))
+
+
+def test_seed_chain_links_hash_toward_the_anchor():
+    links = seed_chain(b"\x01" * 32, 5)
+    assert links[-1] == keccak(b"\x01" * 32)
+    for k in range(1, len(links)):
+        assert keccak(links[k]) == links[k - 1]
+
+
+def chain_source(length: int = 4) -> TargetSource:
+    return TargetSource(b"\xff" * 32, secret=b"\x01" * 32, length=length)
+
+
+def test_sync_checks_the_committed_anchor():
+    source = chain_source()
+    anchor = keccak(source.links[0])
+    assert not source.sync(5, 5, b"\x00" * 32)
+    assert source.start_epoch is None
+    assert source.sync(5, 5, anchor)
+    assert source.chain_seed(5) == source.links[0]
+    assert source.chain_seed(8) == source.links[3]
+    assert source.chain_seed(9) is None
+    assert source.chain_seed(4) is None
+
+
+def test_sync_later_epoch_and_exhausted_chain():
+    source = chain_source()
+    assert source.sync(5, 7, keccak(source.links[2]))
+    assert source.sync(5, 9, source.links[-1])
+
+
+def record(join_block=100, seed_epoch=5, join_hash=b"\x22" * 32):
+    return {'join_block': join_block, 'seed_epoch': seed_epoch, 'join_hash': join_hash}
+
+
+def test_verifiable_seed_window():
+    source = chain_source()
+    source.sync(5, 5, keccak(source.links[0]))
+    assert source.verifiable_seed(1, record(), head=100 + VERIFY_WINDOW - 1) == source.links[0]
+    assert source.verifiable_seed(1, record(), head=100 + VERIFY_WINDOW) is None
+    assert source.verifiable_seed(1, record(join_block=None), head=100) is None
+    assert source.verifiable_seed(1, None, head=100) is None
+    assert source.verifiable_seed(1, record(seed_epoch=20), head=100) is None
+
+
+def test_target_uses_chain_seed_unless_unverified():
+    source = chain_source()
+    source.sync(5, 5, keccak(source.links[0]))
+    match = record()
+    assert source.target(1, match) == derive_target(source.links[0], 1, match['join_hash'])
+
+    source.unverified.add(1)
+    assert source.verifiable_seed(1, match, head=100) is None
+    assert source.target(1, match) == derive_target(source.fallback_seed, 1, match['join_hash'])
+
+
+@pytest.mark.parametrize("seed_epoch", [None, 3])
+def test_target_outside_chain_uses_fallback_seed(seed_epoch):
+    source = chain_source()
+    source.sync(5, 5, keccak(source.links[0]))
+    match = record(seed_epoch=seed_epoch, join_hash=None)
+    assert source.target(1, match) == derive_target(source.fallback_seed, 1, bytes(32))
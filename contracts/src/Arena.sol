@@ -10,7 +10,21 @@ import "./Utils.sol";
 contract Arena {
     address public owner;
     address public officialReferee;
+    // Additional referee workers, each settling its own partition of matches
+    mapping(address => bool) public isReferee;
+
+    // Target seeds: a hash chain committed by the owner and revealed one link per
+    // epoch. Each link is the keccak256 preimage of the one revealed before it.
+    bytes32 public seedAnchor;
+    uint64 public seedEpoch;
+    uint64 public seedChainStart;
+    mapping(uint64 => bytes32) public epochSeeds;
     uint256 public nextMatchId;
+
+    // Game types matches can be created with. Settlement of any type but the
+    // guessing game is decided off-chain by the referee.
+    uint8 public constant GUESSING_GAME = 0;
+    mapping(uint8 => bool) public gameTypeEnabled;
     mapping(uint256 => Utils.Match) public matches;
 
     // Fee System
@@ -36,9 +50,16 @@ contract Arena {
         _;
     }
 
+    modifier onlyReferee() {
+        if (msg.sender != officialReferee && !isReferee[msg.sender])
+            revert Utils.ONLY_REFEREE_CAN_SETTLE();
+        _;
+    }
+
     constructor(address _referee) {
         owner = msg.sender;
         officialReferee = _referee;
+        gameTypeEnabled[GUESSING_GAME] = true;
     }
 
     /**
@@ -49,10 +70,69 @@ contract Arena {
         officialReferee = _newReferee;
     }
 
+    /**
+     * @dev Authorize or revoke an additional referee. Any authorized referee can
+     * settle any match; splitting matches between them is up to the referees.
+     */
+    function setReferee(address _referee, bool _authorized) external onlyOwner {
+        if (_referee == address(0)) revert Utils.INVALID_REFEREE();
+        isReferee[_referee] = _authorized;
+        emit Utils.RefereeUpdated(_referee, _authorized);
+    }
+
+    /**
+     * @dev Enable or disable creating matches of a game type. Matches already
+     * created keep their type and can still be joined and settled.
+     */
+    function setGameType(uint8 _gameType, bool _enabled) external onlyOwner {
+        gameTypeEnabled[_gameType] = _enabled;
+        emit Utils.GameTypeUpdated(_gameType, _enabled);
+    }
+
+    /**
+     * @dev Commit a new target seed chain by its anchor (the hash of its first seed).
+     * Matches joined from now on belong to the chain's first epoch.
+     */
+    function commitSeedChain(bytes32 _anchor) external onlyOwner {
+        if (_anchor == bytes32(0)) revert Utils.INVALID_SEED();
+        seedAnchor = _anchor;
+        seedEpoch += 1;
+        seedChainStart = seedEpoch;
+        emit Utils.SeedChainCommitted(seedEpoch, _anchor);
+    }
+
+    /**
+     * @dev Target number of a match: derived from its epoch's seed, its ID and the
+     * hash of the block it was joined in.
+     */
+    function deriveTarget(
+        bytes32 _seed,
+        uint256 _matchId,
+        bytes32 _entropy
+    ) public pure returns (uint256) {
+        return (uint256(keccak256(abi.encode(_seed, _matchId, _entropy))) % 100) + 1;
+    }
+
     /**
      * @dev Create a new match with a specific stake and referee.
      */
     function createMatch(uint256 _guess) external payable returns (uint256) {
+        return _createMatch(GUESSING_GAME, _guess);
+    }
+
+    /**
+     * @dev Create a new match of an enabled game type. Moves range over 1-100 in
+     * every game; what they mean is up to the game.
+     */
+    function createMatchOfType(
+        uint8 _gameType,
+        uint256 _guess
+    ) external payable returns (uint256) {
+        if (!gameTypeEnabled[_gameType]) revert Utils.UNSUPPORTED_GAME_TYPE();
+        return _createMatch(_gameType, _guess);
+    }
+
+    function _createMatch(uint8 _gameType, uint256 _guess) internal returns (uint256) {
         if (msg.value == 0) revert Utils.MUST_BE_GREATER_THAN_ZERO();
         if (_guess == 0 || _guess > 100) revert Utils.INVALID_GUESS();
 
@@ -67,10 +147,13 @@ contract Arena {
             lastUpdate: block.timestamp,
             creatorGuess: _guess,
             opponentGuess: 0,
-            targetNumber: 0
+            targetNumber: 0,
+            joinBlock: 0,
+            seedEpoch: 0,
+            gameType: _gameType
         });
 
-        emit Utils.MatchCreated(matchId, msg.sender, msg.value, _guess);
+        emit Utils.MatchCreated(matchId, msg.sender, msg.value, _guess, _gameType);
         return matchId;
     }
 
@@ -89,8 +172,10 @@ contract Arena {
         m.opponentGuess = _guess;
         m.status = Utils.MatchStatus.Active;
         m.lastUpdate = block.timestamp;
+        m.joinBlock = uint64(block.number);
+        m.seedEpoch = seedEpoch;
 
-        emit Utils.MatchJoined(_matchId, msg.sender, _guess);
+        emit Utils.MatchJoined(_matchId, msg.sender, _guess, m.seedEpoch);
     }
 
     /**
@@ -100,55 +185,196 @@ contract Arena {
         uint256 _matchId,
         address _winner,
         uint256 _targetNumber
-    ) external {
+    ) external onlyReferee {
         Utils.Match storage m = matches[_matchId];
         if (m.status != Utils.MatchStatus.Active)
             revert Utils.MATCH_NOT_ACTIVE();
-        if (msg.sender != officialReferee)
-            revert Utils.ONLY_REFEREE_CAN_SETTLE();
+        if (
+            _winner != address(0) &&
+            _winner != m.creator &&
+            _winner != m.opponent
+        ) revert Utils.WINNER_MUST_BE_PARTICIPANT();
+
+        _settle(m, _matchId, _winner, _targetNumber);
+    }
+
+    /**
+     * @dev Settle several matches in one transaction. A match that cannot be settled
+     * is skipped with MatchSettlementSkipped instead of reverting the whole batch.
+     */
+    function settleMatches(
+        uint256[] calldata _matchIds,
+        address[] calldata _winners,
+        uint256[] calldata _targetNumbers
+    ) external onlyReferee {
+        if (
+            _matchIds.length != _winners.length ||
+            _matchIds.length != _targetNumbers.length
+        ) revert Utils.ARRAY_LENGTH_MISMATCH();
+
+        for (uint256 i = 0; i < _matchIds.length; i++) {
+            Utils.Match storage m = matches[_matchIds[i]];
+            address winner = _winners[i];
+
+            if (m.status != Utils.MatchStatus.Active) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.MATCH_NOT_ACTIVE.selector
+                );
+                continue;
+            }
+            if (
+                winner != address(0) &&
+                winner != m.creator &&
+                winner != m.opponent
+            ) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.WINNER_MUST_BE_PARTICIPANT.selector
+                );
+                continue;
+            }
+
+            _settle(m, _matchIds[i], winner, _targetNumbers[i]);
+        }
+    }
+
+    /**
+     * @dev Settle a match from its epoch's seed. The contract derives the target and
+     * the winner itself, so the result can be checked by anyone. Only possible while
+     * the join block is among the last 256, and only for the guessing game; older
+     * matches and other game types settle with settleMatch.
+     */
+    function settleMatchWithSeed(uint256 _matchId, bytes32 _seed) external onlyReferee {
+        Utils.Match storage m = matches[_matchId];
+        if (m.status != Utils.MatchStatus.Active)
+            revert Utils.MATCH_NOT_ACTIVE();
+        if (m.gameType != GUESSING_GAME) revert Utils.UNSUPPORTED_GAME_TYPE();
+        bytes32 entropy = blockhash(m.joinBlock);
+        if (entropy == bytes32(0)) revert Utils.JOIN_BLOCK_UNAVAILABLE();
+        if (!_checkSeed(m.seedEpoch, _seed)) revert Utils.INVALID_SEED();
+
+        uint256 target = deriveTarget(_seed, _matchId, entropy);
+        _settle(m, _matchId, _closestGuess(m, target), target);
+    }
+
+    /**
+     * @dev Batch form of settleMatchWithSeed, skipping matches like settleMatches does.
+     */
+    function settleMatchesWithSeed(
+        uint256[] calldata _matchIds,
+        bytes32[] calldata _seeds
+    ) external onlyReferee {
+        if (_matchIds.length != _seeds.length)
+            revert Utils.ARRAY_LENGTH_MISMATCH();
+
+        for (uint256 i = 0; i < _matchIds.length; i++) {
+            Utils.Match storage m = matches[_matchIds[i]];
+
+            if (m.status != Utils.MatchStatus.Active) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.MATCH_NOT_ACTIVE.selector
+                );
+                continue;
+            }
+            if (m.gameType != GUESSING_GAME) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.UNSUPPORTED_GAME_TYPE.selector
+                );
+                continue;
+            }
+            bytes32 entropy = blockhash(m.joinBlock);
+            if (entropy == bytes32(0)) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.JOIN_BLOCK_UNAVAILABLE.selector
+                );
+                continue;
+            }
+            if (!_checkSeed(m.seedEpoch, _seeds[i])) {
+                emit Utils.MatchSettlementSkipped(
+                    _matchIds[i],
+                    Utils.INVALID_SEED.selector
+                );
+                continue;
+            }
+
+            uint256 target = deriveTarget(_seeds[i], _matchIds[i], entropy);
+            _settle(m, _matchIds[i], _closestGuess(m, target), target);
+        }
+    }
+
+    /**
+     * @dev True if _seed is the seed of _epoch. The current epoch's seed is revealed
+     * by its first use, which moves new joins on to the next epoch.
+     */
+    function _checkSeed(uint64 _epoch, bytes32 _seed) internal returns (bool) {
+        bytes32 revealed = epochSeeds[_epoch];
+        if (revealed != bytes32(0)) return revealed == _seed;
+        if (_epoch != seedEpoch || keccak256(abi.encodePacked(_seed)) != seedAnchor)
+            return false;
+
+        epochSeeds[_epoch] = _seed;
+        seedAnchor = _seed;
+        seedEpoch = _epoch + 1;
+        emit Utils.SeedRevealed(_epoch, _seed);
+        return true;
+    }
 
+    /**
+     * @dev The participant whose guess is closest to the target, or address(0) on a tie.
+     */
+    function _closestGuess(
+        Utils.Match storage m,
+        uint256 _target
+    ) internal view returns (address) {
+        uint256 creatorDiff = m.creatorGuess > _target
+            ? m.creatorGuess - _target
+            : _target - m.creatorGuess;
+        uint256 opponentDiff = m.opponentGuess > _target
+            ? m.opponentGuess - _target
+            : _target - m.opponentGuess;
+
+        if (creatorDiff < opponentDiff) return m.creator;
+        if (opponentDiff < creatorDiff) return m.opponent;
+        return address(0);
+    }
+
+    /**
+     * @dev Applies a validated settlement: takes the fee and credits the prize.
+     */
+    function _settle(
+        Utils.Match storage m,
+        uint256 _matchId,
+        address _winner,
+        uint256 _targetNumber
+    ) internal {
         uint256 totalPool = m.stake * 2;
         uint256 fee = (totalPool * FEE_BPS) / 10000;
         uint256 prize = totalPool - fee;
         totalFees += fee;
 
+        m.targetNumber = _targetNumber;
+        m.lastUpdate = block.timestamp;
+
         if (_winner == address(0)) {
             // DRAW: Split prize pool between creator and opponent
             m.status = Utils.MatchStatus.Draw;
-            m.targetNumber = _targetNumber;
-            m.lastUpdate = block.timestamp;
 
             uint256 halfPrize = prize / 2;
             pendingWithdrawals[m.creator] += halfPrize;
             pendingWithdrawals[m.opponent] += halfPrize;
-
-            emit Utils.MatchSettled(
-                _matchId,
-                address(0),
-                prize,
-                fee,
-                _targetNumber
-            );
         } else {
             // WINNER: Standard settlement
-            if (_winner != m.creator && _winner != m.opponent)
-                revert Utils.WINNER_MUST_BE_PARTICIPANT();
-
             m.status = Utils.MatchStatus.Settled;
             m.winner = _winner;
-            m.targetNumber = _targetNumber;
-            m.lastUpdate = block.timestamp;
 
             pendingWithdrawals[_winner] += prize;
-
-            emit Utils.MatchSettled(
-                _matchId,
-                _winner,
-                prize,
-                fee,
-                _targetNumber
-            );
         }
+
+        emit Utils.MatchSettled(_matchId, _winner, prize, fee, _targetNumber);
     }
 
     /**
@@ -23,15 +23,25 @@ library Utils {
     error NAME_ALREADY_TAKEN();
     error NAME_TOO_LONG();
     error NAME_TOO_SHORT();
+    error ARRAY_LENGTH_MISMATCH();
+    error INVALID_SEED();
+    error JOIN_BLOCK_UNAVAILABLE();
+    error UNSUPPORTED_GAME_TYPE();
 
     //EVENTS
     event MatchCreated(
         uint256 indexed matchId,
         address creator,
         uint256 stake,
-        uint256 guess
+        uint256 guess,
+        uint8 gameType
+    );
+    event MatchJoined(
+        uint256 indexed matchId,
+        address opponent,
+        uint256 guess,
+        uint64 seedEpoch
     );
-    event MatchJoined(uint256 indexed matchId, address opponent, uint256 guess);
     event MatchSettled(
         uint256 indexed matchId,
         address winner,
@@ -39,6 +49,7 @@ library Utils {
         uint256 fee,
         uint256 targetNumber
     );
+    event MatchSettlementSkipped(uint256 indexed matchId, bytes4 reason);
     event MatchCancelled(uint256 indexed matchId);
     event WinningsWithdrawn(address indexed player, uint256 amount);
     event FeesWithdrawn(address indexed owner, uint256 amount);
@@ -48,6 +59,10 @@ library Utils {
         address opponent
     );
     event NameSet(address indexed user, string name);
+    event RefereeUpdated(address indexed referee, bool authorized);
+    event SeedChainCommitted(uint64 indexed epoch, bytes32 anchor);
+    event SeedRevealed(uint64 indexed epoch, bytes32 seed);
+    event GameTypeUpdated(uint8 indexed gameType, bool enabled);
 
     //OBJECTS
     enum MatchStatus {
@@ -69,5 +84,8 @@ library Utils {
         uint256 creatorGuess;
         uint256 opponentGuess;
         uint256 targetNumber;
+        uint64 joinBlock; // its hash is the target entropy, unknown when the join is sent
+        uint64 seedEpoch; // target seed epoch the match was joined in
+        uint8 gameType; // decides how the referee picks the winner; 0 is the guessing game
     }
 }
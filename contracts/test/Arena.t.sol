@@ -22,7 +22,7 @@ contract ArenaTest is Test {
         vm.prank(creator);
         uint256 matchId = arena.createMatch{value: 1 ether}(42);
 
-        (uint256 id, address mCreator, address mOpponent, uint256 stake, Utils.MatchStatus status, address _unused_winner, uint256 lastUpdate, uint256 cGuess, uint256 oGuess, uint256 tNumber) = arena.matches(matchId);
+        (uint256 id, address mCreator, address mOpponent, uint256 stake, Utils.MatchStatus status, address _unused_winner, uint256 lastUpdate, uint256 cGuess, uint256 oGuess, uint256 tNumber, , , ) = arena.matches(matchId);
 
         assertEq(id, 0);
         assertEq(mCreator, creator);
@@ -81,7 +81,7 @@ contract ArenaTest is Test {
         assertEq(creator.balance, cBalBefore + 1 ether);
         assertEq(opponent.balance, oBalBefore + 1 ether);
         
-        (, , , , Utils.MatchStatus status, , , , , ) = arena.matches(matchId);
+        (, , , , Utils.MatchStatus status, , , , , , , , ) = arena.matches(matchId);
         assertTrue(status == Utils.MatchStatus.Cancelled);
     }
 
@@ -101,5 +101,241 @@ contract ArenaTest is Test {
         assertEq(owner.balance, balBefore + fees);
     }
 
+    function testSettleMatchesBatch() public {
+        vm.startPrank(creator);
+        uint256 winId = arena.createMatch{value: 1 ether}(42);
+        uint256 drawId = arena.createMatch{value: 1 ether}(40);
+        uint256 pendingId = arena.createMatch{value: 1 ether}(10);
+        vm.stopPrank();
+
+        vm.startPrank(opponent);
+        arena.joinMatch{value: 1 ether}(winId, 50);
+        arena.joinMatch{value: 1 ether}(drawId, 60);
+        vm.stopPrank();
+
+        uint256[] memory ids = new uint256[](3);
+        address[] memory winners = new address[](3);
+        uint256[] memory targets = new uint256[](3);
+        (ids[0], winners[0], targets[0]) = (winId, opponent, 49);
+        (ids[1], winners[1], targets[1]) = (drawId, address(0), 50);
+        (ids[2], winners[2], targets[2]) = (pendingId, creator, 10);
+
+        vm.expectEmit(true, false, false, true);
+        emit Utils.MatchSettlementSkipped(pendingId, Utils.MATCH_NOT_ACTIVE.selector);
+
+        vm.prank(referee);
+        arena.settleMatches(ids, winners, targets);
+
+        uint256 expectedFee = (2 ether * arena.FEE_BPS()) / 10000;
+        uint256 expectedPrize = 2 ether - expectedFee;
+
+        assertEq(arena.totalFees(), expectedFee * 2);
+        assertEq(arena.pendingWithdrawals(opponent), expectedPrize + expectedPrize / 2);
+        assertEq(arena.pendingWithdrawals(creator), expectedPrize / 2);
+
+        (, , , , Utils.MatchStatus winStatus, address winner, , , , , , , ) = arena.matches(winId);
+        (, , , , Utils.MatchStatus drawStatus, , , , , , , , ) = arena.matches(drawId);
+        (, , , , Utils.MatchStatus pendingStatus, , , , , , , , ) = arena.matches(pendingId);
+        assertTrue(winStatus == Utils.MatchStatus.Settled);
+        assertEq(winner, opponent);
+        assertTrue(drawStatus == Utils.MatchStatus.Draw);
+        assertTrue(pendingStatus == Utils.MatchStatus.Pending);
+    }
+
+    function testSettleMatchesSkipsNonParticipantWinner() public {
+        vm.prank(creator);
+        uint256 matchId = arena.createMatch{value: 1 ether}(42);
+        vm.prank(opponent);
+        arena.joinMatch{value: 1 ether}(matchId, 50);
+
+        uint256[] memory ids = new uint256[](1);
+        address[] memory winners = new address[](1);
+        uint256[] memory targets = new uint256[](1);
+        (ids[0], winners[0], targets[0]) = (matchId, referee, 45);
+
+        vm.expectEmit(true, false, false, true);
+        emit Utils.MatchSettlementSkipped(matchId, Utils.WINNER_MUST_BE_PARTICIPANT.selector);
+
+        vm.prank(referee);
+        arena.settleMatches(ids, winners, targets);
+
+        assertEq(arena.totalFees(), 0);
+        (, , , , Utils.MatchStatus status, , , , , , , , ) = arena.matches(matchId);
+        assertTrue(status == Utils.MatchStatus.Active);
+    }
+
+    function testSettleMatchesRejectsBadInput() public {
+        uint256[] memory ids = new uint256[](2);
+        address[] memory winners = new address[](1);
+        uint256[] memory targets = new uint256[](2);
+
+        vm.expectRevert(Utils.ONLY_REFEREE_CAN_SETTLE.selector);
+        arena.settleMatches(ids, winners, targets);
+
+        vm.prank(referee);
+        vm.expectRevert(Utils.ARRAY_LENGTH_MISMATCH.selector);
+        arena.settleMatches(ids, winners, targets);
+    }
+
+    function testAdditionalRefereeCanSettle() public {
+        address worker = address(0x4);
+        vm.prank(creator);
+        uint256 matchId = arena.createMatch{value: 1 ether}(42);
+        vm.prank(opponent);
+        arena.joinMatch{value: 1 ether}(matchId, 50);
+
+        vm.prank(worker);
+        vm.expectRevert(Utils.ONLY_REFEREE_CAN_SETTLE.selector);
+        arena.settleMatch(matchId, creator, 45);
+
+        arena.setReferee(worker, true);
+        assertTrue(arena.isReferee(worker));
+
+        vm.prank(worker);
+        arena.settleMatch(matchId, creator, 45);
+        (, , , , Utils.MatchStatus status, , , , , , , , ) = arena.matches(matchId);
+        assertTrue(status == Utils.MatchStatus.Settled);
+
+        // The official referee keeps its rights alongside the workers
+        vm.prank(creator);
+        uint256 nextId = arena.createMatch{value: 1 ether}(42);
+        vm.prank(opponent);
+        arena.joinMatch{value: 1 ether}(nextId, 50);
+        vm.prank(referee);
+        arena.settleMatch(nextId, opponent, 49);
+    }
+
+    function testRevokedRefereeCannotSettle() public {
+        address worker = address(0x4);
+        arena.setReferee(worker, true);
+        arena.setReferee(worker, false);
+        assertFalse(arena.isReferee(worker));
+
+        uint256[] memory ids = new uint256[](0);
+        address[] memory winners = new address[](0);
+        uint256[] memory targets = new uint256[](0);
+        vm.prank(worker);
+        vm.expectRevert(Utils.ONLY_REFEREE_CAN_SETTLE.selector);
+        arena.settleMatches(ids, winners, targets);
+    }
+
+    function testOnlyOwnerCanSetReferee() public {
+        vm.prank(creator);
+        vm.expectRevert(Utils.ONLY_OWNER.selector);
+        arena.setReferee(address(0x4), true);
+
+        vm.expectRevert(Utils.INVALID_REFEREE.selector);
+        arena.setReferee(address(0), true);
+    }
+
+    function _joinedMatchAt(uint256 blockNumber) internal returns (uint256 matchId) {
+        vm.roll(blockNumber);
+        vm.prank(creator);
+        matchId = arena.createMatch{value: 1 ether}(10);
+        vm.prank(opponent);
+        arena.joinMatch{value: 1 ether}(matchId, 90);
+        vm.setBlockhash(blockNumber, keccak256(abi.encode("block", blockNumber)));
+    }
+
+    function testSettleMatchWithSeed() public {
+        // Chain of two links: link1 hashes to link0, link0 to the anchor
+        bytes32 link1 = keccak256(abi.encodePacked(bytes32("secret")));
+        bytes32 link0 = keccak256(abi.encodePacked(link1));
+        arena.commitSeedChain(keccak256(abi.encodePacked(link0)));
+        assertEq(arena.seedEpoch(), 1);
+
+        uint256 first = _joinedMatchAt(100);
+        uint256 second = _joinedMatchAt(101);
+        vm.roll(102);
+
+        vm.prank(referee);
+        vm.expectRevert(Utils.INVALID_SEED.selector);
+        arena.settleMatchWithSeed(first, link1);
+
+        vm.prank(referee);
+        arena.settleMatchWithSeed(first, link0);
+        assertEq(arena.epochSeeds(1), link0);
+        assertEq(arena.seedEpoch(), 2);
+
+        uint256 target = arena.deriveTarget(link0, first, keccak256(abi.encode("block", uint256(100))));
+        (, , , , Utils.MatchStatus status, address winner, , , , uint256 tNumber, , uint64 epoch, ) = arena.matches(first);
+        assertEq(tNumber, target);
+        assertEq(epoch, 1);
+        if (target < 50) assertEq(winner, creator);
+        else if (target > 50) assertEq(winner, opponent);
+        else assertTrue(status == Utils.MatchStatus.Draw);
+
+        // Revealed seeds keep working for the rest of their epoch
+        vm.prank(referee);
+        arena.settleMatchWithSeed(second, link0);
+
+        // Joins after the reveal move to the next link
+        uint256 third = _joinedMatchAt(103);
+        vm.roll(104);
+        uint256[] memory ids = new uint256[](2);
+        bytes32[] memory seeds = new bytes32[](2);
+        ids[0] = first;
+        ids[1] = third;
+        seeds[0] = link0;
+        seeds[1] = link1;
+        vm.prank(referee);
+        arena.settleMatchesWithSeed(ids, seeds);
+        (, , , , status, , , , , , , epoch, ) = arena.matches(third);
+        assertTrue(status != Utils.MatchStatus.Active);
+        assertEq(epoch, 2);
+        assertEq(arena.seedEpoch(), 3);
+    }
+
+    function testSettleMatchWithSeedNeedsRecentJoinBlock() public {
+        bytes32 link0 = keccak256("link0");
+        arena.commitSeedChain(keccak256(abi.encodePacked(link0)));
+        uint256 matchId = _joinedMatchAt(100);
+
+        vm.roll(100 + 257);
+        vm.prank(referee);
+        vm.expectRevert(Utils.JOIN_BLOCK_UNAVAILABLE.selector);
+        arena.settleMatchWithSeed(matchId, link0);
+
+        // settleMatch still works for matches past the blockhash window
+        vm.prank(referee);
+        arena.settleMatch(matchId, creator, 12);
+    }
+
+    function testOnlyOwnerCanCommitSeedChain() public {
+        vm.prank(referee);
+        vm.expectRevert(Utils.ONLY_OWNER.selector);
+        arena.commitSeedChain(keccak256("anchor"));
+    }
+
+    function testCreateMatchOfType() public {
+        vm.prank(creator);
+        vm.expectRevert(Utils.UNSUPPORTED_GAME_TYPE.selector);
+        arena.createMatchOfType{value: 1 ether}(1, 42);
+
+        vm.prank(referee);
+        vm.expectRevert(Utils.ONLY_OWNER.selector);
+        arena.setGameType(1, true);
+
+        arena.setGameType(1, true);
+        vm.prank(creator);
+        uint256 matchId = arena.createMatchOfType{value: 1 ether}(1, 42);
+        (, , , , , , , , , , , , uint8 gameType) = arena.matches(matchId);
+        assertEq(gameType, 1);
+
+        vm.prank(opponent);
+        arena.joinMatch{value: 1 ether}(matchId, 58);
+
+        // The contract only decides guessing games; other types are settled by the referee
+        vm.prank(referee);
+        vm.expectRevert(Utils.UNSUPPORTED_GAME_TYPE.selector);
+        arena.settleMatchWithSeed(matchId, keccak256("seed"));
+
+        vm.prank(referee);
+        arena.settleMatch(matchId, opponent, 0);
+        (, , , , Utils.MatchStatus status, address winner, , , , , , , ) = arena.matches(matchId);
+        assertTrue(status == Utils.MatchStatus.Settled);
+        assertEq(winner, opponent);
+    }
+
     receive() external payable {}
 }